@@ -1,13 +1,17 @@
 from django.contrib import admin
 from .models import League, Franchise, Player, Season, TeamSeason, PlayerSeason, Match, PlayoffSeries, Game, PlayerGameLog, PlayerGameStats, PlayerRegulationGameStats, PlayerWeekStats, PlayerSeasonStats, AwardType, AwardReceived, Transaction
-from .views import stat_collection
+from .views import heatmaps, stat_collection
 from .views.data_entry import infer_playoff_series
 
 
 @admin.action(description="Reprocess stats from the game")
 def reprocess(modeladmin, request, queryset):
-    for g in queryset:
-        stat_collection.process_game_stats(g)
+    seasons = {}
+    for g in queryset.select_related('match__season'):
+        stat_collection.process_game_stats(g, update_records=False)
+        seasons[g.match.season_id] = g.match.season
+    for season in seasons.values():
+        stat_collection.update_team_records(season)
         
     # player_seasons = PlayerGameLog.objects.filter(
     #     game__in=queryset
@@ -25,7 +29,9 @@ def reaggregate_season(modeladmin, request, queryset):
         
         # Re-aggregate each game
         for ps in player_seasons:
-            stat_collection.reaggregate_stats(ps)
+            stat_collection.reaggregate_stats(ps, update_career=False, update_heatmaps=False)
+        stat_collection.update_player_career_stats(player_seasons.values_list('player_id', flat=True))
+        heatmaps.update_player_heatmaps(player_seasons.values_list('id', flat=True))
         
         # Update season standings
         stat_collection.update_standings(season)
@@ -43,7 +49,8 @@ def reprocess_season(modeladmin, request, queryset):
         
         # Re-aggregate each game
         for game in games:
-            stat_collection.process_game_stats(game)
+            stat_collection.process_game_stats(game, update_records=False)
+        stat_collection.update_team_records(season)
         
         # Update season standings
         stat_collection.update_standings(season)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ReferenceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reference"
+
+    def ready(self):
+        # Connect signal handlers
+        from . import signals
@@ -1,26 +1,49 @@
+from django.core.cache import cache
+from django.db import models
 from .models import League, Season
 
 
+NAVIGATION_LEAGUES_KEY = "navigation_leagues"
+
+
+def get_navigation_leagues():
+    """
+    Leagues with ordering <= 10, each with its most recent season, from a single query.
+    """
+    most_recent_season = Season.objects.filter(league=models.OuterRef('pk')).order_by('-end_date')
+    leagues = League.objects.filter(ordering__lte=10).annotate(
+        most_recent_season_id=models.Subquery(most_recent_season.values('id')[:1]),
+        most_recent_season_name=models.Subquery(most_recent_season.values('name')[:1]),
+        most_recent_season_end_date=models.Subquery(most_recent_season.values('end_date')[:1]),
+    ).order_by('ordering')
+
+    return [
+        {
+            'league': league,
+            'most_recent_season': Season(
+                id=league.most_recent_season_id,
+                name=league.most_recent_season_name,
+                end_date=league.most_recent_season_end_date,
+                league=league
+            )
+        }
+        for league in leagues
+        if league.most_recent_season_id is not None
+    ]
+
+
 def navigation_leagues(request):
     """
     Context processor to provide navigation leagues with their most recent seasons.
     Returns leagues with ordering <= 10, each linked to their most recent season.
+
+    The result is cached until a League or Season is saved or deleted (see signals.py).
     """
-    leagues_with_seasons = []
-    
-    # Get leagues with ordering <= 10, ordered by their ordering field
-    leagues = League.objects.filter(ordering__lte=10).order_by('ordering')
-    
-    for league in leagues:
-        # Get the most recent season for this league
-        most_recent_season = Season.objects.filter(league=league).order_by('-end_date').first()
-        
-        if most_recent_season:
-            leagues_with_seasons.append({
-                'league': league,
-                'most_recent_season': most_recent_season
-            })
+    leagues_with_seasons = cache.get(NAVIGATION_LEAGUES_KEY)
+    if leagues_with_seasons is None:
+        leagues_with_seasons = get_navigation_leagues()
+        cache.set(NAVIGATION_LEAGUES_KEY, leagues_with_seasons, None)
     
     return {
         'navigation_leagues': leagues_with_seasons
-    }
\ No newline at end of file
+    }
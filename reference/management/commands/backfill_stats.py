@@ -0,0 +1,48 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...views.stat_backfill import BATCH_SIZE, backfill_stats
+from ...views.stat_collection import STAT_FIELDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate one or more stats for every game from the stored game timelines (or the tagpro.eu "
+        "bulk export, for games without them), e.g. after adding a stat to the parser, and rebuild just "
+        "those columns of the week, season and career totals. Games are parsed in parallel. If the "
+        "backfill is interrupted, running it again resumes from its checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("stats", nargs="+", help=f"Stats to backfill, out of: {', '.join(STAT_FIELDS)}")
+        parser.add_argument("--workers", type=int, help="Number of worker processes (defaults to the number of CPUs)")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Number of games to parse and write at a time")
+        parser.add_argument(
+            "--checkpoint",
+            help="Where to save progress (defaults to data/backfill_<stats>.json)"
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore any saved progress and start over")
+
+    def handle(self, *args, **options):
+        stats = list(dict.fromkeys(options["stats"]))
+        unknown = [stat for stat in stats if stat not in STAT_FIELDS]
+        if unknown:
+            raise CommandError(f"Unknown stats: {', '.join(unknown)}")
+
+        checkpoint_path = options["checkpoint"] or f"data/backfill_{'_'.join(stats)}.json"
+        if options["restart"]:
+            try:
+                os.remove(checkpoint_path)
+            except FileNotFoundError:
+                pass
+
+        started = time.perf_counter()
+        try:
+            backfill_stats(stats, checkpoint_path, options["workers"], options["batch_size"], log=self.stdout.write)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {', '.join(stats)} in {time.perf_counter() - started:.2f}s"
+        ))
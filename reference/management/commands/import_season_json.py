@@ -0,0 +1,161 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ...views.data_entry import rebuild_after_import
+from ...views.json_import import import_json_data_to_db
+from ...views.json_stream import iter_normalized_import_items, load_import_file
+
+
+DEFAULT_FILES = "bulk_import_jsons/*.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Import one or more JSON files in the docs/json_import_schema.txt format (by default, every file in "
+        "bulk_import_jsons/). Every item is validated before it's written, and records are written in chunks, "
+        "each chunk in its own transaction. With --jobs, files are parsed and validated in parallel worker "
+        "processes while this process remains the only one writing to the database. Without --jobs, a file "
+        "that fails validation partway through keeps the chunks written before the error. Once every file is "
+        "imported, stats, standings and playoff series are rebuilt once per affected season, including for "
+        "games from files that failed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help=f"JSON files to import (default: {DEFAULT_FILES})")
+        parser.add_argument(
+            '--chunk-size', type=int, default=100,
+            help="Number of records (team seasons, player seasons or matches) to write per transaction"
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=1,
+            help="Number of worker processes used to parse and validate files. With 1, each file is streamed "
+                 "so memory use stays bounded regardless of file size"
+        )
+        parser.add_argument(
+            '--no-rebuild', action='store_true',
+            help="Skip processing stats and rebuilding standings and playoff series for the imported games"
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        jobs = options['jobs']
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        if jobs < 1:
+            raise CommandError("--jobs must be at least 1")
+
+        files = options['files'] or sorted(glob.glob(DEFAULT_FILES))
+        if not files:
+            raise CommandError(f"No files to import (nothing matches {DEFAULT_FILES})")
+        for path in files:
+            if not os.path.isfile(path):
+                raise CommandError(f"File not found: {path}")
+
+        total = self.empty_results()
+        failed: List[str] = []
+        started = time.perf_counter()
+        if jobs == 1:
+            imported = (self.stream_file(path, chunk_size) for path in files)
+        else:
+            imported = self.import_in_parallel(files, chunk_size, min(jobs, len(files)))
+        for path, results, error in imported:
+            # Games written before a file failed are still rebuilt
+            for key in total:
+                total[key] += results[key]
+            if error:
+                failed.append(path)
+
+        if len(files) > 1:
+            self.report("Total", total, time.perf_counter() - started)
+
+        if total['game_ids'] and not options['no_rebuild']:
+            started = time.perf_counter()
+            seasons = rebuild_after_import(total['game_ids'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt stats and standings for {', '.join(s.name for s in seasons)} "
+                f"in {time.perf_counter() - started:.2f}s"
+            ))
+
+        if failed:
+            raise CommandError(f"{len(failed)} file(s) failed validation: {', '.join(failed)}")
+
+    def stream_file(self, path: str, chunk_size: int) -> Tuple[str, Dict, bool]:
+        """Validate and write a single file as it's read. Returns the path, results and whether it failed."""
+        started = time.perf_counter()
+        results = self.empty_results()
+        try:
+            with open(path, encoding="utf-8") as fp:
+                self.write(iter_normalized_import_items(fp), chunk_size, results)
+        except ValueError as e:
+            # Chunks written before the error stay committed, and re-running the import skips their
+            # games as already existing, so their IDs are kept in results to be rebuilt with the rest
+            self.stderr.write(f"{path}: {e} ({results['created_count']} games before it were imported)")
+            return path, results, True
+        results['bytes'] = os.path.getsize(path)
+        self.report(path, results, time.perf_counter() - started)
+        return path, results, False
+
+    def import_in_parallel(self, files: List[str], chunk_size: int, jobs: int) -> Iterable[Tuple[str, Dict, bool]]:
+        """
+        Parse and validate files in worker processes, writing each one from this process as soon as it's
+        ready. Workers never touch the database, so SQLite only ever sees a single writer.
+        """
+        # Don't let forked workers inherit an open database connection
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(load_import_file, path) for path in files]
+            for future in as_completed(futures):
+                loaded = future.result()
+                if loaded['error']:
+                    self.stderr.write(f"{loaded['path']}: {loaded['error']}")
+                    yield loaded['path'], self.empty_results(), True
+                    continue
+
+                started = time.perf_counter()
+                items = (
+                    (section, item)
+                    for section, section_items in loaded['data'].items()
+                    for item in section_items
+                )
+                results = self.empty_results()
+                self.write(items, chunk_size, results)
+                results['bytes'] = loaded['bytes']
+                self.report(loaded['path'], results, time.perf_counter() - started)
+                yield loaded['path'], results, False
+
+    def empty_results(self) -> Dict:
+        return {'created_count': 0, 'skipped_count': 0, 'bytes': 0, 'game_ids': []}
+
+    def write(self, items: Iterable[Tuple[str, Dict]], chunk_size: int, results: Dict) -> None:
+        """
+        Write (section, item) pairs, flushing whenever a chunk fills or the section changes. Each chunk's
+        results are added to results as soon as it's committed, so they're complete up to any error.
+        """
+        def flush(section, chunk):
+            if chunk:
+                chunk_results = import_json_data_to_db({section: chunk})
+                for key in ('created_count', 'skipped_count', 'game_ids'):
+                    results[key] += chunk_results[key]
+
+        current_section = None
+        chunk = []
+        for section, item in items:
+            if section != current_section or len(chunk) >= chunk_size:
+                flush(current_section, chunk)
+                current_section, chunk = section, []
+            chunk.append(item)
+        flush(current_section, chunk)
+
+    def report(self, label: str, results: Dict, elapsed: float) -> None:
+        elapsed = max(elapsed, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: {results['created_count']} new games, {results['skipped_count']} already existed "
+            f"in {elapsed:.2f}s ({results['created_count'] / elapsed:.0f} games/s, "
+            f"{results['bytes'] / elapsed / 1024 / 1024:.2f} MB/s)"
+        ))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import PlayerMapHeatmap, PlayerSeason, Season
+from ...views.heatmaps import update_player_heatmaps
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every player's per-map heatmaps (PlayerMapHeatmap) from the stored game timelines. "
+        "Heatmaps are updated whenever a player's stats are, so this is only needed to fill them in "
+        "for games processed before they were added, or after storing timelines with store_game_timelines."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        for season in Season.objects.all():
+            update_player_heatmaps(PlayerSeason.objects.filter(season=season).values_list('id', flat=True))
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {PlayerMapHeatmap.objects.count()} heatmaps in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import SearchDocument
+from ...views.search_index import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the search index (SearchDocument) for every league, franchise, team season and player. "
+        "The index is kept up to date as data is saved, so this is only needed after writing to the "
+        "database some other way (e.g. raw SQL or loaddata)."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {SearchDocument.objects.count()} leagues, franchises, teams and players "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import Season, StandingsSnapshot, TeamSeason
+from ...views.stat_collection import update_standings_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the weekly standings snapshots (StandingsSnapshot) of every season. Snapshots are "
+        "updated along with standings, so this is only needed to fill them in for seasons whose "
+        "standings haven't been updated since they were added, or after writing to the database some "
+        "other way."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        for season in Season.objects.all():
+            update_standings_snapshots(season, list(TeamSeason.objects.filter(season=season).order_by('id')))
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {StandingsSnapshot.objects.count()} weekly standings in {time.perf_counter() - started:.2f}s"
+        ))
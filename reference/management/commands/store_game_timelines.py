@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from ...models import Game, GameTimeline
+from ...views.stat_collection import load_bulk_matches
+from ...views.timelines import build_game_timeline, store_game_timelines
+
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the timeline of every game's tagpro.eu match(es) from the tagpro.eu bulk export "
+        "(data/league_matches.json and data/bulkmaps.json), so stats can be recalculated without it. "
+        "Games processed from the export store their timelines as they go, so this is only needed "
+        "for games processed before timelines were stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Re-store timelines that are already stored, not just missing ones"
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stored_ids = set() if options["all"] else set(GameTimeline.objects.values_list('tagpro_eu', flat=True))
+        bulk_matches = load_bulk_matches()
+
+        timelines = []
+        stored = 0
+        missing = 0
+        games = Game.objects.filter(
+            models.Q(tagpro_eu__isnull=False) | models.Q(resumed_tagpro_eu__isnull=False)
+        ).only('id', 'tagpro_eu', 'resumed_tagpro_eu')
+        for game in games.iterator():
+            for match_id in (game.tagpro_eu, game.resumed_tagpro_eu):
+                if match_id is None or match_id in stored_ids:
+                    continue
+                m = bulk_matches.get(str(match_id))
+                if m is None:
+                    missing += 1
+                    continue
+                timelines.append(build_game_timeline(game, m))
+
+            if len(timelines) >= BATCH_SIZE:
+                store_game_timelines(timelines)
+                stored += len(timelines)
+                timelines = []
+        store_game_timelines(timelines)
+        stored += len(timelines)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stored} timelines in {time.perf_counter() - started:.2f}s "
+            f"({missing} tagpro.eu matches weren't in the bulk export)"
+        ))
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_team_records(apps, schema_editor):
+    """Calculate records for existing teams (mirrors stat_collection.update_team_records)."""
+    TeamSeason = apps.get_model('reference', 'TeamSeason')
+    TeamSeasonRecord = apps.get_model('reference', 'TeamSeasonRecord')
+    Game = apps.get_model('reference', 'Game')
+    other_side = {'W': 'L', 'L': 'W', 'OTW': 'OTL', 'OTL': 'OTW', 'T': 'T'}
+
+    records = {team_id: TeamSeasonRecord(team_id=team_id) for team_id in TeamSeason.objects.values_list('id', flat=True)}
+    games = Game.objects.filter(match__week__startswith="Week").values_list(
+        'match__team1_id', 'match__team2_id', 'outcome',
+        'team1_score', 'team2_score', 'team1_standing_points', 'team2_standing_points'
+    )
+    for team1_id, team2_id, outcome, team1_score, team2_score, team1_sp, team2_sp in games:
+        sides = (
+            (team1_id, outcome, team1_score, team2_score, team1_sp),
+            (team2_id, other_side.get(outcome, outcome), team2_score, team1_score, team2_sp),
+        )
+        for team_id, team_outcome, team_score, opponent_score, standing_points in sides:
+            record = records[team_id]
+            record.games_played += 1
+            record.standing_points += standing_points or 0
+            record.caps_for += team_score
+            record.caps_against += opponent_score
+            if not team_outcome:
+                if team_score > opponent_score:
+                    record.wins += 1
+                elif team_score < opponent_score:
+                    record.losses += 1
+            elif team_outcome == 'W':
+                record.wins += 1
+            elif team_outcome == 'OTW':
+                record.ot_wins += 1
+                record.caps_for -= 1
+            elif team_outcome == 'OTL':
+                record.ot_losses += 1
+                record.caps_against -= 1
+            elif team_outcome == 'L':
+                record.losses += 1
+    TeamSeasonRecord.objects.bulk_create(records.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0018_game_resumed_stats_count_until'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamSeasonRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('games_played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0, help_text='Regulation wins (or wins by score, for games with no outcome)')),
+                ('ot_wins', models.IntegerField(default=0)),
+                ('ot_losses', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0, help_text='Regulation losses (or losses by score, for games with no outcome)')),
+                ('standing_points', models.IntegerField(default=0)),
+                ('caps_for', models.IntegerField(default=0, help_text='Caps for, not counting OT game-winners')),
+                ('caps_against', models.IntegerField(default=0, help_text='Caps against, not counting OT game-winners')),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='record', to='reference.teamseason')),
+            ],
+        ),
+        migrations.RunPython(backfill_team_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0019_teamseasonrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='season',
+            name='data_updated_at',
+            field=models.DateTimeField(blank=True, help_text="When the season's games, stats or standings last changed", null=True),
+        ),
+        migrations.AddField(
+            model_name='season',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0, help_text="Incremented whenever the season's games, stats or standings change"),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:23
+
+from django.db import migrations, models
+
+
+# External content FTS5 table over search_text, using the trigram tokenizer for substring matching
+SQLITE_CREATE = [
+    """CREATE VIRTUAL TABLE reference_searchdocument_fts USING fts5(
+        search_text, content='reference_searchdocument', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER reference_searchdocument_fts_insert AFTER INSERT ON reference_searchdocument BEGIN
+        INSERT INTO reference_searchdocument_fts(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+    """CREATE TRIGGER reference_searchdocument_fts_delete AFTER DELETE ON reference_searchdocument BEGIN
+        INSERT INTO reference_searchdocument_fts(reference_searchdocument_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+    END""",
+    """CREATE TRIGGER reference_searchdocument_fts_update AFTER UPDATE ON reference_searchdocument BEGIN
+        INSERT INTO reference_searchdocument_fts(reference_searchdocument_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+        INSERT INTO reference_searchdocument_fts(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS reference_searchdocument_fts_insert",
+    "DROP TRIGGER IF EXISTS reference_searchdocument_fts_delete",
+    "DROP TRIGGER IF EXISTS reference_searchdocument_fts_update",
+    "DROP TABLE IF EXISTS reference_searchdocument_fts",
+]
+
+# Django's icontains compares UPPER(column), so that's what the trigram index is on
+POSTGRESQL_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX reference_searchdocument_trgm ON reference_searchdocument USING gin (UPPER(search_text) gin_trgm_ops)",
+]
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS reference_searchdocument_trgm",
+]
+
+
+def create_text_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in SQLITE_CREATE if vendor == 'sqlite' else POSTGRESQL_CREATE if vendor == 'postgresql' else []:
+        schema_editor.execute(sql)
+
+
+def drop_text_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in SQLITE_DROP if vendor == 'sqlite' else POSTGRESQL_DROP if vendor == 'postgresql' else []:
+        schema_editor.execute(sql)
+
+
+def backfill_search_documents(apps, schema_editor):
+    """Index existing leagues, franchises, teams and players (mirrors search_index.build_search_documents)."""
+    SearchDocument = apps.get_model('reference', 'SearchDocument')
+
+    def search_text(*terms):
+        return "\n".join(dict.fromkeys(term for term in terms if term))
+
+    documents = []
+    for kind, model_name in (('league', 'League'), ('franchise', 'Franchise')):
+        for id, name, abbr in apps.get_model('reference', model_name).objects.values_list('id', 'name', 'abbr'):
+            documents.append(SearchDocument(kind=kind, object_id=id, name=name, abbr=abbr, search_text=search_text(name, abbr)))
+
+    teams = apps.get_model('reference', 'TeamSeason').objects.values_list('id', 'name', 'abbr', 'season__name', 'season__end_date')
+    for id, name, abbr, season_name, end_date in teams:
+        documents.append(SearchDocument(
+            kind='team', object_id=id, name=name, abbr=abbr, season_name=season_name, sort_date=end_date,
+            search_text=search_text(name, abbr)
+        ))
+
+    aliases = {}
+    player_seasons = apps.get_model('reference', 'PlayerSeason').objects.values_list('player_id', 'playing_as').order_by('season__end_date')
+    for player_id, playing_as in player_seasons:
+        aliases.setdefault(player_id, []).append(playing_as)
+    for id, name in apps.get_model('reference', 'Player').objects.values_list('id', 'name'):
+        documents.append(SearchDocument(kind='player', object_id=id, name=name, search_text=search_text(name, *aliases.get(id, []))))
+
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0020_season_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('league', 'League'), ('franchise', 'Franchise'), ('team', 'Team'), ('player', 'Player')], max_length=10)),
+                ('object_id', models.IntegerField(help_text='ID of the League, Franchise, TeamSeason or Player')),
+                ('name', models.CharField(max_length=255)),
+                ('abbr', models.CharField(blank=True, max_length=10, null=True)),
+                ('season_name', models.CharField(blank=True, help_text="For teams, the season's name", max_length=255, null=True)),
+                ('sort_date', models.DateField(blank=True, help_text="For teams, the season's end date", null=True)),
+                ('search_text', models.TextField(help_text="Name, abbreviation and (for players) every name they've played as, one per line")),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_text_index, drop_text_index),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_season_summaries(apps, schema_editor):
+    """Store each season's summary (mirrors stat_collection.update_season_summary)."""
+    Season = apps.get_model('reference', 'Season')
+    TeamSeason = apps.get_model('reference', 'TeamSeason')
+    Match = apps.get_model('reference', 'Match')
+    championship_weeks = ['Super Ball', 'Muper Ball', 'Nuper Ball', 'Buper Ball']
+
+    seasons = list(Season.objects.all())
+    for season in seasons:
+        final_match = Match.objects.filter(
+            season=season, week__in=championship_weeks, playoff_series__isnull=False
+        ).select_related('playoff_series').first()
+        if final_match is None:
+            final_match = Match.objects.filter(
+                season=season, playoff_series__isnull=False
+            ).select_related('playoff_series').order_by('-date').first()
+
+        season.team_count = TeamSeason.objects.filter(season=season).count()
+        season.final_series = final_match.playoff_series if final_match else None
+        season.champion_id = season.final_series.winner_id if season.final_series else None
+        season.runner_up_id = None
+        if season.champion_id:
+            season.runner_up_id = final_match.team2_id if final_match.team1_id == season.champion_id else final_match.team1_id
+    Season.objects.bulk_update(seasons, ['team_count', 'final_series', 'champion', 'runner_up'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0021_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='season',
+            name='champion',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reference.teamseason'),
+        ),
+        migrations.AddField(
+            model_name='season',
+            name='final_series',
+            field=models.ForeignKey(blank=True, help_text="The championship series, or the latest playoff series if there isn't one", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reference.playoffseries'),
+        ),
+        migrations.AddField(
+            model_name='season',
+            name='runner_up',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reference.teamseason'),
+        ),
+        migrations.AddField(
+            model_name='season',
+            name='team_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_season_summaries, migrations.RunPython.noop),
+    ]
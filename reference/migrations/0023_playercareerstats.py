@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_career_stats(apps, schema_editor):
+    """Total every player's season stats (mirrors stat_collection.update_player_career_stats)."""
+    Player = apps.get_model('reference', 'Player')
+    PlayerSeasonStats = apps.get_model('reference', 'PlayerSeasonStats')
+    PlayerCareerStats = apps.get_model('reference', 'PlayerCareerStats')
+    stat_fields = [
+        "time_played", "tags", "pops", "grabs", "drops",
+        "hold", "captures", "prevent", "returns", "powerups",
+        "caps_for", "caps_against", "total_pups_in_game", "grabs_off_handoffs", "caps_off_handoffs",
+        "grabs_off_regrab", "caps_off_regrab", "long_holds", "flaccids", "handoffs",
+        "good_handoffs", "quick_returns", "returns_in_base", "saves", "key_returns",
+        "hold_against", "kept_flags"
+    ]
+
+    careers = {player_id: PlayerCareerStats(player_id=player_id) for player_id in Player.objects.values_list('id', flat=True)}
+    totals = PlayerSeasonStats.objects.filter(
+        player_season__season__league__gamemode="CTF"
+    ).values('player_season__player_id').annotate(
+        seasons_played=models.Count('id'),
+        **{f'{field}_sum': models.Sum(field) for field in stat_fields}
+    ).order_by()
+    for row in totals:
+        career = careers[row['player_season__player_id']]
+        career.seasons_played = row['seasons_played']
+        for field in stat_fields:
+            setattr(career, field, row[f'{field}_sum'] or 0)
+    PlayerCareerStats.objects.bulk_create(careers.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0022_season_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerCareerStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seasons_played', models.IntegerField(default=0)),
+                ('time_played', models.IntegerField(default=0, help_text='Time played in ticks (1/60th of a second)')),
+                ('tags', models.IntegerField(default=0)),
+                ('pops', models.IntegerField(default=0)),
+                ('grabs', models.IntegerField(default=0)),
+                ('drops', models.IntegerField(default=0)),
+                ('hold', models.IntegerField(default=0, help_text='Hold time in ticks (1/60th of a second)')),
+                ('captures', models.IntegerField(default=0)),
+                ('prevent', models.IntegerField(default=0, help_text='Prevent time in ticks (1/60th of a second)')),
+                ('returns', models.IntegerField(default=0)),
+                ('powerups', models.IntegerField(default=0)),
+                ('caps_for', models.IntegerField(default=0)),
+                ('caps_against', models.IntegerField(default=0)),
+                ('total_pups_in_game', models.IntegerField(default=0)),
+                ('grabs_off_handoffs', models.IntegerField(default=0)),
+                ('caps_off_handoffs', models.IntegerField(default=0)),
+                ('grabs_off_regrab', models.IntegerField(default=0)),
+                ('caps_off_regrab', models.IntegerField(default=0)),
+                ('long_holds', models.IntegerField(default=0)),
+                ('flaccids', models.IntegerField(default=0)),
+                ('handoffs', models.IntegerField(default=0)),
+                ('good_handoffs', models.IntegerField(default=0)),
+                ('quick_returns', models.IntegerField(default=0)),
+                ('returns_in_base', models.IntegerField(default=0)),
+                ('saves', models.IntegerField(default=0)),
+                ('key_returns', models.IntegerField(default=0)),
+                ('hold_against', models.IntegerField(default=0)),
+                ('kept_flags', models.IntegerField(default=0)),
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='career_stats', to='reference.player')),
+            ],
+        ),
+        migrations.RunPython(backfill_career_stats, migrations.RunPython.noop),
+    ]
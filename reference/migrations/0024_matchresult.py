@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_match_results(apps, schema_editor):
+    """Calculate box scores for existing matches (mirrors stat_collection.build_match_result)."""
+    Match = apps.get_model('reference', 'Match')
+    MatchResult = apps.get_model('reference', 'MatchResult')
+    PlayoffSeries = apps.get_model('reference', 'PlayoffSeries')
+
+    playoff_match_ids = set(PlayoffSeries.objects.filter(match__isnull=False).values_list('match_id', flat=True))
+    results = []
+    for match in Match.objects.prefetch_related('games'):
+        is_playoff = match.id in playoff_match_ids
+        team1_total = 0
+        team2_total = 0
+        game_results = []
+        for game in match.games.all():
+            if game.team1_score > game.team2_score:
+                winner = 'team1'
+            elif game.team2_score > game.team1_score:
+                winner = 'team2'
+            else:
+                winner = 'tie'
+
+            if not is_playoff:
+                team1_total += game.team1_standing_points or 0
+                team2_total += game.team2_standing_points or 0
+            elif winner == 'team1':
+                team1_total += 1
+            elif winner == 'team2':
+                team2_total += 1
+
+            game_results.append([game.game_in_match, game.team1_score, game.team2_score, winner, game.outcome in ('OTW', 'OTL')])
+
+        results.append(MatchResult(
+            match=match,
+            is_playoff=is_playoff,
+            team1_total=team1_total,
+            team2_total=team2_total,
+            winner='team1' if team1_total > team2_total else 'team2' if team2_total > team1_total else 'tie',
+            games=game_results,
+        ))
+    MatchResult.objects.bulk_create(results, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0023_playercareerstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_playoff', models.BooleanField(default=False)),
+                ('team1_total', models.IntegerField(default=0, help_text='Series wins for playoff matches, standing points otherwise')),
+                ('team2_total', models.IntegerField(default=0, help_text='Series wins for playoff matches, standing points otherwise')),
+                ('winner', models.CharField(default='tie', help_text="'team1', 'team2' or 'tie'", max_length=5)),
+                ('games', models.JSONField(default=list, help_text='[game number, team1 score, team2 score, winner, went to OT] for each game, in order')),
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result', to='reference.match')),
+            ],
+        ),
+        migrations.RunPython(backfill_match_results, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0024_matchresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.CharField(max_length=100)),
+                ('week_index', models.IntegerField(help_text='Position of the week in the regular season, from 0, in the order the weeks were played')),
+                ('standings', models.JSONField(default=list, help_text='[team season ID, games played, wins, OT wins, OT losses, losses, standing points, caps for, caps against] for each team, in seed order')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings_snapshots', to='reference.season')),
+            ],
+            options={
+                'ordering': ['week_index'],
+                'unique_together': {('season', 'week')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0025_standingssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameTimeline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tagpro_eu', models.IntegerField(unique=True)),
+                ('red_team_name', models.CharField(max_length=255)),
+                ('blue_team_name', models.CharField(max_length=255)),
+                ('red_score', models.IntegerField()),
+                ('blue_score', models.IntegerField()),
+                ('map_width', models.IntegerField(help_text='Width of the map in tiles')),
+                ('map_height', models.IntegerField(help_text='Height of the map in tiles')),
+                ('flag_tiles', models.JSONField(default=list, help_text="[x, y] of the red flag's tile and of the blue flag's tile (null if the map doesn't have one)")),
+                ('players', models.JSONField(default=list, help_text='Names of everyone who played in the match; events and splats refer to players by their index in this list')),
+                ('events', models.BinaryField(help_text='Compressed columns of tick, event code, player index and team, one row per event, in timeline order')),
+                ('splats', models.BinaryField(help_text='Compressed columns of tick, x and y (in pixels), player index and team, one row per splat, in time order')),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timelines', to='reference.game')),
+            ],
+        ),
+    ]
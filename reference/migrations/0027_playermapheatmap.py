@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference', '0026_gametimeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerMapHeatmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('map_name', models.CharField(max_length=255)),
+                ('games_played', models.IntegerField(default=0)),
+                ('width', models.IntegerField(help_text='Width of the grids in tiles')),
+                ('height', models.IntegerField(help_text='Height of the grids in tiles')),
+                ('pops', models.BinaryField(help_text='Compressed height x width grid of the number of times the player was popped on each tile')),
+                ('drops', models.BinaryField(help_text='Compressed height x width grid of the number of times the player was popped holding the flag on each tile')),
+                ('returns', models.BinaryField(help_text='Compressed height x width grid of the number of times the player returned the flag on each tile')),
+                ('player_season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='map_heatmaps', to='reference.playerseason')),
+            ],
+            options={
+                'unique_together': {('player_season', 'map_name')},
+            },
+        ),
+    ]
@@ -43,6 +43,13 @@ class Season(models.Model):
     name = models.CharField(max_length=255, help_text="e.g., NLTP S36")
     league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="seasons")
     end_date = models.DateField(blank=True, null=True)
+    data_version = models.PositiveIntegerField(default=0, help_text="Incremented whenever the season's games, stats or standings change")
+    data_updated_at = models.DateTimeField(blank=True, null=True, help_text="When the season's games, stats or standings last changed")
+    # Summary for league_history, kept up to date by stat_collection.update_season_summary
+    team_count = models.PositiveIntegerField(default=0)
+    final_series = models.ForeignKey('PlayoffSeries', on_delete=models.SET_NULL, blank=True, null=True, related_name="+", help_text="The championship series, or the latest playoff series if there isn't one")
+    champion = models.ForeignKey('TeamSeason', on_delete=models.SET_NULL, blank=True, null=True, related_name="+")
+    runner_up = models.ForeignKey('TeamSeason', on_delete=models.SET_NULL, blank=True, null=True, related_name="+")
 
     def __str__(self):
         return self.name
@@ -153,6 +160,28 @@ class Game(models.Model):
     def __str__(self):
         return f"{self.match}, {self.game_in_match} ({self.tagpro_eu})"
 
+class GameTimeline(models.Model):
+    """
+    Represents the event timeline and splats of one tagpro.eu match of a game (two, for a game that
+    was paused and resumed), packed into compact columnar blobs by views/timelines.py so stats can be
+    recalculated without the tagpro.eu bulk export.
+    """
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="timelines")
+    tagpro_eu = models.IntegerField(unique=True)
+    red_team_name = models.CharField(max_length=255)
+    blue_team_name = models.CharField(max_length=255)
+    red_score = models.IntegerField()
+    blue_score = models.IntegerField()
+    map_width = models.IntegerField(help_text="Width of the map in tiles")
+    map_height = models.IntegerField(help_text="Height of the map in tiles")
+    flag_tiles = models.JSONField(default=list, help_text="[x, y] of the red flag's tile and of the blue flag's tile (null if the map doesn't have one)")
+    players = models.JSONField(default=list, help_text="Names of everyone who played in the match; events and splats refer to players by their index in this list")
+    events = models.BinaryField(help_text="Compressed columns of tick, event code, player index and team, one row per event, in timeline order")
+    splats = models.BinaryField(help_text="Compressed columns of tick, x and y (in pixels), player index and team, one row per splat, in time order")
+
+    def __str__(self):
+        return f"Timeline of {self.tagpro_eu} ({self.game})"
+
 class PlayerGameLog(models.Model):
     """
     Represents an individual player's participation in a single game.
@@ -315,6 +344,133 @@ class PlayerSeasonStats(models.Model):
     def __str__(self):
         return f"Stats for {self.player_season.playing_as} in {self.player_season.season.name}"
 
+class TeamSeasonRecord(models.Model):
+    """
+    Represents a team's regular season record, denormalized from its games.
+    """
+    team = models.OneToOneField(TeamSeason, on_delete=models.CASCADE, related_name="record")
+    games_played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0, help_text="Regulation wins (or wins by score, for games with no outcome)")
+    ot_wins = models.IntegerField(default=0)
+    ot_losses = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0, help_text="Regulation losses (or losses by score, for games with no outcome)")
+    standing_points = models.IntegerField(default=0)
+    caps_for = models.IntegerField(default=0, help_text="Caps for, not counting OT game-winners")
+    caps_against = models.IntegerField(default=0, help_text="Caps against, not counting OT game-winners")
+
+    @property
+    def record(self):
+        return f"{self.wins}-{self.ot_wins}-{self.ot_losses}-{self.losses}"
+
+    @property
+    def cap_differential(self):
+        return self.caps_for - self.caps_against
+
+    def __str__(self):
+        return f"Record for {self.team}"
+
+class StandingsSnapshot(models.Model):
+    """
+    Represents a season's regular season standings as they stood at the end of one week, denormalized
+    from its games so past standings can be looked up without replaying the season.
+    """
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="standings_snapshots")
+    week = models.CharField(max_length=100)
+    week_index = models.IntegerField(help_text="Position of the week in the regular season, from 0, in the order the weeks were played")
+    standings = models.JSONField(default=list, help_text="[team season ID, games played, wins, OT wins, OT losses, losses, standing points, caps for, caps against] for each team, in seed order")
+
+    class Meta:
+        ordering = ['week_index']
+        unique_together = ('season', 'week')
+
+    def __str__(self):
+        return f"Standings after {self.week} of {self.season}"
+
+class MatchResult(models.Model):
+    """
+    Represents a match's box score, denormalized from its games for the schedule views.
+    """
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name="result")
+    is_playoff = models.BooleanField(default=False)
+    team1_total = models.IntegerField(default=0, help_text="Series wins for playoff matches, standing points otherwise")
+    team2_total = models.IntegerField(default=0, help_text="Series wins for playoff matches, standing points otherwise")
+    winner = models.CharField(max_length=5, default='tie', help_text="'team1', 'team2' or 'tie'")
+    games = models.JSONField(default=list, help_text="[game number, team1 score, team2 score, winner, went to OT] for each game, in order")
+
+    @property
+    def game_results(self):
+        return [
+            {
+                'team1_score': team1_score,
+                'team2_score': team2_score,
+                'winner': winner,
+                'is_overtime': is_overtime,
+                'game_number': game_number,
+            }
+            for game_number, team1_score, team2_score, winner, is_overtime in self.games
+        ]
+
+    def __str__(self):
+        return f"Result of {self.match}"
+
+class PlayerCareerStats(models.Model):
+    """
+    Represents an individual player's regular season stat totals across every CTF season they've
+    played, denormalized from their season stats.
+    """
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, related_name="career_stats")
+    seasons_played = models.IntegerField(default=0)
+    time_played = models.IntegerField(default=0, help_text="Time played in ticks (1/60th of a second)")
+    tags = models.IntegerField(default=0)
+    pops = models.IntegerField(default=0)
+    grabs = models.IntegerField(default=0)
+    drops = models.IntegerField(default=0)
+    hold = models.IntegerField(default=0, help_text="Hold time in ticks (1/60th of a second)")
+    captures = models.IntegerField(default=0)
+    prevent = models.IntegerField(default=0, help_text="Prevent time in ticks (1/60th of a second)")
+    returns = models.IntegerField(default=0)
+    powerups = models.IntegerField(default=0)
+    caps_for = models.IntegerField(default=0)
+    caps_against = models.IntegerField(default=0)
+    total_pups_in_game = models.IntegerField(default=0)
+    grabs_off_handoffs = models.IntegerField(default=0)
+    caps_off_handoffs = models.IntegerField(default=0)
+    grabs_off_regrab = models.IntegerField(default=0)
+    caps_off_regrab = models.IntegerField(default=0)
+    long_holds = models.IntegerField(default=0)
+    flaccids = models.IntegerField(default=0)
+    handoffs = models.IntegerField(default=0)
+    good_handoffs = models.IntegerField(default=0)
+    quick_returns = models.IntegerField(default=0)
+    returns_in_base = models.IntegerField(default=0)
+    saves = models.IntegerField(default=0)
+    key_returns = models.IntegerField(default=0)
+    hold_against = models.IntegerField(default=0)
+    kept_flags = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Career stats for {self.player}"
+
+class PlayerMapHeatmap(models.Model):
+    """
+    Represents where on one map an individual player was popped, dropped the flag and returned the
+    flag over a season, binned by map tile from the splats in their games' stored timelines.
+    """
+    player_season = models.ForeignKey(PlayerSeason, on_delete=models.CASCADE, related_name="map_heatmaps")
+    map_name = models.CharField(max_length=255)
+    games_played = models.IntegerField(default=0)
+    width = models.IntegerField(help_text="Width of the grids in tiles")
+    height = models.IntegerField(help_text="Height of the grids in tiles")
+    pops = models.BinaryField(help_text="Compressed height x width grid of the number of times the player was popped on each tile")
+    drops = models.BinaryField(help_text="Compressed height x width grid of the number of times the player was popped holding the flag on each tile")
+    returns = models.BinaryField(help_text="Compressed height x width grid of the number of times the player returned the flag on each tile")
+
+    class Meta:
+        unique_together = ('player_season', 'map_name')
+
+    def __str__(self):
+        return f"Heatmap for {self.player_season.playing_as} on {self.map_name} in {self.player_season.season.name}"
+
 class AwardType(models.Model):
     """
     Represents a type of award.
@@ -365,3 +521,28 @@ class Transaction(models.Model):
 
     def __str__(self):
         return f"{self.date}: {self.team.name} {self.transaction_type.title()}s {self.player_season.playing_as} ({self.team.season.name})"
+
+class SearchDocument(models.Model):
+    """
+    Denormalized search entry for a league, franchise, team season or player, so a search can be
+    answered from a single indexed table. Kept up to date by signals and the importers.
+    """
+    KINDS = [
+        ('league', 'League'),
+        ('franchise', 'Franchise'),
+        ('team', 'Team'),
+        ('player', 'Player'),
+    ]
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.IntegerField(help_text="ID of the League, Franchise, TeamSeason or Player")
+    name = models.CharField(max_length=255)
+    abbr = models.CharField(max_length=10, blank=True, null=True)
+    season_name = models.CharField(max_length=255, blank=True, null=True, help_text="For teams, the season's name")
+    sort_date = models.DateField(blank=True, null=True, help_text="For teams, the season's end date")
+    search_text = models.TextField(help_text="Name, abbreviation and (for players) every name they've played as, one per line")
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.name}"
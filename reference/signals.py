@@ -0,0 +1,140 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .context_processors import NAVIGATION_LEAGUES_KEY
+from .models import League, Franchise, Player, Season, TeamSeason, PlayerSeason, Match, PlayoffSeries, Game
+from .views.cache_versions import bump_navigation_version, bump_season_data_versions, bump_standings_version
+from .views.search_index import update_search_documents
+from .views.stat_collection import update_match_results, update_player_career_stats, update_season_summary
+
+
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+@receiver(post_save, sender=Season)
+@receiver(post_delete, sender=Season)
+def invalidate_league_caches(sender, **kwargs):
+    """
+    Leagues and seasons decide what the nav bar and season dropdowns link to and which seasons the
+    homepage shows standings for, so drop the cached nav data and move cached pages on to a new version.
+    """
+    cache.delete(NAVIGATION_LEAGUES_KEY)
+    bump_standings_version()
+    bump_navigation_version()
+
+
+@receiver(post_save, sender=TeamSeason)
+@receiver(post_delete, sender=TeamSeason)
+@receiver(post_save, sender=PlayerSeason)
+@receiver(post_delete, sender=PlayerSeason)
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def invalidate_season_pages(sender, instance, **kwargs):
+    """
+    Edits made outside the stat pipeline (e.g. in the admin) change what the season's pages show, so
+    bump its data version. Bulk writes don't send signals; the pipeline bumps the version itself.
+    """
+    bump_season_data_versions(Season.objects.filter(pk=instance.season_id))
+
+
+@receiver(post_save, sender=TeamSeason)
+@receiver(post_delete, sender=TeamSeason)
+def invalidate_homepage_standings(sender, **kwargs):
+    """The homepage's cached standings show each team's name, and are only keyed on the standings version."""
+    bump_standings_version()
+
+
+@receiver(post_save, sender=TeamSeason)
+@receiver(post_delete, sender=TeamSeason)
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def update_season_summary_for_edit(sender, instance, **kwargs):
+    """Adding or removing a team or editing a playoff match can change the season's summary."""
+    season = Season.objects.filter(pk=instance.season_id).first()
+    if season is not None:
+        update_season_summary(season)
+
+
+@receiver(post_save, sender=PlayoffSeries)
+@receiver(post_delete, sender=PlayoffSeries)
+def update_season_summary_for_series_edit(sender, instance, **kwargs):
+    """A series' winner decides the season's champion and runner-up if it's the final."""
+    for season in Season.objects.filter(matches__id=instance.match_id):
+        update_season_summary(season)
+
+
+@receiver(post_save, sender=PlayerSeason)
+@receiver(post_delete, sender=PlayerSeason)
+def update_career_stats_for_edit(sender, instance, **kwargs):
+    """Moving a season to another player or deleting it changes the player's career totals."""
+    update_player_career_stats([instance.player_id])
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+@receiver(post_save, sender=PlayoffSeries)
+@receiver(post_delete, sender=PlayoffSeries)
+def invalidate_game_season_pages(sender, instance, **kwargs):
+    """Games and playoff series belong to a season through their match, and edits to either change its pages."""
+    bump_season_data_versions(Season.objects.filter(matches__id=instance.match_id))
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+@receiver(post_save, sender=PlayoffSeries)
+@receiver(post_delete, sender=PlayoffSeries)
+@receiver(post_save, sender=Match)
+def update_match_result(sender, instance, **kwargs):
+    """
+    Recalculate the box score of a match whose games, series or teams changed. This waits for the
+    transaction to commit, so a match deleted along with its games isn't given a new result.
+    """
+    match_id = instance.pk if sender is Match else instance.match_id
+    transaction.on_commit(lambda: update_match_results(Match.objects.filter(pk=match_id)))
+
+
+@receiver(post_save, sender=Franchise)
+@receiver(post_save, sender=Player)
+def invalidate_renamed_seasons(sender, instance, created, **kwargs):
+    """
+    Franchise and player names show up on the pages of every season they played in. The cached
+    homepage standings are keyed only on the standings version, so a franchise edit moves that on too.
+    """
+    if created:
+        return
+    if sender is Franchise:
+        bump_season_data_versions(Season.objects.filter(teams__franchise=instance))
+        bump_standings_version()
+    else:
+        bump_season_data_versions(Season.objects.filter(player_seasons__player=instance))
+
+
+SEARCH_DOCUMENT_KINDS = {League: 'league', Franchise: 'franchise', TeamSeason: 'team', Player: 'player'}
+
+
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+@receiver(post_save, sender=Franchise)
+@receiver(post_delete, sender=Franchise)
+@receiver(post_save, sender=TeamSeason)
+@receiver(post_delete, sender=TeamSeason)
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def update_search_document(sender, instance, **kwargs):
+    """Re-index a saved object, or remove a deleted one from the search index."""
+    update_search_documents(SEARCH_DOCUMENT_KINDS[sender], [instance.pk])
+
+
+@receiver(post_save, sender=PlayerSeason)
+@receiver(post_delete, sender=PlayerSeason)
+def update_player_aliases(sender, instance, **kwargs):
+    """Players can be searched for by every name they've played as."""
+    update_search_documents('player', [instance.player_id])
+
+
+@receiver(post_save, sender=Season)
+def update_season_teams(sender, instance, created, **kwargs):
+    """Team search results show the season's name and are sorted by its end date."""
+    if not created:
+        update_search_documents('team', instance.teams.values_list('id', flat=True))
@@ -0,0 +1,53 @@
+/**
+ * Search bar autocomplete
+ * Usage: Call initSearchSuggestions(input) on a search input. As the user types, suggestions from
+ * /search/suggest/ fill a datalist under the input; getSuggestionUrl(input) returns the page of
+ * the suggestion the input currently holds, if any, so submitting it can go straight there.
+ */
+
+const SUGGEST_URL = '/search/suggest/';
+const SUGGEST_DELAY_MS = 80;
+const MIN_SUGGEST_LENGTH = 2;
+
+function initSearchSuggestions(input) {
+    const datalist = document.createElement('datalist');
+    datalist.id = `${input.className}-suggestions`;
+    input.after(datalist);
+    input.setAttribute('list', datalist.id);
+    input.setAttribute('autocomplete', 'off');
+    input.suggestionUrls = new Map();
+
+    let timer = null;
+    let request = null;
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        const query = input.value.trim();
+        // Picking a suggestion fires input too; there's nothing new to suggest
+        if (query.length < MIN_SUGGEST_LENGTH || input.suggestionUrls.has(query)) {
+            return;
+        }
+
+        timer = setTimeout(() => {
+            if (request) {
+                request.abort();
+            }
+            request = new AbortController();
+            fetch(`${SUGGEST_URL}?q=${encodeURIComponent(query)}`, { signal: request.signal })
+                .then((response) => response.json())
+                .then((data) => {
+                    input.suggestionUrls.clear();
+                    datalist.replaceChildren(...data.suggestions.map((suggestion) => {
+                        const option = document.createElement('option');
+                        option.value = suggestion.detail ? `${suggestion.name} (${suggestion.detail})` : suggestion.name;
+                        input.suggestionUrls.set(option.value, suggestion.url);
+                        return option;
+                    }));
+                })
+                .catch(() => {});
+        }, SUGGEST_DELAY_MS);
+    });
+}
+
+function getSuggestionUrl(input) {
+    return input.suggestionUrls ? input.suggestionUrls.get(input.value.trim()) : undefined;
+}
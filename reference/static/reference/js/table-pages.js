@@ -0,0 +1,89 @@
+/**
+ * Server-side table sorting, filtering and pagination
+ * Usage: Call initTablePages(containerSelector, filterFormSelector) on a container whose links
+ * marked with data-table-link (sort headers, page links) point at the same view with new query
+ * params. Those links are loaded with ?partial=1 and only the container's contents are replaced.
+ */
+
+class TablePages {
+    constructor(container, filterForm) {
+        this.container = container;
+        this.filterForm = filterForm;
+        this.request = null;
+        
+        this.init();
+    }
+    
+    init() {
+        // Links are real URLs, so everything still works without JS; just load them in place
+        this.container.addEventListener('click', (event) => {
+            const link = event.target.closest('a[data-table-link]');
+            if (!link || event.ctrlKey || event.metaKey || event.shiftKey) {
+                return;
+            }
+            event.preventDefault();
+            this.load(new URL(link.href, window.location));
+        });
+        
+        if (this.filterForm) {
+            this.filterForm.addEventListener('submit', (event) => {
+                event.preventDefault();
+                // Keep the current sort, but go back to the first page
+                const url = new URL(window.location);
+                new FormData(this.filterForm).forEach((value, key) => url.searchParams.set(key, value));
+                url.searchParams.delete('page');
+                this.load(url);
+            });
+        }
+        
+        window.addEventListener('popstate', () => this.load(new URL(window.location), false));
+    }
+    
+    async load(url, pushState = true) {
+        const partialUrl = new URL(url);
+        partialUrl.searchParams.set('partial', '1');
+        
+        // Only the most recent request gets to update the table
+        if (this.request) {
+            this.request.abort();
+        }
+        this.request = new AbortController();
+        this.container.classList.add('loading');
+        
+        try {
+            const response = await fetch(partialUrl, { signal: this.request.signal });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            this.container.innerHTML = await response.text();
+            if (pushState) {
+                window.history.pushState(null, '', url);
+            }
+        } catch (error) {
+            if (error.name === 'AbortError') {
+                return;
+            }
+            // Fall back to a full page load
+            window.location.href = url.toString();
+        } finally {
+            this.container.classList.remove('loading');
+        }
+    }
+}
+
+// Global function to initialize server-side table pages
+function initTablePages(containerSelector, filterFormSelector = null) {
+    const container = document.querySelector(containerSelector);
+    if (!container) {
+        console.warn(`Table container not found: ${containerSelector}`);
+        return null;
+    }
+    
+    const filterForm = filterFormSelector ? document.querySelector(filterFormSelector) : null;
+    return new TablePages(container, filterForm);
+}
+
+// Export for module usage if needed
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = { TablePages, initTablePages };
+}
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import data_entry, info_pages
+from .views import api, data_entry, info_pages
 
 urlpatterns = [
     path('', info_pages.homepage, name='homepage'),
+    path('search/suggest/', info_pages.search_suggestions, name='search_suggestions'),
     path('search/<str:query>/', info_pages.search_results, name='search_results'),
     path('league/<int:league_id>/', info_pages.league_history, name='league_history'),
     path('season/<int:season_id>/', info_pages.season_home, name='season_home'),
@@ -16,4 +17,9 @@ urlpatterns = [
     path('import/eu/', data_entry.import_from_eus, name='import_data'),
     path('import/preprocess/', data_entry.preprocess_eu_links, name='preprocess_eu_links'),
     path('import/json/', data_entry.import_from_json, name='import_from_json'),
+    path('api/v1/seasons/<int:season_id>/standings/', api.season_standings, name='api_season_standings'),
+    path('api/v1/seasons/<int:season_id>/stats/', api.season_stats, name='api_season_stats'),
+    path('api/v1/matches/<int:match_id>/', api.match_detail, name='api_match_detail'),
+    path('api/v1/players/<int:player_id>/', api.player_career, name='api_player_career'),
+    path('api/v1/players/<int:player_id>/heatmap/', api.player_heatmap, name='api_player_heatmap'),
 ]
\ No newline at end of file
@@ -0,0 +1,297 @@
+from django.db import models
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import condition, require_safe
+from typing import Callable, Dict, Optional
+from .cache_versions import DataVersion, get_match_data_version, get_player_data_version, get_season_data_version
+from .heatmaps import HEATMAP_KINDS, get_player_heatmap, render_heatmap_png
+from .info_pages import get_match_box_score, get_match_game_stats, get_match_team_stats, get_player_history, get_season_player_stats, get_season_standings, get_season_weeks
+from .stat_collection import STAT_FIELDS
+from .stat_tables import STAT_COLUMNS, get_table_options, sort_and_paginate
+from ..models import Season, TeamSeason, Player, PlayerCareerStats, PlayerMapHeatmap, Match, Game
+
+
+API_VERSION = "v1"
+
+# Player stat fields included for each player in a match box score
+MATCH_STAT_FIELDS = ['time_played_min', 'tags', 'pops', 'grabs', 'drops', 'hold_sec', 'captures', 'prevent_sec', 'returns', 'powerups']
+
+# Pixels per map tile in heatmap PNGs
+DEFAULT_HEATMAP_SCALE = 8
+MAX_HEATMAP_SCALE = 40
+
+
+def conditional(get_version: Callable[..., Optional[DataVersion]]):
+    """
+    Decorate an API view to send ETag and Last-Modified headers and answer conditional requests
+    (If-None-Match, If-Modified-Since) with 304 Not Modified before the view runs.
+
+    get_version is one of the data version getters in cache_versions.py, called with the view's URL
+    kwargs. They only read Season.data_version, never the stat tables.
+    """
+    def version(req, **kwargs):
+        # Django asks for the ETag and Last-Modified separately, so only look the version up once
+        if not hasattr(req, '_api_data_version'):
+            req._api_data_version = get_version(**kwargs)
+        return req._api_data_version
+
+    def etag(req, **kwargs):
+        data_version = version(req, **kwargs)
+        return f"{API_VERSION}-{data_version[0]}" if data_version else None
+
+    def last_modified(req, **kwargs):
+        data_version = version(req, **kwargs)
+        return data_version[1] if data_version else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def serialize_season(season: Season) -> Dict:
+    return {
+        'id': season.id,
+        'name': season.name,
+        'league': season.league.abbr,
+        'end_date': season.end_date.isoformat() if season.end_date else None,
+    }
+
+
+def serialize_team(team: Optional[TeamSeason]) -> Optional[Dict]:
+    if team is None:
+        return None
+    return {
+        'id': team.id,
+        'name': team.name,
+        'abbr': team.abbr,
+        'franchise_id': team.franchise_id,
+    }
+
+
+def api_error(message: str, status: int = 400) -> JsonResponse:
+    return JsonResponse({'error': message}, status=status)
+
+
+@require_safe
+@conditional(get_season_data_version)
+def season_standings(req, season_id):
+    """Regular season standings for a season, in seed order."""
+    season = Season.objects.select_related('league').filter(id=season_id).first()
+    if season is None:
+        return api_error("Season not found", status=404)
+
+    standings = []
+    for standing in get_season_standings(season):
+        team = standing.pop('team')
+        standings.append({'team': serialize_team(team), **standing})
+
+    return JsonResponse({
+        'season': serialize_season(season),
+        'standings': standings,
+    })
+
+
+@require_safe
+@conditional(get_season_data_version)
+def season_stats(req, season_id):
+    """
+    Player stats for a season, with the same week filters (week), stat views (view), sorting (sort,
+    dir) and minimum minutes played (min_minutes) as the season stats page, but every player at once.
+    """
+    season = Season.objects.select_related('league').filter(id=season_id).first()
+    if season is None:
+        return api_error("Season not found", status=404)
+    week_filter = req.GET.get('week', 'all_regular_season')
+    stat_view = req.GET.get('view', 'basic')
+    if stat_view not in STAT_COLUMNS:
+        return api_error(f"Unknown view '{stat_view}'. Views: {', '.join(STAT_COLUMNS)}")
+
+    frame = get_season_player_stats(season, week_filter, get_season_weeks(season))
+    columns = STAT_COLUMNS[stat_view]
+    table_options = get_table_options(req.GET, columns, default_sort='time_played_min')
+    rows = sort_and_paginate(frame, {**table_options, 'page': 1}, page_size=max(len(frame.rows), 1))
+
+    column_values = {column['key']: frame.to_list(column['key']) for column in columns}
+    players = []
+    for i in rows.object_list:
+        player_stat = frame.rows[i]
+        players.append({
+            'player_id': player_stat['player_id'],
+            'playing_as': player_stat['playing_as'],
+            'team': {'id': player_stat['team_id'], 'abbr': player_stat['team_abbr']} if player_stat['team_id'] else None,
+            'stats': {key: values[i] for key, values in column_values.items()},
+        })
+
+    return JsonResponse({
+        'season': serialize_season(season),
+        'week': week_filter,
+        'view': stat_view,
+        'columns': [{'key': column['key'], 'label': column['label']} for column in columns],
+        'players': players,
+    })
+
+
+@require_safe
+@conditional(get_match_data_version)
+def match_detail(req, match_id):
+    """Box score and player stats for a match, for every game or a single one (game=<number>)."""
+    match = Match.objects.select_related('season__league', 'team1', 'team2').filter(id=match_id).first()
+    if match is None:
+        return api_error("Match not found", status=404)
+    games = list(Game.objects.filter(match=match).select_related(
+        'red_team__franchise', 'blue_team__franchise'
+    ).order_by('game_in_match'))
+
+    selected_game = req.GET.get('game', 'all')
+    if selected_game == 'all':
+        stats_game_ids = None
+    else:
+        try:
+            game_in_match = f"Game {int(selected_game)}"
+        except ValueError:
+            return api_error(f"Invalid game '{selected_game}'")
+        stats_game_ids = {game.id for game in games if game.game_in_match == game_in_match}
+
+    box_score = get_match_box_score(match, games)
+    box_score_games = [
+        {
+            'id': game_score['game'].id,
+            'game_in_match': game_score['game'].game_in_match,
+            'map_name': game_score['game'].map_name,
+            'tagpro_eu': game_score['game'].tagpro_eu,
+            'outcome': game_score['game'].outcome,
+            'team1_score': game_score['team1_score'],
+            'team2_score': game_score['team2_score'],
+            'team1_is_red': game_score['team1_is_red'],
+            'winner': game_score['winner'],
+            'is_overtime': game_score['is_overtime'],
+        }
+        for game_score in box_score.pop('box_score_games')
+    ]
+
+    game_stats = get_match_game_stats(match)
+    player_stats = {}
+    team_totals = {}
+    for side, team in (('team1', match.team1), ('team2', match.team2)):
+        team_stats = get_match_team_stats(game_stats, team, stats_game_ids)
+        player_stats[side] = [
+            {
+                'player_id': stat['player_season__player__id'],
+                'name': stat['player_season__player__name'],
+                'playing_as': stat['player_season__playing_as'],
+                **{field: stat.get(field) or 0 for field in MATCH_STAT_FIELDS},
+            }
+            for stat in team_stats['players']
+        ]
+        team_totals[side] = {field: team_stats['totals'].get(field) or 0 for field in MATCH_STAT_FIELDS}
+
+    return JsonResponse({
+        'match': {
+            'id': match.id,
+            'season': serialize_season(match.season),
+            'week': match.week,
+            'date': match.date.isoformat(),
+            'team1': serialize_team(match.team1),
+            'team2': serialize_team(match.team2),
+        },
+        'games': box_score_games,
+        **box_score,
+        'game': selected_game,
+        'player_stats': player_stats,
+        'team_totals': team_totals,
+    })
+
+
+@require_safe
+@conditional(get_player_data_version)
+def player_career(req, player_id):
+    """
+    A player's season-by-season career totals, optionally for a single league (league=<id>), with
+    totals across those seasons and in each league, plus their stored career totals of every stat.
+    """
+    player = Player.objects.filter(id=player_id).first()
+    if player is None:
+        return api_error("Player not found", status=404)
+    league_filter = req.GET.get('league', 'all')
+
+    history = get_player_history(player, league_filter)
+    seasons = []
+    for row in history['seasons']:
+        seasons.append({
+            'season': serialize_season(row['season']),
+            'team': serialize_team(row['team']),
+            'rank': row['rank'] if row['team'] else None,
+            'playoff_finish': row['playoff_finish'] if row['team'] else None,
+            'minutes_played': row['minutes_played'],
+            'captures': row['captures'],
+            'hold_sec': row['hold_sec'],
+            'prevent_sec': row['prevent_sec'],
+            'returns': row['returns'],
+        })
+
+    totals_fields = ['seasons', 'minutes_played', 'captures', 'hold_sec', 'prevent_sec', 'returns']
+    return JsonResponse({
+        'player': {'id': player.id, 'name': player.name},
+        'seasons': seasons,
+        'career': {field: history['career'][field] for field in totals_fields} if history['career'] else None,
+        'leagues': [
+            {'league': totals['league'].abbr, **{field: totals[field] for field in totals_fields}}
+            for totals in history['leagues']
+        ],
+        'career_stats': PlayerCareerStats.objects.filter(player=player).values('seasons_played', *STAT_FIELDS).first(),
+    })
+
+
+@require_safe
+@conditional(get_player_data_version)
+def player_heatmap(req, player_id):
+    """
+    Where on a map (map=<name>) a player was popped, dropped the flag or returned it (kind), across
+    their career or in a single season (season=<id>), as a grid of counts per tile or as a PNG
+    (format=png, scale=<pixels per tile>). Without a map, lists the maps they have heatmaps for.
+    """
+    player = Player.objects.filter(id=player_id).first()
+    if player is None:
+        return api_error("Player not found", status=404)
+    map_name = req.GET.get('map')
+    kind = req.GET.get('kind', 'pops')
+    if kind not in HEATMAP_KINDS:
+        return api_error(f"Unknown kind '{kind}'. Kinds: {', '.join(HEATMAP_KINDS)}")
+    output_format = req.GET.get('format', 'json')
+    if output_format not in ('json', 'png'):
+        return api_error(f"Unknown format '{output_format}'. Formats: json, png")
+    try:
+        season_id = int(req.GET['season']) if 'season' in req.GET else None
+        scale = int(req.GET.get('scale', DEFAULT_HEATMAP_SCALE))
+    except ValueError:
+        return api_error("season and scale must be integers")
+    if not 1 <= scale <= MAX_HEATMAP_SCALE:
+        return api_error(f"scale must be between 1 and {MAX_HEATMAP_SCALE}")
+
+    if map_name is None:
+        heatmaps = PlayerMapHeatmap.objects.filter(player_season__player=player)
+        if season_id is not None:
+            heatmaps = heatmaps.filter(player_season__season_id=season_id)
+        maps = heatmaps.values('map_name').annotate(
+            games_played=models.Sum('games_played'),
+            seasons=models.Count('id')
+        ).order_by('-games_played', 'map_name')
+        return JsonResponse({
+            'player': {'id': player.id, 'name': player.name},
+            'season': season_id,
+            'maps': list(maps),
+        })
+
+    heatmap = get_player_heatmap(player.id, map_name, kind, season_id)
+    if heatmap is None:
+        return api_error(f"No heatmap for {player.name} on {map_name}", status=404)
+    grid, games_played = heatmap
+    if output_format == 'png':
+        return HttpResponse(render_heatmap_png(grid, scale), content_type='image/png')
+    return JsonResponse({
+        'player': {'id': player.id, 'name': player.name},
+        'map': map_name,
+        'kind': kind,
+        'season': season_id,
+        'games_played': games_played,
+        'width': grid.shape[1],
+        'height': grid.shape[0],
+        'grid': grid.tolist(),
+    })
@@ -0,0 +1,117 @@
+from django.core.cache import cache
+from django.db.models import Count, F, Max, QuerySet, Sum
+from django.utils import timezone
+from datetime import datetime
+from typing import Optional, Tuple
+import time
+from ..models import Season, TeamSeason, Match
+
+
+STANDINGS_VERSION_KEY = "standings_version"
+NAVIGATION_VERSION_KEY = "navigation_version"
+SEARCH_VERSION_KEY = "search_version"
+
+# (version key, when the data last changed)
+DataVersion = Tuple[str, Optional[datetime]]
+
+
+def get_version(key: str) -> int:
+    """Return the version stamp stored under key, starting a new one if there isn't one yet."""
+    version = cache.get(key)
+    if version is None:
+        version = bump_version(key)
+    return version
+
+
+def bump_version(key: str) -> int:
+    """Move key on to a new version stamp. The stamp is a timestamp so it never repeats, even if the cache is cleared."""
+    version = time.time_ns()
+    cache.set(key, version, None)
+    return version
+
+
+def get_standings_version() -> int:
+    """
+    Return the version stamp of the last write to any team's record. Cached standings include it in
+    their cache key, so they're invalidated as soon as a game is written.
+    """
+    return get_version(STANDINGS_VERSION_KEY)
+
+
+def bump_standings_version() -> int:
+    """Record that standings have changed."""
+    return bump_version(STANDINGS_VERSION_KEY)
+
+
+def get_navigation_version() -> int:
+    """
+    Return the version stamp of the last change to any league or season, which decide what the nav
+    bar and season dropdowns link to. Cached pages include it in their cache key.
+    """
+    return get_version(NAVIGATION_VERSION_KEY)
+
+
+def bump_navigation_version() -> int:
+    """Record that a league or season has been added, changed or removed."""
+    return bump_version(NAVIGATION_VERSION_KEY)
+
+
+def get_search_version() -> int:
+    """
+    Return the version stamp of the last change to the search index. Each process's in-memory
+    suggestion index is rebuilt when it changes.
+    """
+    return get_version(SEARCH_VERSION_KEY)
+
+
+def bump_search_version() -> int:
+    """Record that the search index has changed."""
+    return bump_version(SEARCH_VERSION_KEY)
+
+
+def bump_season_data_version(season: Season) -> None:
+    """
+    Record that a season's games, stats or standings have changed. Cached pages and API responses
+    for the season are keyed on its data version, so they're never served stale.
+    """
+    bump_season_data_versions(Season.objects.filter(pk=season.pk))
+
+
+def bump_season_data_versions(seasons: QuerySet) -> None:
+    """Bump the data version of every season in a queryset of seasons with a single UPDATE."""
+    Season.objects.filter(pk__in=seasons.values('pk')).update(
+        data_version=F('data_version') + 1,
+        data_updated_at=timezone.now()
+    )
+
+
+def get_season_data_version(season_id: int) -> Optional[DataVersion]:
+    """Return the data version of a season, or None if it doesn't exist."""
+    row = Season.objects.filter(id=season_id).values_list('data_version', 'data_updated_at').first()
+    return (f"season-{season_id}-{row[0]}", row[1]) if row else None
+
+
+def get_team_data_version(team_id: int) -> Optional[DataVersion]:
+    """Return the data version of a team season (that of its season), or None if it doesn't exist."""
+    row = TeamSeason.objects.filter(id=team_id).values_list(
+        'season_id', 'season__data_version', 'season__data_updated_at'
+    ).first()
+    return (f"team-{team_id}-{row[0]}-{row[1]}", row[2]) if row else None
+
+
+def get_match_data_version(match_id: int) -> Optional[DataVersion]:
+    """Return the data version of a match (that of its season), or None if it doesn't exist."""
+    row = Match.objects.filter(id=match_id).values_list(
+        'season_id', 'season__data_version', 'season__data_updated_at'
+    ).first()
+    return (f"match-{match_id}-{row[0]}-{row[1]}", row[2]) if row else None
+
+
+def get_player_data_version(player_id: int) -> DataVersion:
+    """A player's career changes whenever any season they played in does, or when they play a new season."""
+    seasons = Season.objects.filter(player_seasons__player_id=player_id).aggregate(
+        count=Count('id'),
+        version=Sum('data_version'),
+        updated=Max('data_updated_at')
+    )
+    return (f"player-{player_id}-{seasons['count']}-{seasons['version'] or 0}", seasons['updated'])
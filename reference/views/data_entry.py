@@ -10,25 +10,23 @@ from datetime import datetime, date
 import tagpro_eu
 from typing import Optional, List, Dict, Any
 
-from .stat_collection import process_game_stats, reaggregate_stats, update_standings
+from .cache_versions import bump_season_data_version
+from .heatmaps import update_player_heatmaps
+from .json_import import import_json_data_to_db
+from .search_index import update_search_documents
+from .upserts import upsert
+from .stat_collection import OUTCOME_FROM_OTHER_SIDE, load_bulk_matches, process_game_stats, reaggregate_stats, update_match_results, update_player_career_stats, update_season_summary, update_standings, update_team_records
 from ..models import Franchise, Season, TeamSeason, Player, PlayerSeason, Match, Game, PlayerGameLog, PlayoffSeries
 
 
-with open("data/league_matches.json") as f1, open("data/bulkmaps.json", encoding="utf-8") as f2:
-    bulkmatches = [m for m in tagpro_eu.bulk.load_matches(
-       f1,
-        tagpro_eu.bulk.load_maps(f2)
-    )]
-
-
 def extract_game_data(eu_url: str) -> Dict:
     """Extract basic game data from the tagpro.eu URL."""
     # Extract game ID from URL
     game_id = re.search(r'(\d{6,7})', eu_url)
     game_id = game_id.group(1) if game_id else "-1"
     try:
-        m: tagpro_eu.Match = [g for g in bulkmatches if g.match_id == game_id][0]
-    except IndexError:
+        m: tagpro_eu.Match = load_bulk_matches()[game_id]
+    except KeyError:
         # if no match found in bulkmatches, download from tagpro.eu
         # when we use download_match, map_id field will not be present, so set it to None
         m: tagpro_eu.Match = tagpro_eu.download_match(eu_url)
@@ -308,8 +306,8 @@ def enter_confirmed_data(
 
     team1_is_red = red_team == match.team1
     
-    # Create Game
-    game = Game.objects.create(
+    # Create Game (or pick up the existing one if this game was already entered)
+    game, = upsert(Game, [Game(
         match=match,
         red_team=red_team,
         blue_team=blue_team,
@@ -319,9 +317,10 @@ def enter_confirmed_data(
         map_id=map_id,
         game_in_match=game_in_match,
         tagpro_eu=int(eu_url.split("=")[1])
-    )
+    )], ['tagpro_eu'])
 
     # Create PlayerGameLogs for all players in the game
+    gamelogs = []
     for p in players:
         played_on = red_team if p['game_team'] == red_team_raw_name else blue_team
 
@@ -335,29 +334,36 @@ def enter_confirmed_data(
 
         # If Player and PlayerSeason are both None, create a new Player
         if p['player'] is None and p['player_season'] is None:
-            p['player'] = Player.objects.create(name=p['player_username'])
+            p['player'], = upsert(Player, [Player(name=p['player_username'])], ['name'])
         
         # If PlayerSeason is None, create a new PlayerSeason
         if p['player_season'] is None:
-            p['player_season'] = PlayerSeason.objects.create(
+            p['player_season'], = upsert(PlayerSeason, [PlayerSeason(
                 season=red_team.season,
                 player=p['player'],
                 team=p['season_team'],
                 playing_as=p['season_username']
-            )
+            )], ['season', 'player'])
         
         # Add the PlayerGameLog
-        PlayerGameLog.objects.create(
+        gamelogs.append(PlayerGameLog(
             game=game,
             player_season=p['player_season'],
             playing_as=p['game_username'],
             team=played_on
-        )
+        ))
+    upsert(PlayerGameLog, gamelogs, ['game', 'player_season'])
+    
+    # Bulk writes don't send signals, so index any new players and aliases here
+    update_search_documents('player', [p['player_season'].player_id for p in players])
     
     # Collect and store stats from the game
-    process_game_stats(game)
+    process_game_stats(game, update_records=False)
+    update_team_records(match.season)
     for p in players:
-        reaggregate_stats(p['player_season'])
+        reaggregate_stats(p['player_season'], update_career=False, update_heatmaps=False)
+    update_player_career_stats([p['player_season'].player_id for p in players])
+    update_player_heatmaps([p['player_season'].id for p in players])
 
 
 @staff_member_required
@@ -708,152 +714,6 @@ def import_from_json(request):
             return render(request, 'reference/import_json.html')
 
 
-def import_json_data_to_db(json_data: Dict) -> Dict:
-    """Import JSON data into database idempotently."""
-    created_count = 0
-    skipped_count = 0
-    
-    # First pass: Create/get all seasons, franchises, players, team seasons, player seasons
-    seasons_cache = {}
-    franchises_cache = {}
-    players_cache = {}
-    team_seasons_cache = {}
-    player_seasons_cache = {}
-    
-    # Cache existing seasons
-    for season in Season.objects.all():
-        seasons_cache[season.name] = season
-    
-    # Process team seasons
-    for ts_data in json_data.get('teamSeasons', []):
-        season = seasons_cache.get(ts_data['season'])
-        if not season:
-            continue
-            
-        # Get or create franchise
-        franchise_name = ts_data['franchise']
-        if franchise_name not in franchises_cache:
-            franchise, _ = Franchise.objects.get_or_create(name=franchise_name)
-            franchises_cache[franchise_name] = franchise
-        
-        # Get or create team season
-        team_season, _ = TeamSeason.objects.get_or_create(
-            season=season,
-            name=ts_data['name'],
-            defaults={
-                'franchise': franchises_cache[franchise_name],
-                'abbr': ts_data['abbr']
-            }
-        )
-        team_seasons_cache[f"{season.name}_{ts_data['name']}"] = team_season
-    
-    # Process player seasons
-    for ps_data in json_data.get('playerSeasons', []):
-        season = seasons_cache.get(ps_data['season'])
-        if not season:
-            continue
-            
-        # Get or create player
-        player_name = ps_data['player']
-        if player_name not in players_cache:
-            player, _ = Player.objects.get_or_create(name=player_name)
-            players_cache[player_name] = player
-        
-        # Get team season (allow null team)
-        team_season = None
-        if ps_data['team']:
-            team_season = team_seasons_cache.get(f"{season.name}_{ps_data['team']}")
-            
-        # Get or create player season (team can be None)
-        player_season, _ = PlayerSeason.objects.get_or_create(
-            season=season,
-            player=players_cache[player_name],
-            playing_as=ps_data['playing_as'],
-            defaults={'team': team_season}
-        )
-        player_seasons_cache[f"{season.name}_{ps_data['playing_as']}"] = player_season
-    
-    # Process matches and games
-    for match_data in json_data.get('matches', []):
-        season = seasons_cache.get(match_data['season'])
-        if not season:
-            continue
-            
-        team1 = team_seasons_cache.get(f"{season.name}_{match_data['team1']}")
-        team2 = team_seasons_cache.get(f"{season.name}_{match_data['team2']}")
-        if not team1 or not team2:
-            continue
-            
-        # Get or create match
-        match, _ = Match.objects.get_or_create(
-            season=season,
-            team1=team1,
-            team2=team2,
-            date=match_data['date'],
-            defaults={'week': match_data['week']}
-        )
-
-        game_in_match = 0
-        
-        # Process games in this match
-        for game_data in match_data['games']:
-            game_in_match += 1
-            red_team = team_seasons_cache.get(f"{season.name}_{game_data['red_team']}")
-            blue_team = team_seasons_cache.get(f"{season.name}_{game_data['blue_team']}")
-            if not red_team or not blue_team:
-                continue
-                
-            # Check if game already exists
-            existing_game = Game.objects.filter(tagpro_eu=game_data['tagpro_eu']).first()
-            
-            if existing_game:
-                skipped_count += 1
-                continue
-
-            # Create game
-            game = Game.objects.create(
-                match=match,
-                red_team=red_team,
-                blue_team=blue_team,
-                team1_score=game_data['team1_score'],
-                team2_score=game_data['team2_score'],
-                map_name=game_data['map_name'],
-                map_id=game_data['map_id'] if game_data['map_id'] else None,
-                game_in_match=f"Game {game_in_match}",
-                tagpro_eu=game_data['tagpro_eu']
-            )
-
-            # Create player game logs
-            for player_data in game_data['players']:
-                player_season = player_seasons_cache.get(f"{season.name}_{player_data['player_season']}")
-                if not player_season:
-                    continue
-                    
-                team = team_seasons_cache.get(f"{season.name}_{player_data['team']}")
-                if not team:
-                    continue
-                    
-                # Check if player game log already exists
-                existing_pgl = PlayerGameLog.objects.filter(
-                    game=game,
-                    player_season=player_season,
-                    playing_as=player_data['playing_as']
-                ).first()
-                
-                if not existing_pgl:
-                    PlayerGameLog.objects.create(
-                        game=game,
-                        player_season=player_season,
-                        playing_as=player_data['playing_as'],
-                        team=team
-                    )
-            
-            # Process game stats
-            created_count += 1
-    
-    return {'created_count': created_count, 'skipped_count': skipped_count}
-
-
 def format_compact_json(data):
     """Format JSON with scalar fields on one line, arrays/objects multi-line."""
     def format_value(obj, indent_level=0):
@@ -982,92 +842,122 @@ def infer_playoff_series(season: Season):
     """
     Create PlayoffSeries for all playoff matches in the season.
     Sets team1 to the better seeded team and updates games accordingly.
+
+    The season's bracket is built in memory from a single query of playoff matches (plus their
+    prefetched games), and every Match, Game and PlayoffSeries change is written back in bulk.
     """
     # Get all playoff matches (week not starting with "Week")
-    playoff_matches = Match.objects.filter(
-        season=season
-    ).exclude(week__startswith="Week").order_by('date')
-    
+    playoff_matches = list(
+        Match.objects.filter(
+            season=season
+        ).exclude(
+            week__startswith="Week"
+        ).select_related(
+            'team1', 'team2', 'playoff_series'
+        ).prefetch_related('games').order_by('date', 'id')
+    )
+
+    swapped_matches = []
+    swapped_games = []
+    nodes = []  # one node per playoff match, in date order
+    series_by_team = {}  # team id -> list of nodes the team played in, in date order
+
     for match in playoff_matches:
+        games = list(match.games.all())
+
         # Determine which team should be team1 (better seed = lower number)
         team1_seed = match.team1.seed or 999  # Use high number if no seed
         team2_seed = match.team2.seed or 999
-        
-        # If team2 has better seed, swap the teams
+
+        # If team2 has better seed, swap the teams and flip every game to the new team1's perspective
         if team2_seed < team1_seed:
-            # Swap teams in the match
-            original_team1 = match.team1
-            original_team2 = match.team2
-            match.team1 = original_team2
-            match.team2 = original_team1
-            match.save()
-            
-            # Update all games in this match to reflect the team swap
-            for game in match.games.all():
-                # Swap team1/team2 scores
-                original_team1_score = game.team1_score
-                original_team2_score = game.team2_score
-                original_team1_standing_points = game.team1_standing_points
-                original_team2_standing_points = game.team2_standing_points
-                
-                game.team1_score = original_team2_score
-                game.team2_score = original_team1_score
-                game.team1_standing_points = original_team2_standing_points
-                game.team2_standing_points = original_team1_standing_points
-                
-                # Update outcome from team1's perspective
-                if game.outcome == 'W':
-                    game.outcome = 'L'
-                elif game.outcome == 'L':
-                    game.outcome = 'W'
-                elif game.outcome == 'OTW':
-                    game.outcome = 'OTL'
-                elif game.outcome == 'OTL':
-                    game.outcome = 'OTW'
-                # 'T' stays the same
-                
-                game.save()
-        
+            match.team1, match.team2 = match.team2, match.team1
+            swapped_matches.append(match)
+            for game in games:
+                game.team1_score, game.team2_score = game.team2_score, game.team1_score
+                game.team1_standing_points, game.team2_standing_points = game.team2_standing_points, game.team1_standing_points
+                game.outcome = OUTCOME_FROM_OTHER_SIDE.get(game.outcome, game.outcome)
+                swapped_games.append(game)
+
         # Calculate game wins for each team
-        team1_wins = 0
-        team2_wins = 0
-        
-        for game in match.games.all():
-            if game.outcome in ['W', 'OTW']:
-                team1_wins += 1
-            elif game.outcome in ['L', 'OTL']:
-                team2_wins += 1
-        
+        team1_wins = sum(1 for game in games if game.outcome in ['W', 'OTW'])
+        team2_wins = sum(1 for game in games if game.outcome in ['L', 'OTL'])
+
         # Determine winner (null if tied)
         winner = None
         if team1_wins > team2_wins:
             winner = match.team1
         elif team2_wins > team1_wins:
             winner = match.team2
-        
-        # Find previous series for each team
-        team1_prev_series = PlayoffSeries.objects.filter(
-            match__season=season,
-            match__date__lt=match.date
-        ).filter(
-            models.Q(match__team1=match.team1) | models.Q(match__team2=match.team1)
-        ).order_by('-match__date').first()
-        
-        team2_prev_series = PlayoffSeries.objects.filter(
-            match__season=season,
-            match__date__lt=match.date
-        ).filter(
-            models.Q(match__team1=match.team2) | models.Q(match__team2=match.team2)
-        ).order_by('-match__date').first()
-        
-        # Create or update the PlayoffSeries
-        playoff_series, created = PlayoffSeries.objects.update_or_create(
-            match=match,
-            defaults={
-                'team1_prev_series': team1_prev_series,
-                'team2_prev_series': team2_prev_series,
-                'winner': winner,
-                'team1_game_wins': team1_wins,
-                'team2_game_wins': team2_wins,
-            }
-        )
+
+        # Each team's previous series is the latest node it played in on an earlier date
+        prev_nodes = []
+        for team in (match.team1, match.team2):
+            earlier = [n for n in series_by_team.get(team.id, []) if n['match'].date < match.date]
+            prev_nodes.append(earlier[-1] if earlier else None)
+
+        node = {
+            'match': match,
+            'series': match.get_playoff_series() or PlayoffSeries(match=match),
+            'team1_prev': prev_nodes[0],
+            'team2_prev': prev_nodes[1],
+            'winner': winner,
+            'team1_wins': team1_wins,
+            'team2_wins': team2_wins,
+        }
+        nodes.append(node)
+        series_by_team.setdefault(match.team1.id, []).append(node)
+        series_by_team.setdefault(match.team2.id, []).append(node)
+
+    Match.objects.bulk_update(swapped_matches, ['team1', 'team2'])
+    Game.objects.bulk_update(
+        swapped_games,
+        ['team1_score', 'team2_score', 'team1_standing_points', 'team2_standing_points', 'outcome']
+    )
+
+    # New series need primary keys before other series can point at them
+    PlayoffSeries.objects.bulk_create([n['series'] for n in nodes if n['series'].pk is None])
+    for node in nodes:
+        series = node['series']
+        series.team1_prev_series = node['team1_prev']['series'] if node['team1_prev'] else None
+        series.team2_prev_series = node['team2_prev']['series'] if node['team2_prev'] else None
+        series.winner = node['winner']
+        series.team1_game_wins = node['team1_wins']
+        series.team2_game_wins = node['team2_wins']
+    PlayoffSeries.objects.bulk_update(
+        [n['series'] for n in nodes],
+        ['team1_prev_series', 'team2_prev_series', 'winner', 'team1_game_wins', 'team2_game_wins']
+    )
+    # Swapping sides and creating series changes the matches' box scores
+    update_match_results(Match.objects.filter(season=season).exclude(week__startswith="Week"))
+    update_season_summary(season)
+    bump_season_data_version(season)
+
+
+def rebuild_after_import(game_ids: List[int]) -> List[Season]:
+    """
+    Process stats for newly imported games and rebuild everything derived from them, once per
+    affected player season and season rather than once per game. Returns the affected seasons.
+    """
+    seasons: Dict[int, Season] = {}
+    games = Game.objects.filter(id__in=game_ids).select_related(
+        'match__season', 'match__team1', 'match__team2', 'red_team', 'blue_team'
+    )
+    for game in games:
+        process_game_stats(game, update_records=False)
+        seasons[game.match.season_id] = game.match.season
+
+    player_seasons = list(PlayerSeason.objects.filter(gamelogs__game_id__in=game_ids).distinct())
+    for player_season in player_seasons:
+        reaggregate_stats(player_season, update_career=False, update_heatmaps=False)
+    update_player_career_stats([player_season.player_id for player_season in player_seasons])
+    update_player_heatmaps([player_season.id for player_season in player_seasons])
+
+    for season in seasons.values():
+        # Seeds decide which side of each playoff series a team is on, and the bracket decides
+        # playoff finishes, so standings are updated on both sides of the bracket inference
+        update_team_records(season)
+        update_standings(season)
+        infer_playoff_series(season)
+        update_standings(season)
+    return list(seasons.values())
@@ -0,0 +1,184 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import struct
+import zlib
+import numpy as np
+from .timelines import EVENT_CODES, EVENT_COLUMNS, EVENTS, SPLAT_COLUMNS, unpack_columns
+from .upserts import upsert
+from ..models import GameTimeline, PlayerGameLog, PlayerMapHeatmap
+
+
+# Where a player was popped, where they were popped holding the flag, and where they returned it
+HEATMAP_KINDS = ['pops', 'drops', 'returns']
+
+TILE_SIZE = 40  # pixels
+
+GRID_DTYPE = '<u4'
+
+DROP_CODES = [code for code, event in enumerate(EVENTS) if event.startswith("Drop ")]
+RETURN_CODE = EVENT_CODES['Return']
+
+# Colours of a heatmap tile from the fewest splats to the most (yellow to red)
+HEAT_COLORS = np.array([[255, 255, 178], [254, 204, 92], [253, 141, 60], [240, 59, 32], [189, 0, 38]])
+
+
+def pack_grid(grid: np.ndarray) -> bytes:
+    return zlib.compress(grid.astype(GRID_DTYPE).tobytes())
+
+
+def unpack_grid(blob: bytes, width: int, height: int) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(blob), dtype=GRID_DTYPE).reshape(height, width)
+
+
+def add_grids(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Add two tile grids, padding the smaller one with empty tiles if the map changed size between versions."""
+    if a.shape != b.shape:
+        height, width = max(a.shape[0], b.shape[0]), max(a.shape[1], b.shape[1])
+        a = np.pad(a, ((0, height - a.shape[0]), (0, width - a.shape[1])))
+        b = np.pad(b, ((0, height - b.shape[0]), (0, width - b.shape[1])))
+    return a + b
+
+
+def bin_splats(tile_x: np.ndarray, tile_y: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Count splats on each tile of a map, as a height x width grid."""
+    grid, _, _ = np.histogram2d(tile_y, tile_x, bins=(height, width), range=((0, height), (0, width)))
+    return grid.astype(GRID_DTYPE)
+
+
+def get_timeline_heatmaps(timeline: GameTimeline) -> List[Dict[str, np.ndarray]]:
+    """
+    Bin a stored timeline's splats by map tile, for each player in timeline.players: where they were
+    popped, where they were popped holding the flag, and where they returned the flag.
+
+    A drop is a splat in the same tick as the player dropped the flag. A return is credited with the
+    drops by the other team in the tick it happened, as parse_stats_from_eu_match does.
+    """
+    events = unpack_columns(EVENT_COLUMNS, timeline.events)
+    splats = unpack_columns(SPLAT_COLUMNS, timeline.splats)
+    width, height = timeline.map_width, timeline.map_height
+    tile_x = np.clip(splats['x'] // TILE_SIZE, 0, width - 1)
+    tile_y = np.clip(splats['y'] // TILE_SIZE, 0, height - 1)
+
+    is_drop_event = np.isin(events['event'], DROP_CODES)
+    drop_keys = events['tick'][is_drop_event].astype(np.int64) * 256 + events['player'][is_drop_event]
+    is_drop = np.isin(splats['tick'].astype(np.int64) * 256 + splats['player'], drop_keys)
+
+    returned_by = np.full(len(splats['tick']), -1)
+    is_return = events['event'] == RETURN_CODE
+    for tick, player, team in zip(events['tick'][is_return], events['player'][is_return], events['team'][is_return]):
+        returned_by[is_drop & (splats['tick'] == tick) & (splats['team'] != team)] = player
+
+    heatmaps = []
+    for player in range(len(timeline.players)):
+        masks = {
+            'pops': splats['player'] == player,
+            'drops': is_drop & (splats['player'] == player),
+            'returns': returned_by == player,
+        }
+        heatmaps.append({
+            kind: bin_splats(tile_x[mask], tile_y[mask], width, height)
+            for kind, mask in masks.items()
+        })
+    return heatmaps
+
+
+def update_player_heatmaps(player_season_ids: Iterable[int]) -> None:
+    """
+    Recalculate the per-map heatmaps of the given player seasons from the stored timelines of their
+    games, with one upsert, removing heatmaps of maps they no longer have games on. Games without a
+    stored timeline or a map name are left out.
+    """
+    player_season_ids = set(player_season_ids)
+    if not player_season_ids:
+        return
+
+    # game ID -> name played as -> player season ID
+    players_in_games: Dict[int, Dict[str, int]] = {}
+    map_names: Dict[int, str] = {}
+    for game_id, playing_as, player_season_id, map_name in PlayerGameLog.objects.filter(
+        player_season_id__in=player_season_ids,
+        game__map_name__isnull=False
+    ).values_list('game_id', 'playing_as', 'player_season_id', 'game__map_name'):
+        players_in_games.setdefault(game_id, {})[playing_as] = player_season_id
+        map_names[game_id] = map_name
+
+    grids: Dict[Tuple[int, str], Dict[str, np.ndarray]] = {}
+    games: Dict[Tuple[int, str], Set[int]] = {}
+    for timeline in GameTimeline.objects.filter(game_id__in=players_in_games).order_by('game_id', 'id').iterator():
+        players = players_in_games[timeline.game_id]
+        for name, heatmap in zip(timeline.players, get_timeline_heatmaps(timeline)):
+            if name not in players:
+                continue
+            key = (players[name], map_names[timeline.game_id])
+            if key in grids:
+                grids[key] = {kind: add_grids(grids[key][kind], heatmap[kind]) for kind in HEATMAP_KINDS}
+            else:
+                grids[key] = heatmap
+            games.setdefault(key, set()).add(timeline.game_id)
+
+    heatmaps = upsert(PlayerMapHeatmap, [
+        PlayerMapHeatmap(
+            player_season_id=player_season_id,
+            map_name=map_name,
+            games_played=len(games[(player_season_id, map_name)]),
+            height=kind_grids['pops'].shape[0],
+            width=kind_grids['pops'].shape[1],
+            **{kind: pack_grid(kind_grids[kind]) for kind in HEATMAP_KINDS}
+        )
+        for (player_season_id, map_name), kind_grids in grids.items()
+    ], ['player_season', 'map_name'], update_fields=['games_played', 'width', 'height', *HEATMAP_KINDS])
+    PlayerMapHeatmap.objects.filter(player_season_id__in=player_season_ids).exclude(
+        id__in=[heatmap.id for heatmap in heatmaps]
+    ).delete()
+
+
+def get_player_heatmap(player_id: int, map_name: str, kind: str, season_id: Optional[int] = None) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Return one kind of a player's heatmap on a map, summed across all their seasons (or just one),
+    and the number of games it's from. Returns None if they have no heatmap on the map.
+    """
+    heatmaps = PlayerMapHeatmap.objects.filter(
+        player_season__player_id=player_id,
+        map_name=map_name
+    ).only('width', 'height', 'games_played', kind)
+    if season_id is not None:
+        heatmaps = heatmaps.filter(player_season__season_id=season_id)
+
+    grid = None
+    games_played = 0
+    for heatmap in heatmaps:
+        season_grid = unpack_grid(getattr(heatmap, kind), heatmap.width, heatmap.height)
+        grid = season_grid if grid is None else add_grids(grid, season_grid)
+        games_played += heatmap.games_played
+    return (grid, games_played) if grid is not None else None
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode a height x width x 4 array of RGBA bytes as a PNG."""
+    height, width, _ = rgba.shape
+    # Each row starts with its filter type, 0 (none)
+    rows = np.hstack([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)])
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(rows.tobytes())),
+        chunk(b"IEND", b""),
+    ])
+
+
+def render_heatmap_png(grid: np.ndarray, scale: int) -> bytes:
+    """
+    Render a tile grid as a PNG with scale x scale pixels per tile, coloured from yellow (fewest) to
+    red (most), with empty tiles transparent so it can be laid over a picture of the map.
+    """
+    peak = grid.max()
+    positions = grid / peak * (len(HEAT_COLORS) - 1) if peak else np.zeros(grid.shape)
+    lower = np.minimum(positions.astype(int), len(HEAT_COLORS) - 2)
+    fraction = (positions - lower)[..., np.newaxis]
+    rgb = HEAT_COLORS[lower] * (1 - fraction) + HEAT_COLORS[lower + 1] * fraction
+    alpha = np.where(grid > 0, 255, 0)[..., np.newaxis]
+    rgba = np.concatenate([rgb, alpha], axis=2).round().astype(np.uint8)
+    return encode_png(rgba.repeat(scale, axis=0).repeat(scale, axis=1))
@@ -1,120 +1,110 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, require_safe
 from django.db import models
+from django.db.models.functions import Coalesce, RowNumber
 import json
 import re
 from datetime import datetime, date
-from ..models import Season, TeamSeason, Player, PlayerSeason, Match, Game, PlayerGameLog, PlayerWeekStats, PlayerSeasonStats, League, PlayoffSeries, Franchise
+from typing import Dict, List, Optional, Set
+from .cache_versions import get_match_data_version, get_season_data_version, get_standings_version, get_team_data_version
+from .page_cache import cache_season_page
+from .search_index import search
+from .suggestions import MAX_SUGGESTION_LIMIT, SUGGESTION_LIMIT, suggest
+from .stat_collection import RECORD_FIELDS, STAT_FIELDS
+from .stat_frame import StatFrame
+from .stat_tables import STAT_COLUMNS, STAT_VIEW_OPTIONS, get_sort_headers, get_table_options, sort_and_paginate, table_url
+from ..models import Season, TeamSeason, Player, PlayerSeason, Match, Game, PlayerGameLog, PlayerSeasonStats, League, PlayoffSeries, Franchise, TeamSeasonRecord, MatchResult, StandingsSnapshot
 import tagpro_eu
 
 
-def homepage(req):
-    """Homepage with standings for all leagues."""
-    # Get all leagues with ordering < 10, ordered by ordering field
-    leagues = League.objects.filter(ordering__lt=10, gamemode="CTF").order_by('ordering')
-    
+def get_team_record(team: TeamSeason) -> TeamSeasonRecord:
+    """Return the team's denormalized record, or an empty one if it hasn't been calculated yet."""
+    try:
+        return team.record
+    except TeamSeasonRecord.DoesNotExist:
+        return TeamSeasonRecord(team=team)
+
+
+def get_match_schedule_data(match: Match) -> Dict:
+    """Return a match's box score for the schedule views, from its denormalized result."""
+    try:
+        result = match.result
+    except MatchResult.DoesNotExist:
+        result = MatchResult(match=match)
+    
+    if not result.games:
+        return {
+            'match': match,
+            'games': [],
+            'has_games': False
+        }
+    return {
+        'match': match,
+        'games': result.game_results,
+        'team1_total': result.team1_total,
+        'team2_total': result.team2_total,
+        'match_winner': result.winner,
+        'is_playoff': result.is_playoff,
+        'has_games': True
+    }
+
+
+def get_homepage_standings() -> List[Dict]:
+    """
+    Standings for the latest season of each league shown on the homepage, from a single query of
+    those seasons' teams and their records.
+    """
+    latest_season = Season.objects.filter(
+        league=models.OuterRef('season__league')
+    ).order_by('-end_date').values('id')[:1]
+    teams = TeamSeason.objects.filter(
+        season__league__ordering__lt=10,
+        season__league__gamemode="CTF",
+        season=models.Subquery(latest_season)
+    ).select_related('season__league', 'record').order_by('season__league__ordering', 'season_id', 'id')
+
     league_standings = []
-    
-    for league in leagues:
-        # Get the most recent season for this league
-        latest_season = Season.objects.filter(league=league).order_by('-end_date').first()
-        
-        if not latest_season:
-            continue
-            
-        # Get all teams in this season
-        teams = TeamSeason.objects.filter(season=latest_season)
-        
-        if not teams.exists():
-            continue
-        
-        # Calculate standings for each team
-        standings = []
-        for team in teams:
-            # Get all regular season games for the team
-            team_games = Game.objects.filter(
-                models.Q(red_team=team) | models.Q(blue_team=team),
-                match__season=latest_season,
-                match__week__startswith="Week"
-            )
-            
-            # Initialize counters
-            standing_points = 0
-            wins = ot_wins = ot_losses = losses = 0
-            caps_for = 0
-            caps_against = 0
-            
-            for game in team_games:
-                # Determine if this team is team1 or team2 in the match
-                is_team1 = (team == game.match.team1)
-                
-                # Get team scores and standing points
-                if is_team1:
-                    team_score = game.team1_score
-                    opponent_score = game.team2_score
-                    team_standing_points = game.team1_standing_points or 0
-                else:
-                    team_score = game.team2_score
-                    opponent_score = game.team1_score
-                    team_standing_points = game.team2_standing_points or 0
-                
-                # Add to totals
-                standing_points += team_standing_points
-                caps_for += team_score
-                caps_against += opponent_score
-                
-                # Determine outcome for this team
-                if game.outcome:
-                    if is_team1:
-                        outcome = game.outcome
-                    else:
-                        # Flip the outcome for team2
-                        outcome_map = {'W': 'L', 'OTW': 'OTL', 'L': 'W', 'OTL': 'OTW', 'T': 'T'}
-                        outcome = outcome_map.get(game.outcome, game.outcome)
-                    
-                    if outcome == 'W':
-                        wins += 1
-                    elif outcome == 'OTW':
-                        ot_wins += 1
-                    elif outcome == 'OTL':
-                        ot_losses += 1
-                    elif outcome == 'L':
-                        losses += 1
-                else:
-                    # Determine by score if outcome not set
-                    if team_score > opponent_score:
-                        wins += 1
-                    elif team_score < opponent_score:
-                        losses += 1
-            
-            cap_differential = caps_for - caps_against
-            record = f"{wins}-{ot_wins}-{ot_losses}-{losses}"
-            
-            standings.append({
-                'team': team,
-                'standing_points': standing_points,
-                'record': record,
-                'cap_differential': cap_differential,
+    for team in teams:
+        if not league_standings or league_standings[-1]['season'] != team.season:
+            league_standings.append({
+                'league': team.season.league,
+                'season': team.season,
+                'standings': [],
             })
-        
+        record = get_team_record(team)
+        league_standings[-1]['standings'].append({
+            'team': team,
+            'standing_points': record.standing_points,
+            'record': record.record,
+            'cap_differential': record.cap_differential,
+        })
+
+    for league_data in league_standings:
         # Sort by standing points (descending), then by cap differential (descending)
+        standings = league_data['standings']
         standings.sort(key=lambda x: (-x['standing_points'], -x['cap_differential']))
         
         # Add rank
         for i, standing in enumerate(standings, 1):
             standing['rank'] = i
-        
-        league_standings.append({
-            'league': league,
-            'season': latest_season,
-            'standings': standings,
-        })
-    
+
+    return league_standings
+
+
+def homepage(req):
+    """
+    Homepage with standings for all leagues. The standings block is cached (see homepage.html) under
+    the standings version, so the standings are only queried again after a game is written or a team
+    or franchise is edited.
+    """
     return render(req, 'reference/homepage.html', {
-        'league_standings': league_standings,
+        # Passed uncalled so the template only calls it when the cached block is missing
+        'league_standings': get_homepage_standings,
+        'standings_version': get_standings_version(),
     })
 
 
@@ -133,39 +123,13 @@ def search_results(req, query):
     query = query.strip()
     query_lower = query.lower()
     
-    # Search leagues by name and abbreviation (case-insensitive substring)
-    leagues = League.objects.filter(
-        models.Q(name__icontains=query) | models.Q(abbr__icontains=query)
-    ).order_by('name')[:20]
-    
-    # Search franchises by name and abbreviation (case-insensitive substring)
-    franchises = Franchise.objects.filter(
-        models.Q(name__icontains=query) | models.Q(abbr__icontains=query)
-    ).order_by('name')[:20]
-    
-    # Search teams by name and abbreviation (case-insensitive substring)
-    teams = TeamSeason.objects.filter(
-        models.Q(name__icontains=query) | models.Q(abbr__icontains=query)
-    ).select_related('season', 'franchise').order_by('-season__end_date')[:20]
-    
-    # Search players by name and playing_as (case-insensitive substring)
-    # Use distinct to avoid duplicates when a player matches both name and playing_as
-    player_matches = set()
-    
-    # Search by player name
-    players_by_name = Player.objects.filter(
-        name__icontains=query
-    ).order_by('name')[:20]
-    player_matches.update(players_by_name)
-    
-    # Search by playing_as in PlayerSeason
-    players_by_playing_as = Player.objects.filter(
-        seasons_played__playing_as__icontains=query
-    ).distinct().order_by('name')[:20]
-    player_matches.update(players_by_playing_as)
-    
-    # Convert to list and limit to 20, maintaining sort order
-    players = sorted(list(player_matches), key=lambda p: p.name.lower())[:20]
+    # Search leagues, franchises and teams by name and abbreviation and players by name and every name
+    # they've played as (case-insensitive substring), ranked, in a single query of the search index
+    results = search(query)
+    leagues = results['league']
+    franchises = results['franchise']
+    teams = results['team']
+    players = results['player']
     
     # Check for redirect conditions
     league_exact_matches = [l for l in leagues if l.name.lower() == query_lower or (l.abbr and l.abbr.lower() == query_lower)]
@@ -175,28 +139,28 @@ def search_results(req, query):
     
     # Redirect logic - leagues are treated like franchises
     if len(league_exact_matches) == 1 and len(player_exact_matches) == 0:
-        return redirect('league_history', league_id=league_exact_matches[0].id)
+        return redirect('league_history', league_id=league_exact_matches[0].object_id)
     
     if len(franchise_exact_matches) == 1 and len(player_exact_matches) == 0:
-        return redirect('franchise_history', franchise_id=franchise_exact_matches[0].id)
+        return redirect('franchise_history', franchise_id=franchise_exact_matches[0].object_id)
     
     if len(team_exact_matches) == 1 and len(league_exact_matches) == 0 and len(franchise_exact_matches) == 0 and len(player_exact_matches) == 0:
-        return redirect('team_season', team_id=team_exact_matches[0].id)
+        return redirect('team_season', team_id=team_exact_matches[0].object_id)
     
     if len(player_exact_matches) == 1 and len(league_exact_matches) == 0 and len(franchise_exact_matches) == 0 and len(team_exact_matches) == 0:
-        return redirect('player_history', player_id=player_exact_matches[0].id)
+        return redirect('player_history', player_id=player_exact_matches[0].object_id)
     
     # If we have exactly one league match and no players, redirect
     if len(leagues) == 1 and len(players) == 0:
-        return redirect('league_history', league_id=leagues[0].id)
+        return redirect('league_history', league_id=leagues[0].object_id)
     
     # If we have exactly one franchise match and no players, redirect
     if len(franchises) == 1 and len(players) == 0:
-        return redirect('franchise_history', franchise_id=franchises[0].id)
+        return redirect('franchise_history', franchise_id=franchises[0].object_id)
     
     # If we have exactly one team match and no leagues, franchises or players, redirect  
     if len(teams) == 1 and len(leagues) == 0 and len(franchises) == 0 and len(players) == 0:
-        return redirect('team_season', team_id=teams[0].id)
+        return redirect('team_season', team_id=teams[0].object_id)
     
     return render(req, 'reference/search_results.html', {
         'query': query,
@@ -208,63 +172,55 @@ def search_results(req, query):
     })
 
 
+# URL name and kwarg of the page each kind of search result links to
+SEARCH_RESULT_PAGES = {
+    'league': ('league_history', 'league_id'),
+    'franchise': ('franchise_history', 'franchise_id'),
+    'team': ('team_season', 'team_id'),
+    'player': ('player_history', 'player_id'),
+}
+
+
+@require_safe
+def search_suggestions(req):
+    """Autocomplete suggestions for the search bar, answered from the in-memory suggestion index."""
+    query = req.GET.get('q', '')
+    try:
+        limit = min(max(int(req.GET.get('limit', SUGGESTION_LIMIT)), 1), MAX_SUGGESTION_LIMIT)
+    except ValueError:
+        limit = SUGGESTION_LIMIT
+    
+    suggestions = []
+    for suggestion in suggest(query, limit):
+        url_name, url_kwarg = SEARCH_RESULT_PAGES[suggestion.kind]
+        suggestions.append({
+            'kind': suggestion.kind,
+            'id': suggestion.object_id,
+            'name': suggestion.name,
+            'detail': suggestion.detail,
+            'url': reverse(url_name, kwargs={url_kwarg: suggestion.object_id}),
+        })
+    return JsonResponse({'query': query, 'suggestions': suggestions})
+
+
 def league_history(req, league_id):
     """View league's history showing all seasons with champions and runners-up."""
     league = get_object_or_404(League, id=league_id)
     
-    # Get all seasons for this league
-    seasons = Season.objects.filter(league=league).order_by('-end_date')
+    # Get all seasons for this league, with the summaries stored on them by update_season_summary
+    seasons = Season.objects.filter(league=league).select_related(
+        'champion__franchise', 'runner_up'
+    ).order_by('-end_date')
     
-    # Build season history data
-    season_history = []
-    for season in seasons:
-        # Count teams in this season
-        team_count = TeamSeason.objects.filter(season=season).count()
-        
-        # Find champion and runner-up from the final playoff series
-        champion = None
-        runner_up = None
-        
-        # Look for the championship game/series (Super Ball, etc.)
-        final_names = ['Super Ball', 'Muper Ball', 'Nuper Ball', 'Buper Ball']
-        championship_matches = Match.objects.filter(
-            season=season,
-            week__in=final_names,
-            playoff_series__isnull=False
-        ).select_related('playoff_series', 'team1', 'team2').first()
-        
-        if championship_matches and championship_matches.playoff_series:
-            playoff_series = championship_matches.playoff_series
-            if playoff_series.winner:
-                champion = playoff_series.winner
-                # The other team in the match is the runner-up
-                if championship_matches.team1 == champion:
-                    runner_up = championship_matches.team2
-                else:
-                    runner_up = championship_matches.team1
-        else:
-            # If no championship game found, look for any playoff series with latest date
-            latest_playoff = Match.objects.filter(
-                season=season,
-                playoff_series__isnull=False
-            ).select_related('playoff_series', 'team1', 'team2').order_by('-date').first()
-            
-            if latest_playoff and latest_playoff.playoff_series:
-                playoff_series = latest_playoff.playoff_series
-                if playoff_series.winner:
-                    champion = playoff_series.winner
-                    # The other team in the match is the runner-up
-                    if latest_playoff.team1 == champion:
-                        runner_up = latest_playoff.team2
-                    else:
-                        runner_up = latest_playoff.team1
-        
-        season_history.append({
+    season_history = [
+        {
             'season': season,
-            'team_count': team_count,
-            'champion': champion,
-            'runner_up': runner_up,
-        })
+            'team_count': season.team_count,
+            'champion': season.champion,
+            'runner_up': season.runner_up,
+        }
+        for season in seasons
+    ]
     
     return render(req, 'reference/league_history.html', {
         'league': league,
@@ -272,89 +228,26 @@ def league_history(req, league_id):
     })
 
 
-def season_home(req, season_id):
-    """View key season information, namely standings."""
-    season = get_object_or_404(Season, id=season_id)
+def get_season_standings(season: Season) -> List[Dict]:
+    """Return each team in the season with its record, in seed order."""
+    # Get all teams in this season, along with their records
+    teams = TeamSeason.objects.filter(season=season).select_related('record', 'franchise')
     
-    # Get all seasons from the same league for dropdown
-    league_seasons = Season.objects.filter(league=season.league).order_by('-end_date')
-    
-    # Get all teams in this season
-    teams = TeamSeason.objects.filter(season=season)
-    
-    # Calculate standings for each team
     standings = []
     for team in teams:
-        # Get all regular season games for the team
-        team_games = Game.objects.filter(
-            models.Q(red_team=team) | models.Q(blue_team=team),
-            match__season=season,
-            match__week__startswith="Week"  # Non-regular season games should not start with Week
-        )
-        
-        # Initialize counters
-        games_played = team_games.count()
-        standing_points = 0
-        wins = 0
-        ot_wins = 0
-        ot_losses = 0
-        losses = 0
-        caps_for = 0
-        caps_against = 0
-        
-        for game in team_games:
-            # Determine if this team is team1 or team2 in the match
-            is_team1 = (team == game.match.team1)
-            
-            # Get team scores
-            if is_team1:
-                team_score = game.team1_score
-                opponent_score = game.team2_score
-                team_standing_points = game.team1_standing_points or 0
-            else:
-                team_score = game.team2_score
-                opponent_score = game.team1_score
-                team_standing_points = game.team2_standing_points or 0
-            
-            # Add to totals
-            standing_points += team_standing_points
-            caps_for += team_score
-            caps_against += opponent_score
-            
-            # Determine outcome for this team
-            if game.outcome:
-                if is_team1:
-                    outcome = game.outcome
-                else:
-                    # Flip the outcome for team2
-                    outcome_map = {'W': 'L', 'OTW': 'OTL', 'L': 'W', 'OTL': 'OTW', 'T': 'T'}
-                    outcome = outcome_map.get(game.outcome, game.outcome)
-                
-                if outcome == 'W':
-                    wins += 1
-                elif outcome == 'OTW':
-                    ot_wins += 1
-                    caps_for -= 1  # OT caps don't count
-                elif outcome == 'OTL':
-                    ot_losses += 1
-                    caps_against -= 1  # OT caps don't count
-                elif outcome == 'L':
-                    losses += 1
-        
-        cap_differential = caps_for - caps_against
-        
+        record = get_team_record(team)
         standings.append({
             'team': team,
             'seed': team.seed,
-            'games_played': games_played,
-            'standing_points': standing_points,
-            'wins': wins,
-            'ot_wins': ot_wins,
-            'ot_losses': ot_losses,
-            'losses': losses,
-            'caps_for': caps_for,
-            'caps_against': caps_against,
-            'cap_differential': cap_differential,
+            'games_played': record.games_played,
+            'standing_points': record.standing_points,
+            'wins': record.wins,
+            'ot_wins': record.ot_wins,
+            'ot_losses': record.ot_losses,
+            'losses': record.losses,
+            'caps_for': record.caps_for,
+            'caps_against': record.caps_against,
+            'cap_differential': record.cap_differential,
         })
     
     # Sort by standing points (descending), then by cap differential (descending)
@@ -364,13 +257,63 @@ def season_home(req, season_id):
     for i, standing in enumerate(standings, 1):
         standing['rank'] = i
     
+    return standings
+
+
+def get_standings_after_week(season: Season, week: str) -> Optional[List[Dict]]:
+    """
+    Return the standings as they stood at the end of a regular season week, in the same form as
+    get_season_standings, from the week's StandingsSnapshot. Returns None if there's no snapshot of
+    the week.
+    """
+    snapshot = StandingsSnapshot.objects.filter(season=season, week=week).values_list('standings', flat=True).first()
+    if snapshot is None:
+        return None
+    
+    teams = TeamSeason.objects.filter(season=season).select_related('franchise').in_bulk()
+    standings = []
+    for team_id, *record in snapshot:
+        # Skip teams removed since the snapshot was taken
+        if team_id not in teams:
+            continue
+        standing = dict(zip(RECORD_FIELDS, record))
+        standing['team'] = teams[team_id]
+        standing['cap_differential'] = standing['caps_for'] - standing['caps_against']
+        standings.append(standing)
+    
+    for i, standing in enumerate(standings, 1):
+        standing['seed'] = i
+        standing['rank'] = i
+    
+    return standings
+
+
+@cache_season_page(get_season_data_version)
+def season_home(req, season_id):
+    """View key season information, namely standings, as of now or the end of any regular season week."""
+    season = get_object_or_404(Season, id=season_id)
+    
+    # Get all seasons from the same league for dropdown
+    league_seasons = Season.objects.filter(league=season.league).order_by('-end_date')
+    
+    # Weeks the standings can be shown after, in the order they were played
+    standings_weeks = list(StandingsSnapshot.objects.filter(season=season).values_list('week', flat=True))
+    current_week = req.GET.get('week', '')
+    standings = get_standings_after_week(season, current_week) if current_week in standings_weeks else None
+    if standings is None:
+        current_week = ''
+        standings = get_season_standings(season)
+    
     return render(req, 'reference/season_home.html', {
         'season': season,
         'league_seasons': league_seasons,
         'standings': standings,
+        'standings_weeks': standings_weeks,
+        'current_week': current_week,
     })
 
 
+@cache_season_page(get_season_data_version)
 def season_schedule(req, season_id):
     """View season schedule with match results."""
     season = get_object_or_404(Season, id=season_id)
@@ -380,8 +323,8 @@ def season_schedule(req, season_id):
     
     # Get all matches for this season
     matches = Match.objects.filter(season=season).select_related(
-        'team1__franchise', 'team2__franchise'
-    ).prefetch_related('games', 'playoff_series')
+        'team1__franchise', 'team2__franchise', 'result'
+    )
     
     # Group matches by week
     weeks = {}
@@ -412,79 +355,7 @@ def season_schedule(req, season_id):
     # Build schedule data
     schedule_data = []
     for week in sorted_weeks:
-        week_matches = []
-        for match in weeks[week]:
-            # Get games for this match
-            games = list(match.games.all())
-            
-            # Build box score data
-            if games:
-                # Calculate totals
-                team1_total = 0
-                team2_total = 0
-                is_playoff = hasattr(match, 'playoff_series') and match.playoff_series
-                
-                game_results = []
-                for game in games:
-                    # Determine scores and winner
-                    team1_score = game.team1_score
-                    team2_score = game.team2_score
-                    
-                    # Check if overtime
-                    is_overtime = game.outcome in ['OTW', 'OTL'] if game.outcome else False
-                    
-                    # Determine game winner
-                    if team1_score > team2_score:
-                        game_winner = 'team1'
-                        if not is_playoff:
-                            team1_total += game.team1_standing_points or 0
-                            team2_total += game.team2_standing_points or 0
-                        else:
-                            team1_total += 1
-                    elif team2_score > team1_score:
-                        game_winner = 'team2'
-                        if not is_playoff:
-                            team1_total += game.team1_standing_points or 0
-                            team2_total += game.team2_standing_points or 0
-                        else:
-                            team2_total += 1
-                    else:
-                        game_winner = 'tie'
-                        if not is_playoff:
-                            team1_total += game.team1_standing_points or 0
-                            team2_total += game.team2_standing_points or 0
-                    
-                    game_results.append({
-                        'team1_score': team1_score,
-                        'team2_score': team2_score,
-                        'winner': game_winner,
-                        'is_overtime': is_overtime,
-                        'game_number': game.game_in_match
-                    })
-                
-                # Determine match winner
-                if is_playoff:
-                    match_winner = 'team1' if team1_total > team2_total else 'team2' if team2_total > team1_total else 'tie'
-                else:
-                    match_winner = 'team1' if team1_total > team2_total else 'team2' if team2_total > team1_total else 'tie'
-                
-                match_data = {
-                    'match': match,
-                    'games': game_results,
-                    'team1_total': team1_total,
-                    'team2_total': team2_total,
-                    'match_winner': match_winner,
-                    'is_playoff': is_playoff,
-                    'has_games': True
-                }
-            else:
-                match_data = {
-                    'match': match,
-                    'games': [],
-                    'has_games': False
-                }
-            
-            week_matches.append(match_data)
+        week_matches = [get_match_schedule_data(match) for match in weeks[week]]
         
         schedule_data.append({
             'week': week,
@@ -498,18 +369,8 @@ def season_schedule(req, season_id):
     })
 
 
-def season_stats(req, season_id):
-    """View season player statistics."""
-    season = get_object_or_404(Season, id=season_id)
-    
-    # Get all seasons from the same league for dropdown
-    league_seasons = Season.objects.filter(league=season.league).order_by('-end_date')
-    
-    # Get week filter and stat view from query params
-    week_filter = req.GET.get('week', 'all_regular_season')
-    stat_view = req.GET.get('view', 'basic')
-    
-    # Get all weeks for this season to build dropdown
+def get_season_weeks(season: Season) -> List[str]:
+    """Return the names of every week with a match in the season, regular season first, then playoff rounds in order."""
     all_weeks = Match.objects.filter(season=season).values_list('week', flat=True).distinct()
     
     # Sort weeks with special playoff ordering (same as schedule)
@@ -526,7 +387,56 @@ def season_stats(req, season_id):
         }
         return playoff_order.get(week_name, week_name)
     
-    sorted_weeks = sorted(all_weeks, key=week_sort_key)
+    return sorted(all_weeks, key=week_sort_key)
+
+
+def get_season_player_stats(season: Season, week_filter: str, weeks: List[str]) -> StatFrame:
+    """
+    Sum each player's stats for the weeks selected by week_filter ('all_regular_season', 'all_playoffs',
+    'all_season' or a week name) and add rate stats and other derived metrics. The rows are sorted by
+    time played (descending).
+    """
+    # Week rollups to sum for the selected filter
+    if week_filter == 'all_regular_season':
+        week_rows = models.Q(weekly_stats__week__startswith="Week")
+    elif week_filter == 'all_playoffs':
+        week_rows = models.Q(weekly_stats__week__in=[w for w in weeks if not w.startswith('Week')])
+    elif week_filter == 'all_season':
+        week_rows = models.Q(weekly_stats__isnull=False)
+    else:
+        week_rows = models.Q(weekly_stats__week=week_filter)
+    
+    # Sum each player's week rollups in a single grouped query, sorted by time played (descending)
+    stats_list = list(
+        PlayerSeason.objects.filter(
+            week_rows,
+            season=season
+        ).values(
+            'playing_as', 'player_id', 'team_id', team_abbr=models.F('team__abbr')
+        ).annotate(**{
+            field: Coalesce(models.Sum(f'weekly_stats__{field}'), 0)
+            for field in STAT_FIELDS
+        }).order_by('-time_played', 'id')
+    )
+    
+    # Convert time fields and calculate rate stats and other derived metrics for all players at once
+    return StatFrame(stats_list).add_time_columns().add_derived_stats()
+
+
+@cache_season_page(get_season_data_version)
+def season_stats(req, season_id):
+    """View season player statistics."""
+    season = get_object_or_404(Season, id=season_id)
+    
+    # Get all seasons from the same league for dropdown
+    league_seasons = Season.objects.filter(league=season.league).order_by('-end_date')
+    
+    # Get week filter and stat view from query params
+    week_filter = req.GET.get('week', 'all_regular_season')
+    stat_view = req.GET.get('view', 'basic')
+    
+    # Get all weeks for this season to build dropdown
+    sorted_weeks = get_season_weeks(season)
     
     # Build week options
     week_options = [
@@ -537,481 +447,86 @@ def season_stats(req, season_id):
     for week in sorted_weeks:
         week_options.append({'value': week, 'label': week})
     
-    # Build stat view options
-    stat_view_options = [
-        {'value': 'basic', 'label': 'Basic'},
-        {'value': 'offense', 'label': 'Offense'},
-        {'value': 'defense', 'label': 'Defense'},
-        {'value': 'offense_rates', 'label': 'Offense Rates'},
-        {'value': 'defense_rates', 'label': 'Defense Rates'},
-        {'value': 'miscellaneous', 'label': 'Miscellaneous'},
-    ]
-    
-    # Get stats based on week filter
-    if week_filter == 'all_regular_season':
-        # Use PlayerSeasonStats but filter to only regular season data
-        player_season_stats = PlayerSeasonStats.objects.filter(
-            player_season__season=season
-        ).select_related(
-            'player_season__player',
-            'player_season__team'
-        )
-        
-        # Convert to final stats list
-        stats_list = []
-        for stat in player_season_stats:
-            player_season = stat.player_season
-            
-            # Note: This assumes PlayerSeasonStats contains only regular season data
-            # If it includes playoff data, we'd need to aggregate from PlayerWeekStats
-            stats_data = {
-                'player': player_season.player,
-                'player_season': player_season,
-                'team': player_season.team,
-                'playing_as': player_season.playing_as,
-                'time_played': stat.time_played or 0,
-                'tags': stat.tags or 0,
-                'pops': stat.pops or 0,
-                'grabs': stat.grabs or 0,
-                'drops': stat.drops or 0,
-                'hold': stat.hold or 0,
-                'captures': stat.captures or 0,
-                'prevent': stat.prevent or 0,
-                'returns': stat.returns or 0,
-                'powerups': stat.powerups or 0,
-                # Advanced stats
-                'caps_for': stat.caps_for or 0,
-                'caps_against': stat.caps_against or 0,
-                'total_pups_in_game': stat.total_pups_in_game or 0,
-                'grabs_off_handoffs': stat.grabs_off_handoffs or 0,
-                'caps_off_handoffs': stat.caps_off_handoffs or 0,
-                'grabs_off_regrab': stat.grabs_off_regrab or 0,
-                'caps_off_regrab': stat.caps_off_regrab or 0,
-                'long_holds': stat.long_holds or 0,
-                'flaccids': stat.flaccids or 0,
-                'handoffs': stat.handoffs or 0,
-                'good_handoffs': stat.good_handoffs or 0,
-                'quick_returns': stat.quick_returns or 0,
-                'returns_in_base': stat.returns_in_base or 0,
-                'saves': stat.saves or 0,
-                'key_returns': stat.key_returns or 0,
-                'hold_against': stat.hold_against or 0,
-                'kept_flags': stat.kept_flags or 0,
-            }
-            
-            # Convert time fields
-            stats_data['time_played_min'] = round(stats_data['time_played'] / 3600) if stats_data['time_played'] else 0
-            stats_data['hold_sec'] = round(stats_data['hold'] / 60) if stats_data['hold'] else 0
-            stats_data['prevent_sec'] = round(stats_data['prevent'] / 60) if stats_data['prevent'] else 0
-            stats_data['hold_against_sec'] = round(stats_data['hold_against'] / 60) if stats_data['hold_against'] else 0
-            
-            stats_list.append(stats_data)
-    
-    elif week_filter == 'all_playoffs':
-        # Aggregate from PlayerWeekStats for all playoff weeks
-        playoff_weeks = [w for w in sorted_weeks if not w.startswith('Week')]
-        
-        if playoff_weeks:
-            week_stats = PlayerWeekStats.objects.filter(
-                player_season__season=season,
-                week__in=playoff_weeks
-            ).select_related(
-                'player_season__player',
-                'player_season__team'
-            )
-            
-            # Aggregate stats by player
-            player_aggregates = {}
-            for stat in week_stats:
-                player_season = stat.player_season
-                key = (player_season.player.id, player_season.team.id if player_season.team else None)
-                
-                if key not in player_aggregates:
-                    player_aggregates[key] = {
-                        'player': player_season.player,
-                        'player_season': player_season,
-                        'team': player_season.team,
-                        'playing_as': player_season.playing_as,
-                        'time_played': 0,
-                        'tags': 0,
-                        'pops': 0,
-                        'grabs': 0,
-                        'drops': 0,
-                        'hold': 0,
-                        'captures': 0,
-                        'prevent': 0,
-                        'returns': 0,
-                        'powerups': 0,
-                        # Advanced stats
-                        'caps_for': 0,
-                        'caps_against': 0,
-                        'total_pups_in_game': 0,
-                        'grabs_off_handoffs': 0,
-                        'caps_off_handoffs': 0,
-                        'grabs_off_regrab': 0,
-                        'caps_off_regrab': 0,
-                        'long_holds': 0,
-                        'flaccids': 0,
-                        'handoffs': 0,
-                        'good_handoffs': 0,
-                        'quick_returns': 0,
-                        'returns_in_base': 0,
-                        'saves': 0,
-                        'key_returns': 0,
-                        'hold_against': 0,
-                        'kept_flags': 0,
-                    }
-                
-                # Aggregate each stat field
-                agg = player_aggregates[key]
-                agg['time_played'] += stat.time_played or 0
-                agg['tags'] += stat.tags or 0
-                agg['pops'] += stat.pops or 0
-                agg['grabs'] += stat.grabs or 0
-                agg['drops'] += stat.drops or 0
-                agg['hold'] += stat.hold or 0
-                agg['captures'] += stat.captures or 0
-                agg['prevent'] += stat.prevent or 0
-                agg['returns'] += stat.returns or 0
-                agg['powerups'] += stat.powerups or 0
-                # Advanced stats
-                agg['caps_for'] += stat.caps_for or 0
-                agg['caps_against'] += stat.caps_against or 0
-                agg['total_pups_in_game'] += stat.total_pups_in_game or 0
-                agg['grabs_off_handoffs'] += stat.grabs_off_handoffs or 0
-                agg['caps_off_handoffs'] += stat.caps_off_handoffs or 0
-                agg['grabs_off_regrab'] += stat.grabs_off_regrab or 0
-                agg['caps_off_regrab'] += stat.caps_off_regrab or 0
-                agg['long_holds'] += stat.long_holds or 0
-                agg['flaccids'] += stat.flaccids or 0
-                agg['handoffs'] += stat.handoffs or 0
-                agg['good_handoffs'] += stat.good_handoffs or 0
-                agg['quick_returns'] += stat.quick_returns or 0
-                agg['returns_in_base'] += stat.returns_in_base or 0
-                agg['saves'] += stat.saves or 0
-                agg['key_returns'] += stat.key_returns or 0
-                agg['hold_against'] += stat.hold_against or 0
-                agg['kept_flags'] += stat.kept_flags or 0
-            
-            # Convert to final stats list
-            stats_list = []
-            for agg in player_aggregates.values():
-                # Convert time fields
-                agg['time_played_min'] = round(agg['time_played'] / 3600) if agg['time_played'] else 0
-                agg['hold_sec'] = round(agg['hold'] / 60) if agg['hold'] else 0
-                agg['prevent_sec'] = round(agg['prevent'] / 60) if agg['prevent'] else 0
-                
-                stats_list.append(agg)
-        else:
-            stats_list = []
+    # Sum each player's stats for the selected weeks, with rate stats and other derived metrics
+    frame = get_season_player_stats(season, week_filter, sorted_weeks)
+    stats_list = frame.rows
     
-    elif week_filter == 'all_season':
-        # Aggregate from PlayerWeekStats for all weeks (regular season + playoffs)
-        week_stats = PlayerWeekStats.objects.filter(
-            player_season__season=season
-        ).select_related(
-            'player_season__player',
-            'player_season__team'
-        )
-        
-        # Aggregate stats by player
-        player_aggregates = {}
-        for stat in week_stats:
-            player_season = stat.player_season
-            key = (player_season.player.id, player_season.team.id if player_season.team else None)
-            
-            if key not in player_aggregates:
-                player_aggregates[key] = {
-                    'player': player_season.player,
-                    'player_season': player_season,
-                    'team': player_season.team,
-                    'playing_as': player_season.playing_as,
-                    'time_played': 0,
-                    'tags': 0,
-                    'pops': 0,
-                    'grabs': 0,
-                    'drops': 0,
-                    'hold': 0,
-                    'captures': 0,
-                    'prevent': 0,
-                    'returns': 0,
-                    'powerups': 0,
-                    # Advanced stats
-                    'caps_for': 0,
-                    'caps_against': 0,
-                    'total_pups_in_game': 0,
-                    'grabs_off_handoffs': 0,
-                    'caps_off_handoffs': 0,
-                    'grabs_off_regrab': 0,
-                    'caps_off_regrab': 0,
-                    'long_holds': 0,
-                    'flaccids': 0,
-                    'handoffs': 0,
-                    'good_handoffs': 0,
-                    'quick_returns': 0,
-                    'returns_in_base': 0,
-                    'saves': 0,
-                    'key_returns': 0,
-                    'hold_against': 0,
-                    'kept_flags': 0,
-                }
-            
-            # Aggregate each stat field
-            agg = player_aggregates[key]
-            agg['time_played'] += stat.time_played or 0
-            agg['tags'] += stat.tags or 0
-            agg['pops'] += stat.pops or 0
-            agg['grabs'] += stat.grabs or 0
-            agg['drops'] += stat.drops or 0
-            agg['hold'] += stat.hold or 0
-            agg['captures'] += stat.captures or 0
-            agg['prevent'] += stat.prevent or 0
-            agg['returns'] += stat.returns or 0
-            agg['powerups'] += stat.powerups or 0
-            # Advanced stats
-            agg['caps_for'] += stat.caps_for or 0
-            agg['caps_against'] += stat.caps_against or 0
-            agg['total_pups_in_game'] += stat.total_pups_in_game or 0
-            agg['grabs_off_handoffs'] += stat.grabs_off_handoffs or 0
-            agg['caps_off_handoffs'] += stat.caps_off_handoffs or 0
-            agg['grabs_off_regrab'] += stat.grabs_off_regrab or 0
-            agg['caps_off_regrab'] += stat.caps_off_regrab or 0
-            agg['long_holds'] += stat.long_holds or 0
-            agg['flaccids'] += stat.flaccids or 0
-            agg['handoffs'] += stat.handoffs or 0
-            agg['good_handoffs'] += stat.good_handoffs or 0
-            agg['quick_returns'] += stat.quick_returns or 0
-            agg['returns_in_base'] += stat.returns_in_base or 0
-            agg['saves'] += stat.saves or 0
-            agg['key_returns'] += stat.key_returns or 0
-            agg['hold_against'] += stat.hold_against or 0
-            agg['kept_flags'] += stat.kept_flags or 0
-        
-        # Convert to final stats list
-        stats_list = []
-        for agg in player_aggregates.values():
-            # Convert time fields
-            agg['time_played_min'] = round(agg['time_played'] / 3600) if agg['time_played'] else 0
-            agg['hold_sec'] = round(agg['hold'] / 60) if agg['hold'] else 0
-            agg['prevent_sec'] = round(agg['prevent'] / 60) if agg['prevent'] else 0
-            agg['hold_against_sec'] = round(agg['hold_against'] / 60) if agg['hold_against'] else 0
-            
-            stats_list.append(agg)
-    
-    else:
-        # Specific week selected - use PlayerWeekStats
-        week_stats = PlayerWeekStats.objects.filter(
-            player_season__season=season,
-            week=week_filter
-        ).select_related(
-            'player_season__player',
-            'player_season__team'
-        )
-        
-        # Convert to final stats list
-        stats_list = []
-        for stat in week_stats:
-            player_season = stat.player_season
-            
-            stats_data = {
-                'player': player_season.player,
-                'player_season': player_season,
-                'team': player_season.team,
-                'playing_as': player_season.playing_as,
-                'time_played': stat.time_played or 0,
-                'tags': stat.tags or 0,
-                'pops': stat.pops or 0,
-                'grabs': stat.grabs or 0,
-                'drops': stat.drops or 0,
-                'hold': stat.hold or 0,
-                'captures': stat.captures or 0,
-                'prevent': stat.prevent or 0,
-                'returns': stat.returns or 0,
-                'powerups': stat.powerups or 0,
-                # Advanced stats
-                'caps_for': stat.caps_for or 0,
-                'caps_against': stat.caps_against or 0,
-                'total_pups_in_game': stat.total_pups_in_game or 0,
-                'grabs_off_handoffs': stat.grabs_off_handoffs or 0,
-                'caps_off_handoffs': stat.caps_off_handoffs or 0,
-                'grabs_off_regrab': stat.grabs_off_regrab or 0,
-                'caps_off_regrab': stat.caps_off_regrab or 0,
-                'long_holds': stat.long_holds or 0,
-                'flaccids': stat.flaccids or 0,
-                'handoffs': stat.handoffs or 0,
-                'good_handoffs': stat.good_handoffs or 0,
-                'quick_returns': stat.quick_returns or 0,
-                'returns_in_base': stat.returns_in_base or 0,
-                'saves': stat.saves or 0,
-                'key_returns': stat.key_returns or 0,
-                'hold_against': stat.hold_against or 0,
-                'kept_flags': stat.kept_flags or 0,
-            }
-            
-            # Convert time fields
-            stats_data['time_played_min'] = round(stats_data['time_played'] / 3600) if stats_data['time_played'] else 0
-            stats_data['hold_sec'] = round(stats_data['hold'] / 60) if stats_data['hold'] else 0
-            stats_data['prevent_sec'] = round(stats_data['prevent'] / 60) if stats_data['prevent'] else 0
-            stats_data['hold_against_sec'] = round(stats_data['hold_against'] / 60) if stats_data['hold_against'] else 0
-            
-            stats_list.append(stats_data)
-    
-    # Sort by time played (descending)
-    stats_list.sort(key=lambda x: -x['time_played'])
-    
-    # Calculate derived stats based on the selected view
-    def calculate_derived_stats(stats_data):
-        """Calculate rate stats and other derived metrics"""
-        minutes = stats_data['time_played_min']
-        
-        # Rate stats (per minute)
-        stats_data['gpm'] = round(stats_data['grabs'] / minutes, 2) if minutes > 0 else 0
-        stats_data['cpm'] = round(stats_data['captures'] / minutes, 2) if minutes > 0 else 0
-        stats_data['hpm'] = round(stats_data['hold_sec'] / minutes, 2) if minutes > 0 else 0
-        stats_data['tpm'] = round(stats_data['tags'] / minutes, 2) if minutes > 0 else 0
-        stats_data['rpm'] = round(stats_data['returns'] / minutes, 2) if minutes > 0 else 0
-        stats_data['ppm'] = round(stats_data['prevent_sec'] / minutes, 2) if minutes > 0 else 0
-        stats_data['ham'] = round(stats_data.get('hold_against', 0) / 60 / minutes, 2) if minutes > 0 else 0
-        
-        # Ratio stats
-        stats_data['hold_per_grab'] = round(stats_data['hold_sec'] / stats_data['grabs'], 2) if stats_data['grabs'] > 0 else 0
-        stats_data['score_percent'] = round(stats_data['captures'] / stats_data['grabs'] * 100, 1) if stats_data['grabs'] > 0 else 0
-        stats_data['flaccid_percent'] = round(stats_data.get('flaccids', 0) / stats_data['grabs'] * 100, 1) if stats_data['grabs'] > 0 else 0
-        stats_data['chain_percent'] = round(stats_data.get('good_handoffs', 0) / stats_data.get('handoffs', 1) * 100, 1) if stats_data.get('handoffs', 0) > 0 else 0
-        stats_data['spark_percent'] = round((stats_data['captures'] - stats_data.get('caps_off_regrab', 0)) / stats_data['captures'] * 100, 1) if stats_data['captures'] > 0 else 0
-        stats_data['kd_ratio'] = round(stats_data['tags'] / stats_data['pops'], 2) if stats_data['pops'] > 0 else stats_data['tags']
-        stats_data['prevent_per_return'] = round(stats_data['prevent_sec'] / stats_data['returns'], 2) if stats_data['returns'] > 0 else 0
-        stats_data['prevent_per_hold_against'] = round(stats_data['prevent_sec'] / (stats_data.get('hold_against', 0) / 60), 2) if stats_data.get('hold_against', 0) > 0 else 0
-        stats_data['rib_percent'] = round(stats_data.get('returns_in_base', 0) / stats_data['returns'] * 100, 1) if stats_data['returns'] > 0 else 0
-        stats_data['qr_percent'] = round(stats_data.get('quick_returns', 0) / stats_data['returns'] * 100, 1) if stats_data['returns'] > 0 else 0
-        stats_data['pup_percent'] = round(stats_data['powerups'] / stats_data.get('total_pups_in_game', 1) * 100, 1) if stats_data.get('total_pups_in_game', 0) > 0 else 0
-        
-        # Derived counting stats
-        stats_data['plus_minus'] = stats_data.get('caps_for', 0) - stats_data.get('caps_against', 0)
-        stats_data['non_return_tags'] = stats_data['tags'] - stats_data['returns']
-        stats_data['non_drop_pops'] = stats_data['pops'] - stats_data['drops']
-        
-        return stats_data
-    
-    # Apply calculations to all players
-    for player_stat in stats_list:
-        calculate_derived_stats(player_stat)
-    
-    # Define column configurations for each view
-    stat_columns = {
-        'basic': [
-            {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
-            {'key': 'tags', 'label': 'Tags', 'type': 'number'},
-            {'key': 'pops', 'label': 'Pops', 'type': 'number'},
-            {'key': 'grabs', 'label': 'Grabs', 'type': 'number'},
-            {'key': 'drops', 'label': 'Drops', 'type': 'number'},
-            {'key': 'hold_sec', 'label': 'Hold', 'type': 'number'},
-            {'key': 'captures', 'label': 'Caps', 'type': 'number'},
-            {'key': 'prevent_sec', 'label': 'Prev', 'type': 'number'},
-            {'key': 'returns', 'label': 'Ret', 'type': 'number'},
-            {'key': 'powerups', 'label': 'Pups', 'type': 'number'},
-        ],
-        'offense': [
-            {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
-            {'key': 'grabs_off_handoffs', 'label': 'GOH', 'type': 'number', 'tooltip': 'Grabs Off Handoffs - grabs within <2 seconds of teammate drop from hold of <3 seconds'},
-            {'key': 'caps_off_handoffs', 'label': 'COH', 'type': 'number', 'tooltip': 'Caps Off Handoffs - caps after grabbing within <2 seconds of teammate drop from hold of <3 seconds'},
-            {'key': 'grabs_off_regrab', 'label': 'GOR', 'type': 'number', 'tooltip': 'Grabs Off Regrab - grabs within <2 seconds of teammate drop'},
-            {'key': 'caps_off_regrab', 'label': 'COR', 'type': 'number', 'tooltip': 'Caps Off Regrab - caps after grabbing within <2 seconds of teammate drop'},
-            {'key': 'long_holds', 'label': 'LH', 'type': 'number', 'tooltip': 'Long Holds - holds of >10 seconds'},
-            {'key': 'flaccids', 'label': 'FLcd', 'type': 'number', 'tooltip': 'Flaccids - drop after <2 seconds of hold'},
-            {'key': 'handoffs', 'label': 'HO', 'type': 'number', 'tooltip': 'Handoffs - hold for <3 seconds and teammate grabs within <2 seconds of the drop'},
-            {'key': 'good_handoffs', 'label': 'GH', 'type': 'number', 'tooltip': 'Good Handoffs - handoff resulting in teammate hold of >5 seconds'},
-        ],
-        'defense': [
-            {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
-            {'key': 'quick_returns', 'label': 'QR', 'type': 'number', 'tooltip': 'Quick Returns - return within <2 seconds of opponent hold'},
-            {'key': 'returns_in_base', 'label': 'RIB', 'type': 'number', 'tooltip': 'Returns In Base - return within 10 tiles of the team\'s flag'},
-            {'key': 'saves', 'label': 'Saves', 'type': 'number', 'tooltip': 'Saves - return within 10 tiles of the enemy flag'},
-            {'key': 'key_returns', 'label': 'KR', 'type': 'number', 'tooltip': 'Key Returns - return within <2 seconds before team caps'},
-            {'key': 'hold_against_sec', 'label': 'HA', 'type': 'number', 'tooltip': 'Hold Against - hold accumulated by opponents while playing (in seconds)'},
-        ],
-        'offense_rates': [
-            {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
-            {'key': 'gpm', 'label': 'GPM', 'type': 'number', 'tooltip': 'Grabs Per Minute - grabs / minutes played'},
-            {'key': 'cpm', 'label': 'CPM', 'type': 'number', 'tooltip': 'Caps Per Minute - captures / minutes played'},
-            {'key': 'hpm', 'label': 'HPM', 'type': 'number', 'tooltip': 'Hold Per Minute - hold / minutes played'},
-            {'key': 'hold_per_grab', 'label': 'H/G', 'type': 'number', 'tooltip': 'Hold per Grab - hold / grabs'},
-            {'key': 'score_percent', 'label': 'Score%', 'type': 'number', 'tooltip': 'Score Percentage - captures / grabs'},
-            {'key': 'chain_percent', 'label': 'Chain%', 'type': 'number', 'tooltip': 'Chain Percentage - good handoffs / handoffs'},
-            {'key': 'spark_percent', 'label': 'Spark%', 'type': 'number', 'tooltip': 'Spark Percentage - (captures - caps off regrab) / captures'},
-            {'key': 'flaccid_percent', 'label': 'Flaccid%', 'type': 'number', 'tooltip': 'Flaccid Percentage - flaccids / grabs'},
-        ],
-        'defense_rates': [
-            {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
-            {'key': 'tpm', 'label': 'TPM', 'type': 'number', 'tooltip': 'Tags Per Minute - tags / minutes played'},
-            {'key': 'rpm', 'label': 'RPM', 'type': 'number', 'tooltip': 'Returns Per Minute - returns / minutes played'},
-            {'key': 'ppm', 'label': 'PPM', 'type': 'number', 'tooltip': 'Prevent Per Minute - prevent / minutes played'},
-            {'key': 'ham', 'label': 'HAM', 'type': 'number', 'tooltip': 'Hold Against Per Minute - hold against / minutes played'},
-            {'key': 'prevent_per_return', 'label': 'P/R', 'type': 'number', 'tooltip': 'Prevent per Return - prevent / returns'},
-            {'key': 'prevent_per_hold_against', 'label': 'P/HA', 'type': 'number', 'tooltip': 'Prevent per Hold Against - prevent / hold against'},
-            {'key': 'rib_percent', 'label': 'RIB%', 'type': 'number', 'tooltip': 'Return In Base Percentage - returns in base / returns'},
-            {'key': 'qr_percent', 'label': 'QR%', 'type': 'number', 'tooltip': 'Quick Return Percentage - quick returns / returns'},
-        ],
-        'miscellaneous': [
-            {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
-            {'key': 'plus_minus', 'label': 'PM', 'type': 'number', 'tooltip': 'Plus/Minus - caps for - caps against'},
-            {'key': 'kept_flags', 'label': 'KF', 'type': 'number', 'tooltip': 'Kept Flags - times holding flag as the game ends'},
-            {'key': 'kd_ratio', 'label': 'K/D', 'type': 'number', 'tooltip': 'Kill/Death Ratio - tags / pops'},
-            {'key': 'non_return_tags', 'label': 'NRTags', 'type': 'number', 'tooltip': 'Non-Return Tags - tags - returns'},
-            {'key': 'non_drop_pops', 'label': 'NDPops', 'type': 'number', 'tooltip': 'Non-Drop Pops - pops - drops'},
-            {'key': 'pup_percent', 'label': 'Pup%', 'type': 'number', 'tooltip': 'Powerup Percentage - powerups / total pups in game'},
-        ]
-    }
+    # Sort, filter and paginate on the server so only one page of rows is rendered
+    columns = STAT_COLUMNS[stat_view]
+    table_options = get_table_options(req.GET, columns, default_sort='time_played_min')
+    page = sort_and_paginate(frame, table_options)
+    headers = get_sort_headers(req.GET, [
+        {'key': 'player', 'label': 'Player', 'type': 'text', 'class': 'team-name'},
+        {'key': 'team', 'label': 'Team', 'type': 'text'},
+    ] + columns, table_options)
     
     # Prepare data for template with column values extracted
+    column_values = [frame.to_list(column['key']) for column in columns]
     template_stats = []
-    for player_stat in stats_list:
-        stat_row = {
-            'player': player_stat['player'],
-            'player_season': player_stat.get('player_season'),
-            'team': player_stat.get('team'),
+    for i in page.object_list:
+        player_stat = stats_list[i]
+        template_stats.append({
+            'player_id': player_stat['player_id'],
+            'team_id': player_stat['team_id'],
+            'team_abbr': player_stat['team_abbr'],
             'playing_as': player_stat['playing_as'],
-            'column_values': []
-        }
-        
-        for column in stat_columns[stat_view]:
-            value = player_stat.get(column['key'], 0)
-            stat_row['column_values'].append(value)
-        
-        template_stats.append(stat_row)
+            'column_values': [values[i] for values in column_values]
+        })
     
-    return render(req, 'reference/season_stats.html', {
+    context = {
         'season': season,
         'league_seasons': league_seasons,
         'player_stats': template_stats,
         'week_options': week_options,
         'current_week': week_filter,
-        'stat_view_options': stat_view_options,
+        'stat_view_options': STAT_VIEW_OPTIONS,
         'current_stat_view': stat_view,
-        'stat_columns': stat_columns[stat_view],
-    })
+        'stat_columns': columns,
+        'table_headers': headers,
+        'table_options': table_options,
+        'page': page,
+        'previous_page_url': table_url(req.GET, page=page.previous_page_number()) if page.has_previous() else None,
+        'next_page_url': table_url(req.GET, page=page.next_page_number()) if page.has_next() else None,
+    }
+    
+    # The table's JS requests just the table when changing sort, filter or page
+    if req.GET.get('partial'):
+        return render(req, 'reference/season_stats_table.html', context)
+    return render(req, 'reference/season_stats.html', context)
+
+
+def get_season_rosters(season: Season) -> List[Dict]:
+    """
+    Return each team in the season (by name) with its players (by name), each with their position
+    and minutes played in the season. Teams and players are loaded in one query each, and players
+    are grouped by team here rather than queried team by team.
+    """
+    teams = TeamSeason.objects.filter(season=season).select_related(
+        'franchise', 'captain', 'co_captain'
+    ).order_by('name')
+    rosters = {team.id: {'team': team, 'players': []} for team in teams}
+    
+    player_seasons = PlayerSeason.objects.filter(season=season, team__isnull=False).select_related(
+        'player'
+    ).annotate(
+        time_played=models.F('stats__time_played')
+    ).order_by('player__name')
+    for player_season in player_seasons:
+        player_season.minutes_played = round(player_season.time_played / 3600) if player_season.time_played else 0
+        rosters[player_season.team_id]['players'].append(player_season)
+    
+    return list(rosters.values())
 
 
+@cache_season_page(get_season_data_version)
 def season_rosters(req, season_id):
     """View season rosters with each team's players."""
-    season = get_object_or_404(Season, id=season_id)
+    season = get_object_or_404(Season.objects.select_related('league'), id=season_id)
     
     # Get all seasons from the same league for dropdown
     league_seasons = Season.objects.filter(league=season.league).order_by('-end_date')
     
-    # Get all teams in this season with their players
-    teams = TeamSeason.objects.filter(season=season).prefetch_related(
-        'players__player'
-    ).order_by('name')
-    
-    # Build roster data
-    rosters = []
-    for team in teams:
-        players = team.players.all().order_by('player__name')
-        rosters.append({
-            'team': team,
-            'players': players
-        })
+    rosters = get_season_rosters(season)
     
     return render(req, 'reference/season_rosters.html', {
         'season': season,
@@ -1020,20 +535,34 @@ def season_rosters(req, season_id):
     })
 
 
-def player_history(req, player_id):
-    """View player's career history across all seasons."""
-    player = get_object_or_404(Player, id=player_id)
-    
-    # Get league filter from query params
-    league_filter = req.GET.get('league', 'all')
-    
-    # Get all leagues for the filter dropdown
-    all_leagues = League.objects.filter(gamemode="CTF").order_by('ordering')
-    
+# Season stats (in ticks, for times) totaled in a player's career table
+PLAYER_HISTORY_FIELDS = ['time_played', 'captures', 'hold', 'prevent', 'returns']
+
+
+def get_player_history_stats(totals: Dict[str, int]) -> Dict:
+    """Convert raw stat totals for the career table to minutes and seconds."""
+    return {
+        'minutes_played': round(totals['time_played'] / 3600) if totals['time_played'] else 0,
+        'captures': totals['captures'] or 0,
+        'hold_sec': round(totals['hold'] / 60) if totals['hold'] else 0,
+        'prevent_sec': round(totals['prevent'] / 60) if totals['prevent'] else 0,
+        'returns': totals['returns'] or 0,
+    }
+
+
+def get_player_history(player: Player, league_filter: str = 'all') -> Dict:
+    """
+    Return the player's career table: 'seasons', a row of totals for each of their seasons (most
+    recent first), 'career', their totals across those seasons (None if there aren't any), and
+    'leagues', their totals in each league. league_filter is a league id, or 'all' for every CTF
+    league.
+
+    Everything comes from a single query; career and league totals are window sums over the rows.
+    """
     # Get all player seasons for this player
     player_seasons_query = PlayerSeason.objects.filter(player=player).select_related(
         'season__league', 'team'
-    ).prefetch_related('season__teams')
+    )
     
     # Apply league filter
     if league_filter != 'all':
@@ -1046,10 +575,20 @@ def player_history(req, player_id):
         # Filter to CTF leagues only
         player_seasons_query = player_seasons_query.filter(season__league__gamemode="CTF")
     
-    player_seasons = player_seasons_query.order_by('-season__end_date')
+    # Join each season's stats, plus their sums across all the seasons and within the season's league
+    in_league = [models.F('season__league_id')]
+    player_seasons = player_seasons_query.annotate(
+        **{f'season_{field}': models.F(f'stats__{field}') for field in PLAYER_HISTORY_FIELDS},
+        **{f'career_{field}': models.Window(models.Sum(f'stats__{field}')) for field in PLAYER_HISTORY_FIELDS},
+        **{f'league_{field}': models.Window(models.Sum(f'stats__{field}'), partition_by=in_league) for field in PLAYER_HISTORY_FIELDS},
+        career_seasons=models.Window(models.Count('id')),
+        league_seasons=models.Window(models.Count('id'), partition_by=in_league),
+    ).order_by('-season__end_date')
     
     # Build history data
     history_data = []
+    career = None
+    league_totals = {}
     for ps in player_seasons:
         season = ps.season
         team = ps.team
@@ -1058,45 +597,59 @@ def player_history(req, player_id):
         rank = team.seed if team else "—"
         playoff_finish = team.playoff_finish if team else "—"
         
-        # Get player season stats
-        try:
-            season_stats = PlayerSeasonStats.objects.get(player_season=ps)
-            total_time = season_stats.time_played or 0
-            total_caps = season_stats.captures or 0
-            total_hold = season_stats.hold or 0
-            total_prevent = season_stats.prevent or 0
-            total_returns = season_stats.returns or 0
-        except PlayerSeasonStats.DoesNotExist:
-            total_time = total_caps = total_hold = total_prevent = total_returns = 0
-        
-        # Convert time units
-        minutes_played = round(total_time / 3600) if total_time else 0
-        hold_sec = round(total_hold / 60) if total_hold else 0
-        prevent_sec = round(total_prevent / 60) if total_prevent else 0
-        
         history_data.append({
             'season': season,
             'team': team,
             'rank': rank,
             'playoff_finish': playoff_finish,
-            'minutes_played': minutes_played,
-            'captures': total_caps,
-            'hold_sec': hold_sec,
-            'prevent_sec': prevent_sec,
-            'returns': total_returns,
+            **get_player_history_stats({field: getattr(ps, f'season_{field}') for field in PLAYER_HISTORY_FIELDS}),
         })
+        
+        if career is None:
+            career = {
+                'seasons': ps.career_seasons,
+                **get_player_history_stats({field: getattr(ps, f'career_{field}') for field in PLAYER_HISTORY_FIELDS}),
+            }
+        if season.league_id not in league_totals:
+            league_totals[season.league_id] = {
+                'league': season.league,
+                'seasons': ps.league_seasons,
+                **get_player_history_stats({field: getattr(ps, f'league_{field}') for field in PLAYER_HISTORY_FIELDS}),
+            }
+    
+    return {
+        'seasons': history_data,
+        'career': career,
+        'leagues': sorted(league_totals.values(), key=lambda totals: totals['league'].ordering),
+    }
+
+
+def player_history(req, player_id):
+    """View player's career history across all seasons."""
+    player = get_object_or_404(Player, id=player_id)
+    
+    # Get league filter from query params
+    league_filter = req.GET.get('league', 'all')
+    
+    # Get all leagues for the filter dropdown
+    all_leagues = League.objects.filter(gamemode="CTF").order_by('ordering')
+    
+    history = get_player_history(player, league_filter)
     
     return render(req, 'reference/player_history.html', {
         'player': player,
-        'history_data': history_data,
+        'history_data': history['seasons'],
+        'career_totals': history['career'],
+        'league_totals': history['leagues'] if len(history['leagues']) > 1 else [],
         'leagues': all_leagues,
         'current_league': league_filter,
     })
 
 
+@cache_season_page(get_team_data_version)
 def team_season(req, team_id):
     """View team season information, roster, stats, and schedule."""
-    team = get_object_or_404(TeamSeason, id=team_id)
+    team = get_object_or_404(TeamSeason.objects.select_related('season', 'franchise', 'record'), id=team_id)
     season = team.season
     franchise = team.franchise
     
@@ -1104,43 +657,8 @@ def team_season(req, team_id):
     rank = team.seed if team.seed else "—"
     playoff_finish = team.playoff_finish if team.playoff_finish else "—"
     
-    # Calculate team record (W-OTW-OTL-L)
-    team_games = Game.objects.filter(
-        models.Q(red_team=team) | models.Q(blue_team=team),
-        match__season=season,
-        match__week__startswith="Week"
-    )
-    
-    wins = ot_wins = ot_losses = losses = 0
-    for game in team_games:
-        is_team1 = (team == game.match.team1)
-        
-        if game.outcome:
-            if is_team1:
-                outcome = game.outcome
-            else:
-                outcome_map = {'W': 'L', 'OTW': 'OTL', 'L': 'W', 'OTL': 'OTW', 'T': 'T'}
-                outcome = outcome_map.get(game.outcome, game.outcome)
-            
-            if outcome == 'W':
-                wins += 1
-            elif outcome == 'OTW':
-                ot_wins += 1
-            elif outcome == 'OTL':
-                ot_losses += 1
-            elif outcome == 'L':
-                losses += 1
-        else:
-            # Determine by score if outcome not set
-            team_score = game.team1_score if is_team1 else game.team2_score
-            opponent_score = game.team2_score if is_team1 else game.team1_score
-            
-            if team_score > opponent_score:
-                wins += 1
-            elif team_score < opponent_score:
-                losses += 1
-    
-    record = f"{wins}-{ot_wins}-{ot_losses}-{losses}"
+    # Team record (W-OTW-OTL-L)
+    record = get_team_record(team).record
     
     # Get roster
     players = team.players.all().order_by('player__name')
@@ -1170,14 +688,11 @@ def team_season(req, team_id):
             'returns': stat.returns or 0,
             'powerups': stat.powerups or 0,
         }
-        
-        # Convert time fields
-        stats_data['time_played_min'] = round(stats_data['time_played'] / 3600) if stats_data['time_played'] else 0
-        stats_data['hold_sec'] = round(stats_data['hold'] / 60) if stats_data['hold'] else 0
-        stats_data['prevent_sec'] = round(stats_data['prevent'] / 60) if stats_data['prevent'] else 0
-        
         team_stats.append(stats_data)
     
+    # Convert time fields
+    StatFrame(team_stats).add_time_columns().write_to_rows()
+    
     # Sort by time played (descending)
     team_stats.sort(key=lambda x: -x['time_played'])
     
@@ -1185,82 +700,10 @@ def team_season(req, team_id):
     matches = Match.objects.filter(
         models.Q(team1=team) | models.Q(team2=team),
         season=season
-    ).select_related('team1__franchise', 'team2__franchise').prefetch_related('games', 'playoff_series').order_by('date')
+    ).select_related('team1__franchise', 'team2__franchise', 'result').order_by('date')
     
     # Build schedule data
-    schedule_data = []
-    for match in matches:
-        # Get games for this match
-        games = list(match.games.all())
-        
-        # Build box score data
-        if games:
-            # Calculate totals
-            team1_total = 0
-            team2_total = 0
-            is_playoff = hasattr(match, 'playoff_series') and match.playoff_series
-            
-            game_results = []
-            for game in games:
-                # Determine scores and winner
-                team1_score = game.team1_score
-                team2_score = game.team2_score
-                
-                # Check if overtime
-                is_overtime = game.outcome in ['OTW', 'OTL'] if game.outcome else False
-                
-                # Determine game winner
-                if team1_score > team2_score:
-                    game_winner = 'team1'
-                    if not is_playoff:
-                        team1_total += game.team1_standing_points or 0
-                        team2_total += game.team2_standing_points or 0
-                    else:
-                        team1_total += 1
-                elif team2_score > team1_score:
-                    game_winner = 'team2'
-                    if not is_playoff:
-                        team1_total += game.team1_standing_points or 0
-                        team2_total += game.team2_standing_points or 0
-                    else:
-                        team2_total += 1
-                else:
-                    game_winner = 'tie'
-                    if not is_playoff:
-                        team1_total += game.team1_standing_points or 0
-                        team2_total += game.team2_standing_points or 0
-                
-                game_results.append({
-                    'team1_score': team1_score,
-                    'team2_score': team2_score,
-                    'winner': game_winner,
-                    'is_overtime': is_overtime,
-                    'game_number': game.game_in_match
-                })
-            
-            # Determine match winner
-            if is_playoff:
-                match_winner = 'team1' if team1_total > team2_total else 'team2' if team2_total > team1_total else 'tie'
-            else:
-                match_winner = 'team1' if team1_total > team2_total else 'team2' if team2_total > team1_total else 'tie'
-            
-            match_data = {
-                'match': match,
-                'games': game_results,
-                'team1_total': team1_total,
-                'team2_total': team2_total,
-                'match_winner': match_winner,
-                'is_playoff': is_playoff,
-                'has_games': True
-            }
-        else:
-            match_data = {
-                'match': match,
-                'games': [],
-                'has_games': False
-            }
-        
-        schedule_data.append(match_data)
+    schedule_data = [get_match_schedule_data(match) for match in matches]
     
     return render(req, 'reference/team_season.html', {
         'team': team,
@@ -1275,6 +718,10 @@ def team_season(req, team_id):
     })
 
 
+# Stats totaled in the franchise all-time and match player stats tables
+PLAYER_TABLE_STAT_FIELDS = ['time_played', 'tags', 'pops', 'grabs', 'drops', 'hold', 'captures', 'prevent', 'returns', 'powerups']
+
+
 def franchise_history(req, franchise_id):
     """View franchise's history across all seasons."""
     franchise = get_object_or_404(Franchise, id=franchise_id)
@@ -1285,10 +732,10 @@ def franchise_history(req, franchise_id):
     # Get all leagues for the filter dropdown
     all_leagues = League.objects.filter(gamemode="CTF").order_by('ordering')
     
-    # Get all team seasons for this franchise
+    # Get all team seasons for this franchise, along with their records
     team_seasons_query = TeamSeason.objects.filter(franchise=franchise).select_related(
-        'season__league', 'captain', 'co_captain'
-    ).prefetch_related('season__teams')
+        'season__league', 'captain', 'co_captain', 'record'
+    )
     
     # Apply league filter
     if league_filter != 'all':
@@ -1301,7 +748,20 @@ def franchise_history(req, franchise_id):
         # Filter to CTF leagues only
         team_seasons_query = team_seasons_query.filter(season__league__gamemode="CTF")
     
-    team_seasons = team_seasons_query.order_by('-season__end_date')
+    team_seasons = list(team_seasons_query.order_by('-season__end_date'))
+    franchise_team_ids = [ts.id for ts in team_seasons]
+    
+    # Find the player with the most minutes on each team, ranking every team's players in one query
+    most_minutes_stats = PlayerSeasonStats.objects.filter(
+        player_season__team__id__in=franchise_team_ids
+    ).annotate(
+        position=models.Window(
+            RowNumber(),
+            partition_by=[models.F('player_season__team_id')],
+            order_by=[models.F('time_played').desc(nulls_last=True), models.F('id').asc()]
+        )
+    ).filter(position=1).select_related('player_season__player')
+    most_minutes_players = {stat.player_season.team_id: stat.player_season.player for stat in most_minutes_stats}
     
     # Build history data
     history_data = []
@@ -1312,52 +772,8 @@ def franchise_history(req, franchise_id):
         rank = team.seed if team.seed else "—"
         playoff_finish = team.playoff_finish if team.playoff_finish else "—"
         
-        # Calculate team record (W-OTW-OTL-L)
-        team_games = Game.objects.filter(
-            models.Q(red_team=team) | models.Q(blue_team=team),
-            match__season=season,
-            match__week__startswith="Week"
-        )
-        
-        wins = ot_wins = ot_losses = losses = 0
-        for game in team_games:
-            is_team1 = (team == game.match.team1)
-            
-            if game.outcome:
-                if is_team1:
-                    outcome = game.outcome
-                else:
-                    outcome_map = {'W': 'L', 'OTW': 'OTL', 'L': 'W', 'OTL': 'OTW', 'T': 'T'}
-                    outcome = outcome_map.get(game.outcome, game.outcome)
-                
-                if outcome == 'W':
-                    wins += 1
-                elif outcome == 'OTW':
-                    ot_wins += 1
-                elif outcome == 'OTL':
-                    ot_losses += 1
-                elif outcome == 'L':
-                    losses += 1
-            else:
-                # Determine by score if outcome not set
-                team_score = game.team1_score if is_team1 else game.team2_score
-                opponent_score = game.team2_score if is_team1 else game.team1_score
-                
-                if team_score > opponent_score:
-                    wins += 1
-                elif team_score < opponent_score:
-                    losses += 1
-        
-        record = f"{wins}-{ot_wins}-{ot_losses}-{losses}"
-        
-        # Find player with most minutes
-        try:
-            most_minutes_stat = PlayerSeasonStats.objects.filter(
-                player_season__team=team
-            ).select_related('player_season__player').order_by('-time_played').first()
-            most_minutes_player = most_minutes_stat.player_season.player if most_minutes_stat else None
-        except PlayerSeasonStats.DoesNotExist:
-            most_minutes_player = None
+        # Team record (W-OTW-OTL-L)
+        record = get_team_record(team).record
         
         history_data.append({
             'season': season,
@@ -1367,66 +783,30 @@ def franchise_history(req, franchise_id):
             'record': record,
             'captain': team.captain,
             'co_captain': team.co_captain,
-            'most_minutes_player': most_minutes_player,
+            'most_minutes_player': most_minutes_players.get(team.id),
         })
     
-    # Get all-time player stats for this franchise (with same league filtering)
-    franchise_team_ids = [ts.id for ts in team_seasons]
+    # Get all-time player stats for this franchise (with same league filtering), totaled per player
+    # in the database and sorted by time played, then by when the player first played for the franchise
+    player_totals = PlayerSeasonStats.objects.filter(
+        player_season__team__id__in=franchise_team_ids
+    ).values(
+        'player_season__player_id', 'player_season__player__name'
+    ).annotate(
+        first_stat_id=models.Min('id'),
+        **{f'{field}_total': Coalesce(models.Sum(field), 0) for field in PLAYER_TABLE_STAT_FIELDS}
+    ).order_by('-time_played_total', 'first_stat_id')
+    
+    all_time_stats = [
+        {
+            'player': {'id': totals['player_season__player_id'], 'name': totals['player_season__player__name']},
+            **{field: totals[f'{field}_total'] for field in PLAYER_TABLE_STAT_FIELDS},
+        }
+        for totals in player_totals
+    ]
     
-    if franchise_team_ids:
-        franchise_season_stats = PlayerSeasonStats.objects.filter(
-            player_season__team__id__in=franchise_team_ids
-        ).select_related(
-            'player_season__player'
-        )
-        
-        # Aggregate stats by player across all seasons for this franchise
-        player_aggregates = {}
-        for stat in franchise_season_stats:
-            player = stat.player_season.player
-            
-            if player not in player_aggregates:
-                player_aggregates[player] = {
-                    'player': player,
-                    'time_played': 0,
-                    'tags': 0,
-                    'pops': 0,
-                    'grabs': 0,
-                    'drops': 0,
-                    'hold': 0,
-                    'captures': 0,
-                    'prevent': 0,
-                    'returns': 0,
-                    'powerups': 0,
-                }
-            
-            # Aggregate each stat field
-            agg = player_aggregates[player]
-            agg['time_played'] += stat.time_played or 0
-            agg['tags'] += stat.tags or 0
-            agg['pops'] += stat.pops or 0
-            agg['grabs'] += stat.grabs or 0
-            agg['drops'] += stat.drops or 0
-            agg['hold'] += stat.hold or 0
-            agg['captures'] += stat.captures or 0
-            agg['prevent'] += stat.prevent or 0
-            agg['returns'] += stat.returns or 0
-            agg['powerups'] += stat.powerups or 0
-        
-        # Convert time fields and prepare final stats list
-        all_time_stats = []
-        for agg in player_aggregates.values():
-            # Convert time fields
-            agg['time_played_min'] = round(agg['time_played'] / 3600) if agg['time_played'] else 0
-            agg['hold_sec'] = round(agg['hold'] / 60) if agg['hold'] else 0
-            agg['prevent_sec'] = round(agg['prevent'] / 60) if agg['prevent'] else 0
-            
-            all_time_stats.append(agg)
-        
-        # Sort by time played (descending)
-        all_time_stats.sort(key=lambda x: -x['time_played'])
-    else:
-        all_time_stats = []
+    # Convert time fields
+    StatFrame(all_time_stats).add_time_columns().write_to_rows()
     
     return render(req, 'reference/franchise_history.html', {
         'franchise': franchise,
@@ -1437,17 +817,8 @@ def franchise_history(req, franchise_id):
     })
 
 
-def match_view(req, match_id):
-    """Detailed view of a specific match with box score and player stats."""
-    match = get_object_or_404(Match, id=match_id)
-    season = match.season
-    
-    # Get all games in the match
-    games = Game.objects.filter(match=match).select_related(
-        'red_team__franchise', 'blue_team__franchise'
-    ).order_by('game_in_match')
-    
-    # Calculate box score data
+def get_match_box_score(match: Match, games) -> Dict:
+    """Return the game-by-game box score for a match, with each team's standing points, caps and the winner."""
     team1_total_score = 0
     team2_total_score = 0
     team1_total_caps = 0
@@ -1494,6 +865,77 @@ def match_view(req, match_id):
     else:
         match_winner = 'tie'
     
+    return {
+        'box_score_games': box_score_games,
+        'team1_total_score': team1_total_score,
+        'team2_total_score': team2_total_score,
+        'team1_total_caps': team1_total_caps,
+        'team2_total_caps': team2_total_caps,
+        'match_winner': match_winner,
+    }
+
+
+def get_match_game_stats(match: Match) -> List[Dict]:
+    """
+    Return a row of stats for every player in every game of the match (with the game and the team
+    they played for), from a single query. The match page's views are all pivoted from these rows.
+    """
+    return list(PlayerGameLog.objects.filter(game__match=match).values(
+        'game_id',
+        'team_id',
+        'player_season_id',
+        'player_season__player__id',
+        'player_season__player__name',
+        'player_season__playing_as',
+        **{field: models.F(f'stats__{field}') for field in PLAYER_TABLE_STAT_FIELDS}
+    ).order_by('id'))
+
+
+def get_match_team_stats(game_stats: List[Dict], team: TeamSeason, game_ids: Optional[Set[int]] = None) -> Dict:
+    """
+    Total the rows from get_match_game_stats for one team, in the given games (every game if
+    game_ids is None). Returns 'players', each player's totals sorted by time played, and 'totals',
+    the team's.
+    """
+    players = {}
+    totals = {field: 0 for field in PLAYER_TABLE_STAT_FIELDS}
+    for row in game_stats:
+        if row['team_id'] != team.id or (game_ids is not None and row['game_id'] not in game_ids):
+            continue
+        if row['player_season_id'] not in players:
+            players[row['player_season_id']] = {
+                'player_season__player__id': row['player_season__player__id'],
+                'player_season__player__name': row['player_season__player__name'],
+                'player_season__playing_as': row['player_season__playing_as'],
+                **{field: 0 for field in PLAYER_TABLE_STAT_FIELDS},
+            }
+        player = players[row['player_season_id']]
+        for field in PLAYER_TABLE_STAT_FIELDS:
+            player[field] += row[field] or 0
+            totals[field] += row[field] or 0
+    
+    # Sort by time played (descending)
+    team_stats = sorted(players.values(), key=lambda x: -x['time_played'])
+    
+    # Convert time fields from ticks
+    StatFrame(team_stats + [totals]).add_time_columns().write_to_rows()
+    return {'players': team_stats, 'totals': totals}
+
+
+@cache_season_page(get_match_data_version)
+def match_view(req, match_id):
+    """Detailed view of a specific match with box score and player stats."""
+    match = get_object_or_404(Match.objects.select_related('season', 'team1', 'team2'), id=match_id)
+    season = match.season
+    
+    # Get all games in the match
+    games = list(Game.objects.filter(match=match).select_related(
+        'red_team__franchise', 'blue_team__franchise'
+    ).order_by('game_in_match'))
+    
+    # Calculate box score data
+    box_score = get_match_box_score(match, games)
+    
     # Get player stats for all games (default view)
     selected_game = req.GET.get('game', 'all')
     
@@ -1504,91 +946,17 @@ def match_view(req, match_id):
     else:
         try:
             game_number = int(selected_game)
-            stats_games = games.filter(game_in_match=f"Game {game_number}")
+            stats_games = [game for game in games if game.game_in_match == f"Game {game_number}"]
             show_map_info = len(stats_games) == 1
         except (ValueError, TypeError):
             stats_games = games
             show_map_info = False
     
-    # Get player stats for both teams
-    def get_team_stats(team, games_filter):
-        # If showing all games, use PlayerWeekStats for the match week
-        if selected_game == 'all':
-            # Get all player_seasons who actually played for this team in this match
-            match_games = Game.objects.filter(match=match)
-            player_seasons_in_match = PlayerGameLog.objects.filter(
-                game__in=match_games,
-                team=team
-            ).values_list('player_season', flat=True).distinct()
-            
-            # Get week stats for players who actually played in the match
-            week_stats = PlayerWeekStats.objects.filter(
-                player_season__in=player_seasons_in_match,
-                week=match.week
-            ).select_related('player_season__player')
-            
-            team_stats = []
-            for stat in week_stats:
-                player_season = stat.player_season
-                stats_data = {
-                    'player_season__player__id': player_season.player.id,
-                    'player_season__player__name': player_season.player.name,
-                    'player_season__playing_as': player_season.playing_as,
-                    'time_played': stat.time_played or 0,
-                    'tags': stat.tags or 0,
-                    'pops': stat.pops or 0,
-                    'grabs': stat.grabs or 0,
-                    'drops': stat.drops or 0,
-                    'hold': stat.hold or 0,
-                    'captures': stat.captures or 0,
-                    'prevent': stat.prevent or 0,
-                    'returns': stat.returns or 0,
-                    'powerups': stat.powerups or 0,
-                }
-                
-                # Convert time fields
-                stats_data['time_played_min'] = round(stats_data['time_played'] / 3600) if stats_data['time_played'] else 0
-                stats_data['hold_sec'] = round(stats_data['hold'] / 60) if stats_data['hold'] else 0
-                stats_data['prevent_sec'] = round(stats_data['prevent'] / 60) if stats_data['prevent'] else 0
-                
-                team_stats.append(stats_data)
-            
-            # Sort by time played (descending)
-            team_stats.sort(key=lambda x: -x['time_played'])
-        else:
-            # For specific games, aggregate from PlayerGameLog
-            player_logs = PlayerGameLog.objects.filter(
-                game__in=games_filter,
-                team=team
-            ).select_related('player_season__player').values(
-                'player_season__player__id',
-                'player_season__player__name',
-                'player_season__playing_as',
-            ).annotate(
-                time_played=models.Sum('stats__time_played'),
-                tags=models.Sum('stats__tags'),
-                pops=models.Sum('stats__pops'),
-                grabs=models.Sum('stats__grabs'),
-                drops=models.Sum('stats__drops'),
-                hold=models.Sum('stats__hold'),
-                captures=models.Sum('stats__captures'),
-                prevent=models.Sum('stats__prevent'),
-                returns=models.Sum('stats__returns'),
-                powerups=models.Sum('stats__powerups'),
-            ).order_by('-time_played')
-            
-            team_stats = []
-            for log in player_logs:
-                # Convert time fields from seconds to minutes
-                log['time_played_min'] = round(log['time_played'] / 3600) if log['time_played'] else 0
-                log['hold_sec'] = round(log['hold'] / 60) if log['hold'] else 0
-                log['prevent_sec'] = round(log['prevent'] / 60) if log['prevent'] else 0
-                team_stats.append(log)
-        
-        return team_stats
-    
-    team1_stats = get_team_stats(match.team1, stats_games)
-    team2_stats = get_team_stats(match.team2, stats_games)
+    # Get player and team stats for both teams, from one query of every player's stats in every game
+    game_stats = get_match_game_stats(match)
+    stats_game_ids = {game.id for game in stats_games}
+    team1_stats = get_match_team_stats(game_stats, match.team1, stats_game_ids)
+    team2_stats = get_match_team_stats(game_stats, match.team2, stats_game_ids)
     
     # Get available games for dropdown
     game_options = [{'value': 'all', 'label': 'All Games'}]
@@ -1606,7 +974,7 @@ def match_view(req, match_id):
     # Get map info if single game is selected
     map_info = None
     if show_map_info and stats_games:
-        game = stats_games.first()
+        game = stats_games[0]
         map_info = {
             'map_name': game.map_name,
             'tagpro_eu_url': f"https://tagpro.eu/?match={game.tagpro_eu}" if game.tagpro_eu else None,
@@ -1619,14 +987,11 @@ def match_view(req, match_id):
     return render(req, 'reference/match_view.html', {
         'match': match,
         'season': season,
-        'box_score_games': box_score_games,
-        'team1_total_score': team1_total_score,
-        'team2_total_score': team2_total_score,
-        'team1_total_caps': team1_total_caps,
-        'team2_total_caps': team2_total_caps,
-        'match_winner': match_winner,
-        'team1_stats': team1_stats,
-        'team2_stats': team2_stats,
+        **box_score,
+        'team1_stats': team1_stats['players'],
+        'team2_stats': team2_stats['players'],
+        'team1_totals': team1_stats['totals'],
+        'team2_totals': team2_stats['totals'],
         'game_options': game_options,
         'selected_game': selected_game,
         'map_info': map_info,
@@ -0,0 +1,221 @@
+from django.db import transaction
+from datetime import date
+from typing import Dict, List, Optional
+
+from .search_index import update_search_documents
+from .stat_collection import update_team_records
+from .upserts import upsert
+from ..models import Franchise, Season, TeamSeason, Player, PlayerSeason, Match, Game, PlayerGameLog
+
+
+def _parse_date(value) -> date:
+    """Match dates arrive as YYYY-MM-DD strings; normalize them so they can be used as dict keys."""
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _referenced_names(json_data: Dict) -> Dict[str, set]:
+    """Collect every season, franchise, player and tagpro.eu ID the JSON refers to."""
+    names = {'seasons': set(), 'franchises': set(), 'players': set(), 'tagpro_eus': set()}
+    for ts_data in json_data.get('teamSeasons', []):
+        names['seasons'].add(ts_data['season'])
+        names['franchises'].add(ts_data['franchise'])
+    for ps_data in json_data.get('playerSeasons', []):
+        names['seasons'].add(ps_data['season'])
+        names['players'].add(ps_data['player'])
+    for match_data in json_data.get('matches', []):
+        names['seasons'].add(match_data['season'])
+        for game_data in match_data['games']:
+            names['tagpro_eus'].add(int(game_data['tagpro_eu']))
+    return names
+
+
+@transaction.atomic
+def import_json_data_to_db(json_data: Dict) -> Dict:
+    """
+    Import JSON data (see docs/json_import_schema.txt) into database idempotently.
+
+    All existing rows for the seasons referenced in the JSON are loaded up front into dicts keyed on
+    their natural keys, the rows that still need to be inserted are worked out in memory, and then
+    each model is written with a single upsert in dependency order. Rows inserted by a concurrent
+    import in the meantime are picked up by the upserts rather than raising an IntegrityError.
+    """
+    names = _referenced_names(json_data)
+
+    seasons_cache: Dict[str, Season] = {
+        s.name: s for s in Season.objects.filter(name__in=names['seasons'])
+    }
+    seasons = list(seasons_cache.values())
+    franchises_cache: Dict[str, Franchise] = {
+        f.name: f for f in Franchise.objects.filter(name__in=names['franchises'])
+    }
+    players_cache: Dict[str, Player] = {
+        p.name: p for p in Player.objects.filter(name__in=names['players'])
+    }
+    # (season id, team name) -> TeamSeason
+    team_seasons_cache: Dict[tuple, TeamSeason] = {
+        (ts.season_id, ts.name): ts for ts in TeamSeason.objects.filter(season__in=seasons)
+    }
+    # (season id, player id) -> PlayerSeason, i.e., the model's unique key
+    player_seasons_by_player: Dict[tuple, PlayerSeason] = {}
+    # (season id, playing_as) -> PlayerSeason, which is how gamelogs in the JSON refer to player seasons
+    player_seasons_cache: Dict[tuple, PlayerSeason] = {}
+    for ps in PlayerSeason.objects.filter(season__in=seasons):
+        player_seasons_by_player[(ps.season_id, ps.player_id)] = ps
+        player_seasons_cache.setdefault((ps.season_id, ps.playing_as), ps)
+    # (season id, team1 id, team2 id, date) -> Match
+    matches_cache: Dict[tuple, Match] = {
+        (m.season_id, m.team1_id, m.team2_id, m.date): m for m in Match.objects.filter(season__in=seasons)
+    }
+    existing_tagpro_eus = set(
+        Game.objects.filter(tagpro_eu__in=names['tagpro_eus']).values_list('tagpro_eu', flat=True)
+    )
+
+    # Franchises and team seasons
+    new_franchises: Dict[str, Franchise] = {}
+    new_team_seasons: List[TeamSeason] = []
+    for ts_data in json_data.get('teamSeasons', []):
+        season = seasons_cache.get(ts_data['season'])
+        if not season or (season.id, ts_data['name']) in team_seasons_cache:
+            continue
+
+        franchise_name = ts_data['franchise']
+        if franchise_name not in franchises_cache:
+            franchises_cache[franchise_name] = new_franchises[franchise_name] = Franchise(name=franchise_name)
+
+        team_season = TeamSeason(
+            season=season,
+            name=ts_data['name'],
+            franchise=franchises_cache[franchise_name],
+            abbr=ts_data['abbr']
+        )
+        team_seasons_cache[(season.id, ts_data['name'])] = team_season
+        new_team_seasons.append(team_season)
+
+    upsert(Franchise, new_franchises.values(), ['name'])
+    upsert(TeamSeason, new_team_seasons, ['franchise', 'season'])
+
+    # Players and player seasons
+    new_players: Dict[str, Player] = {}
+    pending_player_seasons = []
+    for ps_data in json_data.get('playerSeasons', []):
+        season = seasons_cache.get(ps_data['season'])
+        if not season:
+            continue
+
+        player_name = ps_data['player']
+        if player_name not in players_cache:
+            players_cache[player_name] = new_players[player_name] = Player(name=player_name)
+
+        # Get team season (allow null team)
+        team_season = None
+        if ps_data['team']:
+            team_season = team_seasons_cache.get((season.id, ps_data['team']))
+        pending_player_seasons.append((season, players_cache[player_name], ps_data['playing_as'], team_season))
+
+    upsert(Player, new_players.values(), ['name'])
+
+    new_player_seasons: List[PlayerSeason] = []
+    for season, player, playing_as, team_season in pending_player_seasons:
+        player_season = player_seasons_by_player.get((season.id, player.id))
+        if player_season is None:
+            player_season = PlayerSeason(season=season, player=player, playing_as=playing_as, team=team_season)
+            player_seasons_by_player[(season.id, player.id)] = player_season
+            new_player_seasons.append(player_season)
+        player_seasons_cache[(season.id, playing_as)] = player_season
+    upsert(PlayerSeason, new_player_seasons, ['season', 'player'])
+
+    # Matches
+    new_matches: List[Match] = []
+    match_plans = []
+    for match_data in json_data.get('matches', []):
+        season = seasons_cache.get(match_data['season'])
+        if not season:
+            continue
+
+        team1 = team_seasons_cache.get((season.id, match_data['team1']))
+        team2 = team_seasons_cache.get((season.id, match_data['team2']))
+        if not team1 or not team2:
+            continue
+
+        match_date = _parse_date(match_data['date'])
+        match_key = (season.id, team1.id, team2.id, match_date)
+        match: Optional[Match] = matches_cache.get(match_key)
+        if match is None:
+            match = Match(season=season, team1=team1, team2=team2, date=match_date, week=match_data['week'])
+            matches_cache[match_key] = match
+            new_matches.append(match)
+        match_plans.append((season, match, match_data['games']))
+    Match.objects.bulk_create(new_matches)
+
+    # Games
+    created_count = 0
+    skipped_count = 0
+    new_games: List[Game] = []
+    gamelog_plans = []
+    for season, match, games_data in match_plans:
+        game_in_match = 0
+        for game_data in games_data:
+            game_in_match += 1
+            red_team = team_seasons_cache.get((season.id, game_data['red_team']))
+            blue_team = team_seasons_cache.get((season.id, game_data['blue_team']))
+            if not red_team or not blue_team:
+                continue
+
+            # Check if game already exists (in the database or earlier in this file). Some exports
+            # store the ID as a string, so compare as ints.
+            tagpro_eu = int(game_data['tagpro_eu'])
+            if tagpro_eu in existing_tagpro_eus:
+                skipped_count += 1
+                continue
+            existing_tagpro_eus.add(tagpro_eu)
+
+            game = Game(
+                match=match,
+                red_team=red_team,
+                blue_team=blue_team,
+                team1_score=game_data['team1_score'],
+                team2_score=game_data['team2_score'],
+                map_name=game_data['map_name'],
+                map_id=game_data['map_id'] if game_data['map_id'] else None,
+                game_in_match=f"Game {game_in_match}",
+                tagpro_eu=tagpro_eu
+            )
+            new_games.append(game)
+            gamelog_plans.append((season, game, game_data['players']))
+            created_count += 1
+    upsert(Game, new_games, ['tagpro_eu'])
+
+    # Player game logs (games are all new, so only duplicates within the file need to be skipped)
+    new_gamelogs: List[PlayerGameLog] = []
+    for season, game, players_data in gamelog_plans:
+        logged_player_seasons = set()
+        for player_data in players_data:
+            player_season = player_seasons_cache.get((season.id, player_data['player_season']))
+            team = team_seasons_cache.get((season.id, player_data['team']))
+            if not player_season or not team or player_season.id in logged_player_seasons:
+                continue
+            logged_player_seasons.add(player_season.id)
+            new_gamelogs.append(PlayerGameLog(
+                game=game,
+                player_season=player_season,
+                playing_as=player_data['playing_as'],
+                team=team
+            ))
+    upsert(PlayerGameLog, new_gamelogs, ['game', 'player_season'])
+
+    # Bulk writes don't send signals, so index the new franchises, teams and players (and aliases) here
+    update_search_documents('franchise', [f.id for f in new_franchises.values()])
+    update_search_documents('team', [ts.id for ts in new_team_seasons])
+    update_search_documents('player', [ps.player.id for ps in new_player_seasons])
+
+    # Keep the denormalized team records in step with the new teams and games
+    affected_seasons = {season.id: season for season, _, _ in gamelog_plans}
+    affected_seasons.update({ts.season.id: ts.season for ts in new_team_seasons})
+    for season in affected_seasons.values():
+        update_team_records(season)
+
+    return {
+        'created_count': created_count,
+        'skipped_count': skipped_count,
+        'game_ids': [game.id for game in new_games],
+    }
@@ -0,0 +1,232 @@
+import json
+import os
+from datetime import date
+from typing import Any, Dict, Iterator, TextIO, Tuple
+
+
+class JsonImportStream:
+    """
+    Incrementally parse a JSON import file (see docs/json_import_schema.txt).
+
+    The file is read in fixed-size blocks and only one top-level array item is decoded at a time,
+    so memory use is bounded by the block size plus the largest single item (typically one match
+    with its games), not by the size of the file. Items larger than max_item_size are rejected
+    rather than read to the end of the file.
+    """
+    # Longest tail of a value that can be cut off by the end of the buffer and still look like a
+    # syntax error or a complete value (e.g. "-Infinit" or the "e-" of "2.5e-3"). Errors further back
+    # than this are genuine, apart from unterminated strings.
+    MAX_TOKEN_TAIL = 32
+
+    def __init__(self, fp: TextIO, block_size: int = 64 * 1024, max_item_size: int = 16 * 1024 * 1024):
+        self.fp = fp
+        self.block_size = block_size
+        self.max_item_size = max_item_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self, size: int = 0) -> bool:
+        """Read another block (or size characters, if larger) into the buffer, discarding what has already been consumed."""
+        if self.eof:
+            return False
+        block = self.fp.read(max(size, self.block_size))
+        if not block:
+            self.eof = True
+            return False
+        self.bytes_read += len(block)
+        self.buffer = self.buffer[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self.bytes_read - len(self.buffer) + self.pos}, found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def _grow(self) -> bool:
+        """
+        Read at least as much again as is left in the buffer, so decoding a large item is retried a
+        logarithmic number of times rather than once per block. Raises ValueError if the item being
+        decoded would grow past max_item_size.
+        """
+        remaining = len(self.buffer) - self.pos
+        if remaining >= self.max_item_size:
+            raise ValueError(
+                f"Item at offset {self.bytes_read - len(self.buffer) + self.pos} is larger than "
+                f"{self.max_item_size} bytes, or is invalid JSON"
+            )
+        return self._fill(remaining)
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value, reading more of the file until it is whole."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Only an error at the end of the buffer can be a value that's cut off
+                cut_off = e.msg.startswith("Unterminated string") or len(self.buffer) - e.pos <= self.MAX_TOKEN_TAIL
+                if cut_off and self._grow():
+                    continue
+                raise
+            # A number cut off by the end of the buffer (e.g. "2." of "2.5") can decode early, so
+            # only accept a value once the character after it is visibly a delimiter. Anything else
+            # is left for the caller to reject.
+            cut_off = end == len(self.buffer) or (
+                self.buffer[end] not in " \t\r\n,:]}" and len(self.buffer) - end <= self.MAX_TOKEN_TAIL
+            )
+            if cut_off and self._grow():
+                continue
+            self.pos = end
+            return value
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield (section, item) pairs, e.g. ('matches', {...}), in file order.
+        Top-level values that are not arrays are yielded whole.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            section = self._value()
+            self._expect(":")
+            if self._peek() == "[":
+                self.pos += 1
+                if self._peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield section, self._value()
+                        if self._peek() == ",":
+                            self.pos += 1
+                            continue
+                        self._expect("]")
+                        break
+            else:
+                yield section, self._value()
+
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("}")
+            return
+
+
+def iter_import_items(fp: TextIO, block_size: int = 64 * 1024) -> Iterator[Tuple[str, Any]]:
+    """Convenience wrapper around JsonImportStream."""
+    return iter(JsonImportStream(fp, block_size))
+
+
+class ImportValidationError(ValueError):
+    """Raised when an item in a JSON import file doesn't match docs/json_import_schema.txt."""
+
+
+def _require(item: Dict, key: str, kinds, where: str, nullable: bool = False) -> Any:
+    value = item.get(key) if isinstance(item, dict) else None
+    if value is None:
+        if nullable and isinstance(item, dict) and key in item:
+            return None
+        raise ImportValidationError(f"{where}: missing '{key}'")
+    if not isinstance(value, kinds) or isinstance(value, bool):
+        raise ImportValidationError(f"{where}: '{key}' has unexpected value {value!r}")
+    return value
+
+
+def _int(value: Any, key: str, where: str) -> int:
+    """Accept ints and digit strings (some exports store tagpro.eu IDs as strings)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ImportValidationError(f"{where}: '{key}' should be a number, got {value!r}")
+
+
+def normalize_import_item(section: str, item: Dict, index: int) -> Dict:
+    """
+    Validate one item from a JSON import file and return a copy with IDs converted to ints and dates
+    in YYYY-MM-DD format, so the writer doesn't have to second-guess the file. This doesn't touch the
+    database, so it can run in a worker process.
+    """
+    where = f"{section}[{index}]"
+    if section == 'teamSeasons':
+        return {key: _require(item, key, str, where) for key in ('season', 'franchise', 'name', 'abbr')}
+
+    if section == 'playerSeasons':
+        normalized = {key: _require(item, key, str, where) for key in ('season', 'player', 'playing_as')}
+        normalized['team'] = _require(item, 'team', str, where, nullable=True)
+        return normalized
+
+    if section == 'matches':
+        normalized = {key: _require(item, key, str, where) for key in ('season', 'week', 'team1', 'team2')}
+        try:
+            normalized['date'] = date.fromisoformat(_require(item, 'date', str, where)).isoformat()
+        except ValueError:
+            raise ImportValidationError(f"{where}: 'date' should be in YYYY-MM-DD format, got {item['date']!r}")
+        normalized['games'] = []
+        for game_index, game_data in enumerate(_require(item, 'games', list, where)):
+            game_where = f"{where}.games[{game_index}]"
+            game = {
+                'tagpro_eu': _int(_require(game_data, 'tagpro_eu', (int, str), game_where), 'tagpro_eu', game_where),
+                'map_name': _require(game_data, 'map_name', str, game_where),
+                'map_id': game_data.get('map_id') or None,
+                'red_team': _require(game_data, 'red_team', str, game_where),
+                'blue_team': _require(game_data, 'blue_team', str, game_where),
+                'team1_score': _require(game_data, 'team1_score', int, game_where),
+                'team2_score': _require(game_data, 'team2_score', int, game_where),
+                'players': [],
+            }
+            if game['map_id'] is not None:
+                game['map_id'] = _int(game['map_id'], 'map_id', game_where)
+            if {game['red_team'], game['blue_team']} != {normalized['team1'], normalized['team2']}:
+                raise ImportValidationError(f"{game_where}: red_team/blue_team don't match the match's teams")
+            for player_index, player_data in enumerate(_require(game_data, 'players', list, game_where)):
+                player_where = f"{game_where}.players[{player_index}]"
+                game['players'].append({
+                    key: _require(player_data, key, str, player_where)
+                    for key in ('team', 'player_season', 'playing_as')
+                })
+            normalized['games'].append(game)
+        return normalized
+
+    raise ImportValidationError(f"Unknown section '{section}'")
+
+
+def iter_normalized_import_items(fp: TextIO, block_size: int = 64 * 1024) -> Iterator[Tuple[str, Dict]]:
+    """Like iter_import_items, but each item is validated and normalized with normalize_import_item."""
+    index = 0
+    current_section = None
+    for section, item in iter_import_items(fp, block_size):
+        if section != current_section:
+            current_section, index = section, 0
+        yield section, normalize_import_item(section, item, index)
+        index += 1
+
+
+def load_import_file(path: str) -> Dict:
+    """
+    Parse, validate and normalize a whole import file. Meant to be run in a worker process: it has no
+    database access, and returns either the normalized sections or the first validation error.
+    """
+    result = {'path': path, 'data': {}, 'error': None, 'bytes': os.path.getsize(path)}
+    try:
+        with open(path, encoding="utf-8") as fp:
+            for section, item in iter_normalized_import_items(fp):
+                result['data'].setdefault(section, []).append(item)
+    except (ValueError, OSError) as e:
+        # ImportValidationError and json.JSONDecodeError are both ValueErrors
+        result['data'], result['error'] = {}, str(e)
+    return result
@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from functools import wraps
+from hashlib import md5
+from typing import Callable, Optional
+from .cache_versions import DataVersion, get_navigation_version
+
+
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def cache_season_page(get_version: Callable[..., Optional[DataVersion]]):
+    """
+    Cache a view's full response under (view, path and query string, data version), where the data
+    version comes from get_version (one of the data version getters in cache_versions.py, called
+    with the view's URL kwargs).
+
+    Importing or reprocessing games bumps the season's data version and changes to leagues or
+    seasons bump the navigation version, so a cached page is never served once its data changes
+    and old entries just expire instead of needing to be purged.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(req, **kwargs):
+            if req.method not in ('GET', 'HEAD'):
+                return view(req, **kwargs)
+
+            data_version = get_version(**kwargs)
+            if data_version is None:
+                # Let the view respond with its 404
+                return view(req, **kwargs)
+
+            path = md5(req.get_full_path().encode()).hexdigest()
+            key = f"page:{view.__name__}:{data_version[0]}:{get_navigation_version()}:{path}"
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(req, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response['Content-Type']), PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
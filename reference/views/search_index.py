@@ -0,0 +1,120 @@
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower, RowNumber
+from typing import Dict, Iterable, List, Optional
+from .cache_versions import bump_search_version
+from .upserts import upsert
+from ..models import League, Franchise, TeamSeason, Player, PlayerSeason, SearchDocument
+
+
+RESULTS_PER_KIND = 20
+
+# SQLite FTS5 table over SearchDocument.search_text, kept in sync by triggers (see migration 0021)
+FTS_TABLE = "reference_searchdocument_fts"
+
+# FTS5's trigram tokenizer can't match anything shorter
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+
+def _search_text(*terms: Optional[str]) -> str:
+    """Join the distinct, non-empty terms an object can be found by, one per line."""
+    return "\n".join(dict.fromkeys(term for term in terms if term))
+
+
+def build_search_documents(kind: str, ids: Optional[Iterable[int]] = None) -> List[SearchDocument]:
+    """Build the search documents for objects of one kind (every one of them if ids is None)."""
+    if kind in ('league', 'franchise'):
+        model = League if kind == 'league' else Franchise
+        objects = model.objects.all() if ids is None else model.objects.filter(id__in=ids)
+        return [
+            SearchDocument(kind=kind, object_id=id, name=name, abbr=abbr, search_text=_search_text(name, abbr))
+            for id, name, abbr in objects.values_list('id', 'name', 'abbr')
+        ]
+
+    if kind == 'team':
+        teams = TeamSeason.objects.all() if ids is None else TeamSeason.objects.filter(id__in=ids)
+        return [
+            SearchDocument(
+                kind=kind, object_id=id, name=name, abbr=abbr, season_name=season_name, sort_date=end_date,
+                search_text=_search_text(name, abbr)
+            )
+            for id, name, abbr, season_name, end_date in teams.values_list(
+                'id', 'name', 'abbr', 'season__name', 'season__end_date'
+            )
+        ]
+
+    # Players can be found by every name they've played as
+    players = Player.objects.all() if ids is None else Player.objects.filter(id__in=ids)
+    player_seasons = PlayerSeason.objects.all() if ids is None else PlayerSeason.objects.filter(player_id__in=ids)
+    aliases: Dict[int, List[str]] = {}
+    for player_id, playing_as in player_seasons.values_list('player_id', 'playing_as').order_by('season__end_date'):
+        aliases.setdefault(player_id, []).append(playing_as)
+    return [
+        SearchDocument(kind=kind, object_id=id, name=name, search_text=_search_text(name, *aliases.get(id, [])))
+        for id, name in players.values_list('id', 'name')
+    ]
+
+
+def update_search_documents(kind: str, ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Re-index objects of one kind (every one of them if ids is None) with a single upsert, removing
+    the documents of any that no longer exist, and bump the search version so every process rebuilds
+    its suggestion index.
+    """
+    if ids is not None:
+        ids = set(ids)
+        if not ids:
+            return
+
+    documents = build_search_documents(kind, ids)
+    upsert(SearchDocument, documents, ['kind', 'object_id'], update_fields=[
+        'name', 'abbr', 'season_name', 'sort_date', 'search_text'
+    ])
+
+    stale = SearchDocument.objects.filter(kind=kind).exclude(object_id__in=[d.object_id for d in documents])
+    if ids is not None:
+        stale = stale.filter(object_id__in=ids)
+    stale.delete()
+    bump_search_version()
+
+
+def rebuild_search_index() -> None:
+    """Re-index every league, franchise, team season and player."""
+    for kind, _ in SearchDocument.KINDS:
+        update_search_documents(kind)
+
+
+def search(query: str) -> Dict[str, List[SearchDocument]]:
+    """
+    Return up to RESULTS_PER_KIND matching documents of each kind, from a single query. A document
+    matches if the query is a substring of its name, abbreviation or (for players) any name they've
+    played as. Results are ranked exact matches first, then prefix matches, then the rest, with
+    teams from the latest seasons first and everything else alphabetically.
+    """
+    documents = SearchDocument.objects.all()
+    if connection.vendor == 'sqlite' and len(query) >= MIN_TRIGRAM_QUERY_LENGTH:
+        # A quoted FTS5 string matches as a substring with the trigram tokenizer
+        fts_query = '"' + query.replace('"', '""') + '"'
+        documents = documents.filter(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [fts_query]))
+    else:
+        # On PostgreSQL, pg_trgm's index on UPPER(search_text) serves this; on SQLite, queries too
+        # short for trigrams scan the (small) documents table instead of the tables it's built from
+        documents = documents.filter(search_text__icontains=query)
+
+    rank = models.Case(
+        models.When(models.Q(name__iexact=query) | models.Q(abbr__iexact=query), then=models.Value(0)),
+        models.When(name__istartswith=query, then=models.Value(1)),
+        default=models.Value(2),
+    )
+    documents = documents.annotate(
+        position=models.Window(
+            RowNumber(),
+            partition_by=[models.F('kind')],
+            order_by=[rank.asc(), models.F('sort_date').desc(nulls_last=True), Lower('name').asc()]
+        )
+    ).filter(position__lte=RESULTS_PER_KIND).order_by('kind', 'position')
+
+    results = {kind: [] for kind, _ in SearchDocument.KINDS}
+    for document in documents:
+        results[document.kind].append(document)
+    return results
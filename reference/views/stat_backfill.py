@@ -0,0 +1,215 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import json
+import os
+import django
+from django.db import connections, models, transaction
+from .cache_versions import bump_season_data_versions
+from .stat_collection import load_bulk_matches, parse_game_stats
+from .timelines import TimelineMatch, build_game_timeline, store_game_timelines
+from ..models import Game, GameTimeline, PlayerSeason, PlayerGameStats, PlayerRegulationGameStats, PlayerWeekStats, PlayerSeasonStats, PlayerCareerStats, Season
+
+
+BATCH_SIZE = 200
+
+# Player name -> (full game values, regulation values) of the stats being backfilled, in order
+GameStatValues = Dict[str, Tuple[List[int], List[int]]]
+
+# The fields of a game parse_game_stats reads, which is all a worker gets
+GAME_FIELDS = ['id', 'tagpro_eu', 'resumed_tagpro_eu', 'paused_time', 'resumed_stats_count_until']
+
+
+def compute_game_stat_values(task: Tuple[Game, GameTimeline, Optional[GameTimeline], List[str]]) -> Tuple[int, GameStatValues]:
+    """
+    Parse a game from its stored timeline (and that of the match it was resumed in, if any) and
+    return its ID and the values of the given stats for each player. This runs in a worker process,
+    so it doesn't touch the database.
+    """
+    game, timeline, resumed_timeline, fields = task
+    m2 = TimelineMatch(resumed_timeline) if resumed_timeline is not None else None
+    ps, ps_before_ot, _, _ = parse_game_stats(game, TimelineMatch(timeline), m2)
+    return game.id, {
+        name: ([ps[name][field] for field in fields], [ps_before_ot[name][field] for field in fields])
+        for name in ps
+    }
+
+
+def get_timelines(games: List[Game]) -> Dict[int, GameTimeline]:
+    """
+    Return the stored timelines of games' tagpro.eu matches, by match ID. Matches without one are
+    taken from the bulk export instead, if they're in it, and their timelines are stored.
+    """
+    match_ids = [match_id for game in games for match_id in (game.tagpro_eu, game.resumed_tagpro_eu) if match_id]
+    timelines = GameTimeline.objects.in_bulk(match_ids, field_name='tagpro_eu')
+
+    new_timelines = []
+    for game in games:
+        for match_id in (game.tagpro_eu, game.resumed_tagpro_eu):
+            if match_id and match_id not in timelines:
+                m = load_bulk_matches().get(str(match_id))
+                if m is not None:
+                    timelines[match_id] = build_game_timeline(game, m)
+                    new_timelines.append(timelines[match_id])
+    store_game_timelines(new_timelines)
+    return timelines
+
+
+def write_game_stat_values(fields: List[str], results: Dict[int, GameStatValues]) -> Set[int]:
+    """
+    Write the backfilled values of the given stats to the PlayerGameStats and PlayerRegulationGameStats
+    of a batch of games, with one bulk update of only those columns, of only the rows that changed,
+    per model. Returns the IDs of the player seasons with rows that changed.
+    """
+    changed_player_seasons = set()
+    for model, part in ((PlayerGameStats, 0), (PlayerRegulationGameStats, 1)):
+        rows = model.objects.filter(player_gamelog__game_id__in=results).values_list(
+            'id', 'player_gamelog__game_id', 'player_gamelog__playing_as', 'player_gamelog__player_season_id', *fields
+        )
+        changed = []
+        for id, game_id, playing_as, player_season_id, *old_values in rows:
+            values = results[game_id].get(playing_as)
+            if values is None or values[part] == old_values:
+                continue
+            changed.append(model(id=id, **dict(zip(fields, values[part]))))
+            changed_player_seasons.add(player_season_id)
+        model.objects.bulk_update(changed, fields, batch_size=500)
+    return changed_player_seasons
+
+
+def update_stat_rollups(fields: List[str], player_season_ids: Iterable[int]) -> None:
+    """
+    Recalculate only the given stat columns of the week, season and career totals of the given
+    player seasons, the way reaggregate_stats and update_player_career_stats do, with one grouped
+    query and one bulk update per level. The seasons' data versions are bumped, so their cached
+    pages are refreshed.
+    """
+    player_season_ids = set(player_season_ids)
+    if not player_season_ids:
+        return
+    sums = {f'{field}_sum': models.Sum(field) for field in fields}
+
+    def set_totals(objects: List[models.Model], key: Callable, totals: Dict, default=None) -> None:
+        for obj in objects:
+            row = totals.get(key(obj), {})
+            for field in fields:
+                value = row.get(f'{field}_sum')
+                setattr(obj, field, default if value is None else value)
+
+    # Week totals are of regulation game stats
+    week_totals = {
+        (row['player_gamelog__player_season_id'], row['player_gamelog__game__match__week']): row
+        for row in PlayerRegulationGameStats.objects.filter(
+            player_gamelog__player_season_id__in=player_season_ids
+        ).values('player_gamelog__player_season_id', 'player_gamelog__game__match__week').annotate(**sums).order_by()
+    }
+    weeks = list(PlayerWeekStats.objects.filter(player_season_id__in=player_season_ids).only('id', 'player_season_id', 'week'))
+    set_totals(weeks, lambda w: (w.player_season_id, w.week), week_totals)
+    PlayerWeekStats.objects.bulk_update(weeks, fields, batch_size=500)
+
+    # Season totals are of regular season weeks
+    season_totals = {
+        row['player_season_id']: row
+        for row in PlayerWeekStats.objects.filter(
+            player_season_id__in=player_season_ids,
+            week__startswith="Week"
+        ).values('player_season_id').annotate(**sums).order_by()
+    }
+    seasons = list(PlayerSeasonStats.objects.filter(player_season_id__in=player_season_ids).only('id', 'player_season_id'))
+    set_totals(seasons, lambda s: s.player_season_id, season_totals)
+    PlayerSeasonStats.objects.bulk_update(seasons, fields, batch_size=500)
+
+    # Career totals are of CTF seasons
+    player_ids = set(PlayerSeason.objects.filter(id__in=player_season_ids).values_list('player_id', flat=True))
+    career_totals = {
+        row['player_season__player_id']: row
+        for row in PlayerSeasonStats.objects.filter(
+            player_season__player_id__in=player_ids,
+            player_season__season__league__gamemode="CTF"
+        ).values('player_season__player_id').annotate(**sums).order_by()
+    }
+    careers = list(PlayerCareerStats.objects.filter(player_id__in=player_ids).only('id', 'player_id'))
+    set_totals(careers, lambda c: c.player_id, career_totals, default=0)
+    PlayerCareerStats.objects.bulk_update(careers, fields, batch_size=500)
+
+    bump_season_data_versions(Season.objects.filter(player_seasons__id__in=player_season_ids))
+
+
+def load_checkpoint(path: str, fields: List[str]) -> Dict:
+    """
+    Return the progress saved at path by an interrupted backfill of the given stats, or a fresh start
+    if there isn't any. Raises ValueError if the checkpoint is of a backfill of other stats.
+    """
+    if not os.path.exists(path):
+        return {'stats': fields, 'last_game_id': 0, 'player_season_ids': []}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint['stats'] != fields:
+        raise ValueError(f"{path} is a checkpoint of a backfill of {', '.join(checkpoint['stats'])}")
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Dict) -> None:
+    """Save a backfill's progress to path, replacing the previous checkpoint in one step so an interruption can't leave half of one."""
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def backfill_stats(
+        fields: List[str],
+        checkpoint_path: str,
+        workers: Optional[int] = None,
+        batch_size: int = BATCH_SIZE,
+        log: Callable[[str], None] = print
+    ) -> None:
+    """
+    Recalculate the given stats of every game from its stored timelines (or the bulk export, for
+    games without them), parsing games in batches across a pool of worker processes, and then
+    rebuild just those columns of the week, season and career totals of the players whose stats
+    changed.
+
+    Progress is checkpointed to checkpoint_path after every batch, and a backfill of the same stats
+    picks up from its checkpoint, so an interrupted backfill can be resumed by running it again.
+    The checkpoint is removed once the backfill is finished.
+    """
+    checkpoint = load_checkpoint(checkpoint_path, fields)
+    player_season_ids = set(checkpoint['player_season_ids'])
+    game_ids = list(Game.objects.filter(
+        tagpro_eu__isnull=False,
+        id__gt=checkpoint['last_game_id']
+    ).order_by('id').values_list('id', flat=True))
+    if checkpoint['last_game_id']:
+        log(f"Resuming after game {checkpoint['last_game_id']}, with {len(game_ids)} games left")
+
+    # Worker processes mustn't inherit this process's database connections
+    connections.close_all()
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        for start in range(0, len(game_ids), batch_size):
+            batch_ids = game_ids[start:start + batch_size]
+            games = list(Game.objects.filter(id__in=batch_ids).only(*GAME_FIELDS).order_by('id'))
+            timelines = get_timelines(games)
+            tasks = [
+                (game, timelines[game.tagpro_eu], timelines.get(game.resumed_tagpro_eu), fields)
+                for game in games
+                if game.tagpro_eu in timelines and (not game.resumed_tagpro_eu or game.resumed_tagpro_eu in timelines)
+            ]
+            results = dict(pool.map(compute_game_stat_values, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+            # Save which player seasons will need their totals rebuilt before writing anything, and
+            # how far the backfill got only once it's written, so resuming never skips either
+            with transaction.atomic():
+                changed = write_game_stat_values(fields, results)
+                player_season_ids |= changed
+                save_checkpoint(checkpoint_path, {**checkpoint, 'player_season_ids': sorted(player_season_ids)})
+            checkpoint = {**checkpoint, 'last_game_id': batch_ids[-1], 'player_season_ids': sorted(player_season_ids)}
+            save_checkpoint(checkpoint_path, checkpoint)
+            log(
+                f"Games {start + len(batch_ids)}/{len(game_ids)}: parsed {len(results)}, "
+                f"{len(games) - len(results)} without a timeline, {len(changed)} player seasons changed"
+            )
+
+    log(f"Rebuilding totals of {len(player_season_ids)} player seasons")
+    update_stat_rollups(fields, player_season_ids)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
@@ -1,6 +1,11 @@
 from django.db import models, transaction
-from typing import Dict, Tuple
-from ..models import Game, PlayerGameLog, PlayerGameStats, PlayerRegulationGameStats, PlayerSeason, PlayerWeekStats, PlayerSeasonStats, Season, TeamSeason, Match, PlayoffSeries
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from ..models import Game, GameTimeline, PlayerGameLog, PlayerGameStats, PlayerRegulationGameStats, PlayerSeason, PlayerWeekStats, PlayerSeasonStats, PlayerCareerStats, Season, StandingsSnapshot, TeamSeason, TeamSeasonRecord, Match, MatchResult, PlayoffSeries
+from .cache_versions import bump_season_data_version, bump_standings_version
+from .heatmaps import update_player_heatmaps
+from .timelines import TimelineMatch, build_game_timeline, store_game_timelines
+from .upserts import upsert
 import tagpro_eu
 
 
@@ -23,20 +28,51 @@ stat_defaults = {
 for f in HELPER_FIELDS:
     stat_defaults[f] = None
 
+# Game.outcome is from team1's perspective; this gives the outcome for team2
+OUTCOME_FROM_OTHER_SIDE = {'W': 'L', 'L': 'W', 'OTW': 'OTL', 'OTL': 'OTW', 'T': 'T'}
 
-with open("data/league_matches.json") as f1, open("data/bulkmaps.json", encoding="utf-8") as f2:
-    bulkmatches = [m for m in tagpro_eu.bulk.load_matches(
-       f1,
-        tagpro_eu.bulk.load_maps(f2)
-    )]
+# TeamSeasonRecord fields counted from a team's regular season games, in the order standings snapshots store them
+RECORD_FIELDS = ['games_played', 'wins', 'ot_wins', 'ot_losses', 'losses', 'standing_points', 'caps_for', 'caps_against']
+
+# Names leagues give the week of their championship series
+CHAMPIONSHIP_WEEKS = ['Super Ball', 'Muper Ball', 'Nuper Ball', 'Buper Ball']
+
+
+@lru_cache(maxsize=None)
+def load_bulk_matches() -> Dict[str, tagpro_eu.Match]:
+    """
+    Load the tagpro.eu bulk export, keyed by match ID. This is deferred until a game is actually
+    processed so that importing this module (e.g. from the admin or a management command) doesn't
+    pull the whole export into memory.
+    """
+    with open("data/league_matches.json") as f1, open("data/bulkmaps.json", encoding="utf-8") as f2:
+        return {
+            m.match_id: m
+            for m in tagpro_eu.bulk.load_matches(f1, tagpro_eu.bulk.load_maps(f2))
+        }
+
+
+def get_eu_match(game: Game, match_id: int) -> Union[tagpro_eu.Match, TimelineMatch]:
+    """
+    Return one of a game's tagpro.eu matches, rebuilt from its stored timeline if it has one.
+    Otherwise it's taken from the bulk export and its timeline is stored, so the game can be
+    reprocessed without the export from then on. Raises KeyError if it's in neither.
+    """
+    timeline = GameTimeline.objects.filter(tagpro_eu=match_id).first()
+    if timeline is not None:
+        return TimelineMatch(timeline)
+
+    m = load_bulk_matches()[str(match_id)]
+    store_game_timelines([build_game_timeline(game, m)])
+    return m
 
 
 def parse_stats_from_eu_match(
-        m: tagpro_eu.Match,
+        m: Union[tagpro_eu.Match, TimelineMatch],
         stats_count_until: int = 10 * 60
     ) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]], Dict[str, str], Tuple[int, int]]:
     """
-    Takes a tagpro_eu.Match and extracts all counting stats into a dict, and all player teams into another dict.
+    Takes a tagpro_eu.Match (or a TimelineMatch rebuilt from a stored timeline) and extracts all counting stats into a dict, and all player teams into another dict.
     Dict keys for both tuple members are player usernames from the game, and values are a dict with their counting stats
     and a dict for the team they played on last in the game.
     As third return value, returns the score at the end of regulation (10 minutes). As a tuple like (red_score, blue_score).
@@ -281,32 +317,20 @@ def parse_stats_from_eu_match(
     return ps, ps_before_ot, last_team_played_for, score_before_ot
 
 
-@transaction.atomic
-def process_game_stats(game: Game):
-    # Get all existing PlayerGameLogs for the game
-    players = {
-        p.playing_as: p
-        for p in PlayerGameLog.objects.filter(game=game)
-    }
-    
-    m, m2 = None, None
-    try:
-        m: tagpro_eu.Match = [g for g in bulkmatches if g.match_id == str(game.tagpro_eu)][0]
-        if game.resumed_tagpro_eu:
-            m2: tagpro_eu.match = [g for g in bulkmatches if g.match_id == str(game.resumed_tagpro_eu)][0]
-    except IndexError:
-        # if no tagpro.eu match found in bulkmatches, don't process
-        return None
-
+def parse_game_stats(
+        game: Game,
+        m: Union[tagpro_eu.Match, TimelineMatch],
+        m2: Optional[Union[tagpro_eu.Match, TimelineMatch]] = None
+    ) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]], Dict[str, str], bool]:
+    """
+    Parse a game's stats from its tagpro.eu match, adding the stats from m2, the match it was resumed
+    in, if it was paused. Returns the full game and regulation stats and the team each player played
+    on last (as parse_stats_from_eu_match does), and whether the game went to OT.
+    """
     ps, ps_before_ot, team_mapping, score_before_ot = parse_stats_from_eu_match(m, game.paused_time or 600)
     went_to_ot = score_before_ot != (m.team_red.score, m.team_blue.score)
-    
-    # Set the winner based on the score
-    team1_is_red = game.red_team == game.match.team1
-    game.team1_score = m.team_red.score if team1_is_red else m.team_blue.score
-    game.team2_score = m.team_blue.score if team1_is_red else m.team_red.score
 
-    if game.resumed_tagpro_eu:
+    if m2 is not None:
         ps2, ps2_before_ot, team_mapping2, score2_before_ot = parse_stats_from_eu_match(
             m2,
             stats_count_until=game.resumed_stats_count_until or 0
@@ -327,9 +351,37 @@ def process_game_stats(game: Game):
             
         for p in team_mapping2:
             team_mapping[p] = team_mapping2[p]
-        
+
+    return ps, ps_before_ot, team_mapping, went_to_ot
+
+
+@transaction.atomic
+def process_game_stats(game: Game, update_records: bool = True):
+    # Get all existing PlayerGameLogs for the game
+    players = {
+        p.playing_as: p
+        for p in PlayerGameLog.objects.filter(game=game)
+    }
+    
+    m, m2 = None, None
+    try:
+        m = get_eu_match(game, game.tagpro_eu)
+        if game.resumed_tagpro_eu:
+            m2 = get_eu_match(game, game.resumed_tagpro_eu)
+    except KeyError:
+        # if no tagpro.eu match found in stored timelines or bulkmatches, don't process
+        return None
+
+    ps, ps_before_ot, team_mapping, went_to_ot = parse_game_stats(game, m, m2)
+    
+    # Set the winner based on the score
+    team1_is_red = game.red_team == game.match.team1
+    game.team1_score = m.team_red.score if team1_is_red else m.team_blue.score
+    game.team2_score = m.team_blue.score if team1_is_red else m.team_red.score
+
+    if m2 is not None:
         # Update the score
-        if is_ot_period:
+        if not game.resumed_stats_count_until:
             game.team1_score += m2.team_red.score if team1_is_red else m2.team_blue.score
             game.team2_score += m2.team_blue.score if team1_is_red else m2.team_red.score
         else:
@@ -393,9 +445,16 @@ def process_game_stats(game: Game):
         game_stats.save()
         regulation_game_stats.save()
 
+    if update_records:
+        update_team_records(game.match.season)
+
 
-def reaggregate_stats(player_season: PlayerSeason):
-    """Re-aggregate week and season stat totals for all players in the game."""
+def reaggregate_stats(player_season: PlayerSeason, update_career: bool = True, update_heatmaps: bool = True):
+    """
+    Re-aggregate week and season stat totals for all players in the game. Pass update_career=False
+    and update_heatmaps=False when reaggregating many player seasons, and update them all with one
+    update_player_career_stats and one update_player_heatmaps call afterwards.
+    """
     weeks_in_season = Match.objects.filter(
         season=player_season.season
     ).values_list('week', flat=True).distinct()
@@ -421,6 +480,36 @@ def reaggregate_stats(player_season: PlayerSeason):
         )
         player_season_stats.save()
 
+    if update_career:
+        update_player_career_stats([player_season.player_id])
+    if update_heatmaps:
+        update_player_heatmaps([player_season.id])
+
+
+def update_player_career_stats(player_ids: Iterable[int]) -> None:
+    """
+    Recalculate the career totals (regular season, CTF leagues) of the given players from their
+    season stats, with one grouped query and one upsert.
+    """
+    careers = {player_id: PlayerCareerStats(player_id=player_id) for player_id in set(player_ids)}
+    if not careers:
+        return
+
+    totals = PlayerSeasonStats.objects.filter(
+        player_season__player_id__in=careers,
+        player_season__season__league__gamemode="CTF"
+    ).values('player_season__player_id').annotate(
+        seasons_played=models.Count('id'),
+        **{f'{field}_sum': models.Sum(field) for field in STAT_FIELDS}
+    ).order_by()
+    for row in totals:
+        career = careers[row['player_season__player_id']]
+        career.seasons_played = row['seasons_played']
+        for field in STAT_FIELDS:
+            setattr(career, field, row[f'{field}_sum'] or 0)
+
+    upsert(PlayerCareerStats, careers.values(), ['player'], update_fields=['seasons_played', *STAT_FIELDS])
+
 
 def aggregate_stats(pgs: models.QuerySet[PlayerGameStats]) -> Dict[str, int]:
     """
@@ -476,7 +565,6 @@ def rank_by_head_to_head(teams_data):
         team_data['_h2h_win_pct'] = h2h_win_pct
     
     teams_data.sort(key=lambda x: -x['_h2h_win_pct'])
-    print(teams_data)
     
     result = []
     i = 0
@@ -488,7 +576,6 @@ def rank_by_head_to_head(teams_data):
             i += 1
         
         if len(tied_group) > 1:
-            print(tied_group)
             tied_group = rank_by_common_opponents_record(tied_group)
         result.extend(tied_group)
     
@@ -613,74 +700,211 @@ def rank_by_total_caps(teams_data):
     return teams_data
 
 
+def count_game_in_record(record: TeamSeasonRecord, team_outcome: str, team_score: int, opponent_score: int, standing_points: int) -> None:
+    """
+    Add one regular season game to a team's record. Games with no outcome yet are counted as a win
+    or loss by score, and OT game-winners don't count towards caps for or against.
+    """
+    record.games_played += 1
+    record.standing_points += standing_points or 0
+    record.caps_for += team_score
+    record.caps_against += opponent_score
+    if not team_outcome:
+        if team_score > opponent_score:
+            record.wins += 1
+        elif team_score < opponent_score:
+            record.losses += 1
+    elif team_outcome == 'W':
+        record.wins += 1
+    elif team_outcome == 'OTW':
+        record.ot_wins += 1
+        record.caps_for -= 1
+    elif team_outcome == 'OTL':
+        record.ot_losses += 1
+        record.caps_against -= 1
+    elif team_outcome == 'L':
+        record.losses += 1
+
+
+def update_team_records(season: Season) -> None:
+    """
+    Recalculate the TeamSeasonRecord for every team in the season from its regular season games
+    (see count_game_in_record).
+    """
+    records = {
+        team_id: TeamSeasonRecord(team_id=team_id)
+        for team_id in TeamSeason.objects.filter(season=season).values_list('id', flat=True)
+    }
+    games = Game.objects.filter(
+        match__season=season,
+        match__week__startswith="Week"
+    ).values_list(
+        'match__team1_id', 'match__team2_id', 'outcome',
+        'team1_score', 'team2_score', 'team1_standing_points', 'team2_standing_points'
+    )
+    for team1_id, team2_id, outcome, team1_score, team2_score, team1_sp, team2_sp in games:
+        sides = (
+            (team1_id, outcome, team1_score, team2_score, team1_sp),
+            (team2_id, OUTCOME_FROM_OTHER_SIDE.get(outcome, outcome), team2_score, team1_score, team2_sp),
+        )
+        for team_id, team_outcome, team_score, opponent_score, standing_points in sides:
+            count_game_in_record(records[team_id], team_outcome, team_score, opponent_score, standing_points)
+
+    upsert(TeamSeasonRecord, records.values(), ['team'], update_fields=RECORD_FIELDS)
+    update_match_results(Match.objects.filter(season=season))
+    update_season_summary(season)
+    bump_standings_version()
+    bump_season_data_version(season)
+
+
+def build_match_result(match: Match, games: List[Game]) -> MatchResult:
+    """
+    Work out a match's box score from its games (in order): who won each game and whether it went
+    to OT, and the match totals, which are series wins for playoff matches and standing points otherwise.
+    """
+    is_playoff = match.get_playoff_series() is not None
+    team1_total = 0
+    team2_total = 0
+    game_results = []
+    for game in games:
+        if game.team1_score > game.team2_score:
+            winner = 'team1'
+        elif game.team2_score > game.team1_score:
+            winner = 'team2'
+        else:
+            winner = 'tie'
+
+        if not is_playoff:
+            team1_total += game.team1_standing_points or 0
+            team2_total += game.team2_standing_points or 0
+        elif winner == 'team1':
+            team1_total += 1
+        elif winner == 'team2':
+            team2_total += 1
+
+        game_results.append([game.game_in_match, game.team1_score, game.team2_score, winner, game.outcome in ('OTW', 'OTL')])
+
+    return MatchResult(
+        match=match,
+        is_playoff=is_playoff,
+        team1_total=team1_total,
+        team2_total=team2_total,
+        winner='team1' if team1_total > team2_total else 'team2' if team2_total > team1_total else 'tie',
+        games=game_results,
+    )
+
+
+def update_match_results(matches: models.QuerySet[Match]) -> None:
+    """Recalculate the box scores of a queryset of matches, from one query of their games and one upsert."""
+    matches = matches.select_related('playoff_series').prefetch_related('games')
+    upsert(MatchResult, [build_match_result(match, list(match.games.all())) for match in matches], ['match'], update_fields=[
+        'is_playoff', 'team1_total', 'team2_total', 'winner', 'games'
+    ])
+
+
+def get_weekly_standings(season: Season, teams: List[TeamSeason]) -> List[Tuple[str, List[Dict]]]:
+    """
+    Rank the season's teams at the end of every regular season week, in one pass over its games.
+
+    Weeks are taken in the order they were played (by their first game), and each team's record and
+    tiebreaker data (standing points, caps and head-to-head results) are kept as running totals, so
+    ranking a week with the tiebreakers only costs a sort. Returns (week, standings) for each week,
+    where the standings are tiebreaker dicts (see rank_by_standing_points) in seed order, each with a
+    copy of the team's record at the time under 'record'.
+    """
+    standings = {
+        team.id: {'team': team, 'standing_points': 0, 'caps_for': 0, 'caps_against': 0, 'head_to_head': {}}
+        for team in teams
+    }
+    records = {team.id: TeamSeasonRecord(team=team) for team in teams}
+
+    games = Game.objects.filter(
+        match__season=season,
+        match__week__startswith="Week"
+    ).order_by('match__date', 'match_id', 'game_in_match').values_list(
+        'match__week', 'match__team1_id', 'match__team2_id', 'outcome',
+        'team1_score', 'team2_score', 'team1_standing_points', 'team2_standing_points'
+    )
+    games_by_week: Dict[str, List[Tuple]] = {}
+    for week, *game in games:
+        games_by_week.setdefault(week, []).append(game)
+
+    weekly_standings = []
+    for week, week_games in games_by_week.items():
+        for team1_id, team2_id, outcome, team1_score, team2_score, team1_sp, team2_sp in week_games:
+            sides = (
+                (team1_id, team2_id, outcome, team1_score, team2_score, team1_sp or 0, team2_sp or 0),
+                (team2_id, team1_id, OUTCOME_FROM_OTHER_SIDE.get(outcome, outcome), team2_score, team1_score, team2_sp or 0, team1_sp or 0),
+            )
+            for team_id, opponent_id, team_outcome, team_caps, opponent_caps, team_sp, opponent_sp in sides:
+                count_game_in_record(records[team_id], team_outcome, team_caps, opponent_caps, team_sp)
+
+                team_data = standings[team_id]
+                team_data['standing_points'] += team_sp
+                team_data['caps_for'] += team_caps
+                team_data['caps_against'] += opponent_caps
+                h2h = team_data['head_to_head'].setdefault(opponent_id, {
+                    'team_standing_points': 0, 'total_standing_points': 0, 'caps_for': 0, 'caps_against': 0
+                })
+                h2h['caps_for'] += team_caps
+                h2h['caps_against'] += opponent_caps
+                h2h['team_standing_points'] += team_sp
+                h2h['total_standing_points'] += team_sp + opponent_sp
+
+        # Apply NALTP tiebreakers
+        for team_data in standings.values():
+            team_data['cap_differential'] = team_data['caps_for'] - team_data['caps_against']
+            team_data['total_caps'] = team_data['caps_for']
+        ranked = rank_by_standing_points(list(standings.values()))
+        weekly_standings.append((week, [
+            {**team_data, 'record': {field: getattr(records[team_data['team'].id], field) for field in RECORD_FIELDS}}
+            for team_data in ranked
+        ]))
+
+    return weekly_standings
+
+
+def update_standings_snapshots(season: Season, teams: List[TeamSeason]) -> List[Tuple[str, List[Dict]]]:
+    """
+    Store the season's standings at the end of every regular season week as StandingsSnapshots, with
+    one upsert, removing snapshots of weeks that no longer have games. Returns the weekly standings
+    (see get_weekly_standings).
+    """
+    weekly_standings = get_weekly_standings(season, teams)
+    upsert(StandingsSnapshot, [
+        StandingsSnapshot(
+            season=season,
+            week=week,
+            week_index=week_index,
+            standings=[
+                [team_data['team'].id] + [team_data['record'][field] for field in RECORD_FIELDS]
+                for team_data in standings
+            ],
+        )
+        for week_index, (week, standings) in enumerate(weekly_standings)
+    ], ['season', 'week'], update_fields=['week_index', 'standings'])
+    StandingsSnapshot.objects.filter(season=season).exclude(week__in=[week for week, _ in weekly_standings]).delete()
+    return weekly_standings
+
+
 def update_standings(season: Season):
     """
     Calculate and update seed and playoff_finish for all teams in a season.
     """
-    teams = TeamSeason.objects.filter(season=season)
-    
-    # Calculate standings data for each team
-    standings_data = []
-    for team in teams:
-        # Get all regular season games for the team
-        team_games = Game.objects.filter(
-            models.Q(red_team=team) | models.Q(blue_team=team),
-            match__season=season,
-            match__week__startswith="Week"
-        )
-        
-        standing_points = 0
-        caps_for = 0
-        caps_against = 0
-        head_to_head = {}  # opponent_id -> {'team_standing_points': int, 'total_standing_points': int, 'caps_for': int, 'caps_against': int}
-        
-        for game in team_games:
-            is_team1 = (team == game.match.team1)
-            opponent = game.match.team2 if is_team1 else game.match.team1
-            
-            if is_team1:
-                team_standing_points = game.team1_standing_points or 0
-                opponent_standing_points = game.team2_standing_points or 0
-                team_caps = game.team1_score
-                opponent_caps = game.team2_score
-            else:
-                team_standing_points = game.team2_standing_points or 0
-                opponent_standing_points = game.team1_standing_points or 0
-                team_caps = game.team2_score
-                opponent_caps = game.team1_score
-            
-            standing_points += team_standing_points
-            caps_for += team_caps
-            caps_against += opponent_caps
-            
-            # Track head-to-head records
-            if opponent.id not in head_to_head:
-                head_to_head[opponent.id] = {'team_standing_points': 0, 'total_standing_points': 0, 'caps_for': 0, 'caps_against': 0}
-            
-            h2h = head_to_head[opponent.id]
-            h2h['caps_for'] += team_caps
-            h2h['caps_against'] += opponent_caps
-            h2h['team_standing_points'] += team_standing_points
-            h2h['total_standing_points'] += team_standing_points + opponent_standing_points
-        
-        standings_data.append({
-            'team': team,
-            'standing_points': standing_points,
-            'cap_differential': caps_for - caps_against,
-            'total_caps': caps_for,
-            'head_to_head': head_to_head,
-        })
+    teams = list(TeamSeason.objects.filter(season=season).order_by('id'))
     
-    # Apply NALTP tiebreakers
-    standings_data = rank_by_standing_points(standings_data)
+    # The seeds are the standings after the last week. With no games played every tiebreaker is
+    # tied, which leaves the teams in order.
+    weekly_standings = update_standings_snapshots(season, teams)
+    standings_data = weekly_standings[-1][1] if weekly_standings else [{'team': team} for team in teams]
     
     # Assign seeds and update teams
+    has_playoffs = PlayoffSeries.objects.filter(match__season=season).exclude(winner__isnull=True).exists()
     for i, team_data in enumerate(standings_data):
         team = team_data['team']
         team.seed = i + 1
         
         # Calculate playoff finishes
-        has_playoffs = PlayoffSeries.objects.filter(match__season=season).exclude(winner__isnull=True).exists()
         if not has_playoffs:
             playoff_finish = "—"
         else:
@@ -710,8 +934,7 @@ def update_standings(season: Season):
                                 last_loss_week = match.week
                 
                 # Check if they won the championship
-                final_names = ['Super Ball', 'Muper Ball', 'Nuper Ball', 'Buper Ball']
-                if last_win_week in final_names:
+                if last_win_week in CHAMPIONSHIP_WEEKS:
                     playoff_finish = "Won championship"
                 elif last_loss_week:
                     playoff_finish = f"Lost {last_loss_week}"
@@ -721,4 +944,42 @@ def update_standings(season: Season):
                     playoff_finish = "Missed playoffs"
         
         team.playoff_finish = playoff_finish
-        team.save()
+
+    # A bulk update doesn't send the TeamSeason signals, which would re-index each team for search
+    # and bump the season's version and summary once per team; that's done once below instead
+    TeamSeason.objects.bulk_update([team_data['team'] for team_data in standings_data], ['seed', 'playoff_finish'])
+    update_season_summary(season)
+    bump_season_data_version(season)
+
+
+def update_season_summary(season: Season) -> None:
+    """
+    Store the season's team count, final series, champion and runner-up on the season, so
+    league_history can list every season from one query.
+
+    The final series is the championship series, or, for seasons without one, the latest playoff series.
+    """
+    final_match = Match.objects.filter(
+        season=season,
+        week__in=CHAMPIONSHIP_WEEKS,
+        playoff_series__isnull=False
+    ).select_related('playoff_series').first()
+    if final_match is None:
+        final_match = Match.objects.filter(
+            season=season,
+            playoff_series__isnull=False
+        ).select_related('playoff_series').order_by('-date').first()
+
+    final_series = final_match.playoff_series if final_match else None
+    champion_id = final_series.winner_id if final_series else None
+    runner_up_id = None
+    if champion_id:
+        # The other team in the match is the runner-up
+        runner_up_id = final_match.team2_id if final_match.team1_id == champion_id else final_match.team1_id
+
+    Season.objects.filter(pk=season.pk).update(
+        team_count=TeamSeason.objects.filter(season=season).count(),
+        final_series=final_series,
+        champion_id=champion_id,
+        runner_up_id=runner_up_id,
+    )
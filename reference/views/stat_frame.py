@@ -0,0 +1,133 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+
+# (source field, converted field, ticks per unit)
+TIME_COLUMNS = [
+    ('time_played', 'time_played_min', 3600),
+    ('hold', 'hold_sec', 60),
+    ('prevent', 'prevent_sec', 60),
+    ('hold_against', 'hold_against_sec', 60),
+]
+
+
+class StatFrame:
+    """
+    Column-oriented view of a list of player stat dicts (e.g. rows from a values() query), with one
+    NumPy array per stat, so conversions and rate stats are computed for every row at once.
+
+    Computed columns are read back as lists of plain Python numbers with to_list(), or copied into
+    the row dicts with write_to_rows() for templates that read them from there.
+    """
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self.columns: Dict[str, np.ndarray] = {}
+        # Computed rate columns -> (digits to round to, fallback for rows where the rate is undefined)
+        self.rounding: Dict[str, tuple] = {}
+        self.computed: List[str] = []
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """Return the column for a stat, treating missing values (None) as 0."""
+        if field not in self.columns:
+            self.columns[field] = np.fromiter(
+                (row.get(field) or 0 for row in self.rows), dtype=np.float64, count=len(self.rows)
+            )
+        return self.columns[field]
+
+    def _set(self, field: str, values: np.ndarray, digits: Optional[int] = None, fallback: Optional[np.ndarray] = None) -> None:
+        """
+        Store a computed column. For rates, NaN marks rows where the denominator was 0, which read
+        back as the fallback value (0 by default) instead.
+        """
+        self.columns[field] = values
+        self.computed.append(field)
+        if values.dtype.kind == 'f':
+            self.rounding[field] = (digits, fallback)
+
+    @staticmethod
+    def _ratio(numerator: np.ndarray, denominator: np.ndarray, scale: int = 1) -> np.ndarray:
+        """numerator / denominator (times scale), or NaN wherever the denominator is 0."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = numerator / denominator * scale
+        return np.where(denominator > 0, values, np.nan)
+
+    @staticmethod
+    def _round(values: np.ndarray, digits: int) -> np.ndarray:
+        """
+        Round like Python's round(). np.round() rounds the scaled value half-to-even, so it disagrees
+        on values like 37 / 40 = 0.925 (0.92 vs. 0.93); those near-ties are redone with round().
+        """
+        rounded = np.round(values, digits)
+        with np.errstate(invalid='ignore'):
+            scaled = values * 10 ** digits
+            near_ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        for i in np.flatnonzero(near_ties).tolist():
+            rounded[i] = round(float(values[i]), digits)
+        return rounded
+
+    def to_list(self, field: str) -> List:
+        """Return a column as plain Python numbers: ints for counts, rounded floats for rates."""
+        if field not in self.computed:
+            return [row.get(field, 0) for row in self.rows]
+        values = self.columns[field]
+        if field not in self.rounding:
+            return values.tolist()
+
+        digits, fallback = self.rounding[field]
+        result = self._round(values, digits).tolist()
+        for i in np.flatnonzero(np.isnan(values)).tolist():
+            result[i] = int(fallback[i]) if fallback is not None else 0
+        return result
+
+    def write_to_rows(self, *fields: str) -> 'StatFrame':
+        """Copy computed columns (all of them by default) into the row dicts."""
+        for field in fields or self.computed:
+            for row, value in zip(self.rows, self.to_list(field)):
+                row[field] = value
+        return self
+
+    def add_time_columns(self) -> 'StatFrame':
+        """Add minutes played and hold/prevent/hold against in seconds (time stats are stored in ticks)."""
+        if self.rows:
+            for field, converted_field, ticks in TIME_COLUMNS:
+                if field in self.rows[0]:
+                    self._set(converted_field, np.rint(self[field] / ticks).astype(np.int64))
+        return self
+
+    def add_derived_stats(self) -> 'StatFrame':
+        """Add rate stats and other derived metrics. Requires add_time_columns to have been called."""
+        if not self.rows:
+            return self
+        minutes = self.columns['time_played_min']
+        hold_sec = self.columns['hold_sec']
+        prevent_sec = self.columns['prevent_sec']
+        hold_against_sec = self['hold_against'] / 60
+
+        # Rate stats (per minute)
+        self._set('gpm', self._ratio(self['grabs'], minutes), 2)
+        self._set('cpm', self._ratio(self['captures'], minutes), 2)
+        self._set('hpm', self._ratio(hold_sec, minutes), 2)
+        self._set('tpm', self._ratio(self['tags'], minutes), 2)
+        self._set('rpm', self._ratio(self['returns'], minutes), 2)
+        self._set('ppm', self._ratio(prevent_sec, minutes), 2)
+        self._set('ham', self._ratio(hold_against_sec, minutes), 2)
+
+        # Ratio stats
+        self._set('hold_per_grab', self._ratio(hold_sec, self['grabs']), 2)
+        self._set('score_percent', self._ratio(self['captures'], self['grabs'], 100), 1)
+        self._set('flaccid_percent', self._ratio(self['flaccids'], self['grabs'], 100), 1)
+        self._set('chain_percent', self._ratio(self['good_handoffs'], self['handoffs'], 100), 1)
+        self._set('spark_percent', self._ratio(self['captures'] - self['caps_off_regrab'], self['captures'], 100), 1)
+        # K/D falls back to tags when a player was never popped
+        self._set('kd_ratio', self._ratio(self['tags'], self['pops']), 2, fallback=self['tags'])
+        self._set('prevent_per_return', self._ratio(prevent_sec, self['returns']), 2)
+        self._set('prevent_per_hold_against', self._ratio(prevent_sec, hold_against_sec), 2)
+        self._set('rib_percent', self._ratio(self['returns_in_base'], self['returns'], 100), 1)
+        self._set('qr_percent', self._ratio(self['quick_returns'], self['returns'], 100), 1)
+        self._set('pup_percent', self._ratio(self['powerups'], self['total_pups_in_game'], 100), 1)
+
+        # Derived counting stats
+        self._set('plus_minus', (self['caps_for'] - self['caps_against']).astype(np.int64))
+        self._set('non_return_tags', (self['tags'] - self['returns']).astype(np.int64))
+        self._set('non_drop_pops', (self['pops'] - self['drops']).astype(np.int64))
+        return self
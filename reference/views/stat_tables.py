@@ -0,0 +1,174 @@
+from django.core.paginator import Page, Paginator
+from django.http import QueryDict
+from typing import Dict, List
+import numpy as np
+
+from .stat_frame import StatFrame
+
+
+PAGE_SIZE = 50
+
+STAT_VIEW_OPTIONS = [
+    {'value': 'basic', 'label': 'Basic'},
+    {'value': 'offense', 'label': 'Offense'},
+    {'value': 'defense', 'label': 'Defense'},
+    {'value': 'offense_rates', 'label': 'Offense Rates'},
+    {'value': 'defense_rates', 'label': 'Defense Rates'},
+    {'value': 'miscellaneous', 'label': 'Miscellaneous'},
+]
+
+# Columns shown in each stat view
+STAT_COLUMNS = {
+    'basic': [
+        {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
+        {'key': 'tags', 'label': 'Tags', 'type': 'number'},
+        {'key': 'pops', 'label': 'Pops', 'type': 'number'},
+        {'key': 'grabs', 'label': 'Grabs', 'type': 'number'},
+        {'key': 'drops', 'label': 'Drops', 'type': 'number'},
+        {'key': 'hold_sec', 'label': 'Hold', 'type': 'number'},
+        {'key': 'captures', 'label': 'Caps', 'type': 'number'},
+        {'key': 'prevent_sec', 'label': 'Prev', 'type': 'number'},
+        {'key': 'returns', 'label': 'Ret', 'type': 'number'},
+        {'key': 'powerups', 'label': 'Pups', 'type': 'number'},
+    ],
+    'offense': [
+        {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
+        {'key': 'grabs_off_handoffs', 'label': 'GOH', 'type': 'number', 'tooltip': 'Grabs Off Handoffs - grabs within <2 seconds of teammate drop from hold of <3 seconds'},
+        {'key': 'caps_off_handoffs', 'label': 'COH', 'type': 'number', 'tooltip': 'Caps Off Handoffs - caps after grabbing within <2 seconds of teammate drop from hold of <3 seconds'},
+        {'key': 'grabs_off_regrab', 'label': 'GOR', 'type': 'number', 'tooltip': 'Grabs Off Regrab - grabs within <2 seconds of teammate drop'},
+        {'key': 'caps_off_regrab', 'label': 'COR', 'type': 'number', 'tooltip': 'Caps Off Regrab - caps after grabbing within <2 seconds of teammate drop'},
+        {'key': 'long_holds', 'label': 'LH', 'type': 'number', 'tooltip': 'Long Holds - holds of >10 seconds'},
+        {'key': 'flaccids', 'label': 'FLcd', 'type': 'number', 'tooltip': 'Flaccids - drop after <2 seconds of hold'},
+        {'key': 'handoffs', 'label': 'HO', 'type': 'number', 'tooltip': 'Handoffs - hold for <3 seconds and teammate grabs within <2 seconds of the drop'},
+        {'key': 'good_handoffs', 'label': 'GH', 'type': 'number', 'tooltip': 'Good Handoffs - handoff resulting in teammate hold of >5 seconds'},
+    ],
+    'defense': [
+        {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
+        {'key': 'quick_returns', 'label': 'QR', 'type': 'number', 'tooltip': 'Quick Returns - return within <2 seconds of opponent hold'},
+        {'key': 'returns_in_base', 'label': 'RIB', 'type': 'number', 'tooltip': 'Returns In Base - return within 10 tiles of the team\'s flag'},
+        {'key': 'saves', 'label': 'Saves', 'type': 'number', 'tooltip': 'Saves - return within 10 tiles of the enemy flag'},
+        {'key': 'key_returns', 'label': 'KR', 'type': 'number', 'tooltip': 'Key Returns - return within <2 seconds before team caps'},
+        {'key': 'hold_against_sec', 'label': 'HA', 'type': 'number', 'tooltip': 'Hold Against - hold accumulated by opponents while playing (in seconds)'},
+    ],
+    'offense_rates': [
+        {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
+        {'key': 'gpm', 'label': 'GPM', 'type': 'number', 'tooltip': 'Grabs Per Minute - grabs / minutes played'},
+        {'key': 'cpm', 'label': 'CPM', 'type': 'number', 'tooltip': 'Caps Per Minute - captures / minutes played'},
+        {'key': 'hpm', 'label': 'HPM', 'type': 'number', 'tooltip': 'Hold Per Minute - hold / minutes played'},
+        {'key': 'hold_per_grab', 'label': 'H/G', 'type': 'number', 'tooltip': 'Hold per Grab - hold / grabs'},
+        {'key': 'score_percent', 'label': 'Score%', 'type': 'number', 'tooltip': 'Score Percentage - captures / grabs'},
+        {'key': 'chain_percent', 'label': 'Chain%', 'type': 'number', 'tooltip': 'Chain Percentage - good handoffs / handoffs'},
+        {'key': 'spark_percent', 'label': 'Spark%', 'type': 'number', 'tooltip': 'Spark Percentage - (captures - caps off regrab) / captures'},
+        {'key': 'flaccid_percent', 'label': 'Flaccid%', 'type': 'number', 'tooltip': 'Flaccid Percentage - flaccids / grabs'},
+    ],
+    'defense_rates': [
+        {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
+        {'key': 'tpm', 'label': 'TPM', 'type': 'number', 'tooltip': 'Tags Per Minute - tags / minutes played'},
+        {'key': 'rpm', 'label': 'RPM', 'type': 'number', 'tooltip': 'Returns Per Minute - returns / minutes played'},
+        {'key': 'ppm', 'label': 'PPM', 'type': 'number', 'tooltip': 'Prevent Per Minute - prevent / minutes played'},
+        {'key': 'ham', 'label': 'HAM', 'type': 'number', 'tooltip': 'Hold Against Per Minute - hold against / minutes played'},
+        {'key': 'prevent_per_return', 'label': 'P/R', 'type': 'number', 'tooltip': 'Prevent per Return - prevent / returns'},
+        {'key': 'prevent_per_hold_against', 'label': 'P/HA', 'type': 'number', 'tooltip': 'Prevent per Hold Against - prevent / hold against'},
+        {'key': 'rib_percent', 'label': 'RIB%', 'type': 'number', 'tooltip': 'Return In Base Percentage - returns in base / returns'},
+        {'key': 'qr_percent', 'label': 'QR%', 'type': 'number', 'tooltip': 'Quick Return Percentage - quick returns / returns'},
+    ],
+    'miscellaneous': [
+        {'key': 'time_played_min', 'label': 'Min', 'type': 'number'},
+        {'key': 'plus_minus', 'label': 'PM', 'type': 'number', 'tooltip': 'Plus/Minus - caps for - caps against'},
+        {'key': 'kept_flags', 'label': 'KF', 'type': 'number', 'tooltip': 'Kept Flags - times holding flag as the game ends'},
+        {'key': 'kd_ratio', 'label': 'K/D', 'type': 'number', 'tooltip': 'Kill/Death Ratio - tags / pops'},
+        {'key': 'non_return_tags', 'label': 'NRTags', 'type': 'number', 'tooltip': 'Non-Return Tags - tags - returns'},
+        {'key': 'non_drop_pops', 'label': 'NDPops', 'type': 'number', 'tooltip': 'Non-Drop Pops - pops - drops'},
+        {'key': 'pup_percent', 'label': 'Pup%', 'type': 'number', 'tooltip': 'Powerup Percentage - powerups / total pups in game'},
+    ]
+}
+
+# Sortable text columns -> the row field they sort by
+TEXT_SORT_FIELDS = {
+    'player': 'playing_as',
+    'team': 'team_abbr',
+}
+
+
+def get_table_options(params: QueryDict, columns: List[Dict], default_sort: str) -> Dict:
+    """
+    Read the sort column, direction, minimum minutes played and page for a stat table from the
+    query params. Anything missing or invalid falls back to the default (sort by default_sort,
+    numbers descending and text ascending, no minimum, first page).
+    """
+    sort = params.get('sort', default_sort)
+    if sort not in TEXT_SORT_FIELDS and sort not in {column['key'] for column in columns}:
+        sort = default_sort
+
+    direction = params.get('dir')
+    if direction not in ('asc', 'desc'):
+        direction = 'asc' if sort in TEXT_SORT_FIELDS else 'desc'
+
+    try:
+        min_minutes = max(int(params.get('min_minutes', 0)), 0)
+    except ValueError:
+        min_minutes = 0
+
+    return {
+        'sort': sort,
+        'dir': direction,
+        'min_minutes': min_minutes,
+        'page': params.get('page', 1),
+    }
+
+
+def sort_and_paginate(frame: StatFrame, options: Dict, page_size: int = PAGE_SIZE) -> Page:
+    """
+    Filter out rows under the minimum minutes played, sort the rest and return the requested page
+    of row indices into frame.rows. Ties keep the rows' original order, whichever the direction.
+    """
+    if options['sort'] in TEXT_SORT_FIELDS:
+        field = TEXT_SORT_FIELDS[options['sort']]
+        indices = sorted(
+            range(len(frame.rows)),
+            key=lambda i: (frame.rows[i].get(field) or '').lower(),
+            reverse=options['dir'] == 'desc'
+        )
+        # sorted(reverse=True) keeps ties in their original order too
+        order = np.array(indices, dtype=np.int64)
+    else:
+        values = np.array(frame.to_list(options['sort']), dtype=np.float64)
+        order = np.argsort(-values if options['dir'] == 'desc' else values, kind='stable')
+
+    if options['min_minutes'] and frame.rows:
+        order = order[frame['time_played_min'][order] >= options['min_minutes']]
+
+    return Paginator(order.tolist(), page_size).get_page(options['page'])
+
+
+def table_url(params: QueryDict, **changes) -> str:
+    """Return a query string for the current table with some params changed (None removes a param)."""
+    query = params.copy()
+    query.pop('partial', None)
+    for key, value in changes.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return f"?{query.urlencode()}"
+
+
+def get_sort_headers(params: QueryDict, columns: List[Dict], options: Dict) -> List[Dict]:
+    """
+    Add the URL that sorts by each column (flipping the direction if it's already the sort column)
+    and its sort indicator. Changing the sort goes back to the first page.
+    """
+    headers = []
+    for column in columns:
+        if column['key'] == options['sort']:
+            direction = 'asc' if options['dir'] == 'desc' else 'desc'
+            indicator = ' ↑' if options['dir'] == 'asc' else ' ↓'
+        else:
+            direction = 'asc' if column['key'] in TEXT_SORT_FIELDS else 'desc'
+            indicator = ''
+        headers.append({
+            **column,
+            'sort_url': table_url(params, sort=column['key'], dir=direction, page=None),
+            'sort_indicator': indicator,
+        })
+    return headers
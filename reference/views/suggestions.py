@@ -0,0 +1,144 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from heapq import nsmallest
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+import unicodedata
+from .cache_versions import get_search_version
+from ..models import SearchDocument
+
+
+SUGGESTION_LIMIT = 10
+MAX_SUGGESTION_LIMIT = 25
+
+# Shorter prefixes match too much of the index to be worth suggesting from
+MIN_SUGGESTION_QUERY_LENGTH = 2
+
+# Sorts after every character a normalized key can contain, so [prefix, prefix + KEY_END) is a prefix's range
+KEY_END = chr(0x10FFFF)
+
+WORD_BOUNDARY = re.compile(r"[\s\-_.]+")
+
+# Equally good matches are suggested in this order of kinds. Teams come last since every season of
+# a franchise has one.
+KIND_ORDER = {'league': 0, 'franchise': 1, 'player': 2, 'team': 3}
+
+
+def normalize(text: str) -> str:
+    """Fold case and accents and collapse whitespace, so 'Zoë  Smith' and 'zoe smith' match."""
+    text = unicodedata.normalize('NFKD', text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+
+@dataclass
+class Suggestion:
+    kind: str
+    object_id: int
+    name: str
+    detail: Optional[str]
+    # Position in the default order: by kind, then teams from the latest seasons first and everything
+    # else alphabetically
+    order: int
+
+
+class SuggestionIndex:
+    """
+    Sorted array of every normalized name, abbreviation and alias in the search index, plus each of
+    their suffixes that starts a word, so 'smi' suggests 'Zoe Smith'. Looking a prefix up is two
+    bisects and a scan of the keys it prefixes.
+    """
+
+    def __init__(self, documents: Iterable[SearchDocument]):
+        self.suggestions: List[Suggestion] = []
+        entries = []
+
+        documents = sorted(documents, key=lambda d: d.name.casefold())
+        documents.sort(key=lambda d: d.sort_date or date.min, reverse=True)
+        documents.sort(key=lambda d: KIND_ORDER[d.kind])
+        for order, document in enumerate(documents):
+            name_key = normalize(document.name)
+            for term in document.search_text.split("\n"):
+                key = normalize(term)
+                if not key:
+                    continue
+                self.suggestions.append(self._suggestion(document, term, key == name_key, order))
+                index = len(self.suggestions) - 1
+                entries.append((key, False, index))
+                for boundary in WORD_BOUNDARY.finditer(key):
+                    if boundary.end() < len(key):
+                        entries.append((key[boundary.end():], True, index))
+
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.entries = [(is_word, index) for _, is_word, index in entries]
+
+    @staticmethod
+    def _suggestion(document: SearchDocument, term: str, is_name: bool, order: int) -> Suggestion:
+        if document.kind == 'team':
+            detail = document.season_name
+        elif document.kind == 'player':
+            # Say which name the player played as if that's what matched
+            detail = None if is_name else f"as {term}"
+        else:
+            detail = document.abbr if document.abbr and document.abbr != document.name else None
+        return Suggestion(document.kind, document.object_id, document.name, detail, order)
+
+    def lookup(self, query: str, limit: int = SUGGESTION_LIMIT) -> List[Suggestion]:
+        """
+        Return up to limit objects with a name, abbreviation or alias (or a word in one) starting
+        with query: exact matches first, then whole names starting with it, then words in names
+        starting with it, each in the default order.
+        """
+        prefix = normalize(query)
+        if len(prefix) < MIN_SUGGESTION_QUERY_LENGTH:
+            return []
+
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + KEY_END, start)
+
+        # Keep each object's best ranked match
+        best: Dict[Tuple[str, int], Tuple[int, int, int]] = {}
+        for i in range(start, end):
+            is_word, index = self.entries[i]
+            suggestion = self.suggestions[index]
+            if is_word:
+                rank = (2, suggestion.order, index)
+            else:
+                rank = (0 if self.keys[i] == prefix else 1, suggestion.order, index)
+            key = (suggestion.kind, suggestion.object_id)
+            if key not in best or rank < best[key]:
+                best[key] = rank
+
+        return [self.suggestions[index] for _, _, index in nsmallest(limit, best.values())]
+
+
+_index: Optional[SuggestionIndex] = None
+_index_version: Optional[int] = None
+_index_lock = Lock()
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    """
+    Return this process's suggestion index, rebuilding it from the search index (in one query) if
+    the search index has changed since it was built. Re-indexing anything bumps the search version.
+    """
+    global _index, _index_version
+    version = get_search_version()
+    if _index is not None and _index_version == version:
+        return _index
+
+    with _index_lock:
+        if _index is None or _index_version != version:
+            _index = SuggestionIndex(SearchDocument.objects.only(
+                'kind', 'object_id', 'name', 'abbr', 'season_name', 'sort_date', 'search_text'
+            ))
+            _index_version = version
+    return _index
+
+
+def suggest(query: str, limit: int = SUGGESTION_LIMIT) -> List[Suggestion]:
+    """Return autocomplete suggestions for a partly typed name."""
+    return get_suggestion_index().lookup(query, limit)
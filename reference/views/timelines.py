@@ -0,0 +1,212 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import zlib
+import numpy as np
+import tagpro_eu
+from tagpro_eu.match import Splat
+from .upserts import upsert
+from ..models import Game, GameTimeline
+
+
+# Events that name the team they're about, e.g. 'Join team Red'. The team is stored in the team
+# column, and the name is put back from the match's team names.
+TEAM_EVENTS = ['Join team', 'Leave team', 'Switch to team']
+
+# Every event a tagpro_eu timeline can contain, by code. The codes are stored, so only ever append
+# to this list.
+EVENTS = TEAM_EVENTS + [
+    'Grab Opponent flag', 'Grab Opponent potato', 'Grab Neutral flag', 'Grab Neutral potato', 'Grab Temporary flag',
+    'Capture Opponent flag', 'Capture Opponent potato', 'Capture Neutral flag', 'Capture Neutral potato',
+    'Capture Temporary flag', 'Capture marsball',
+    'Drop Opponent flag', 'Drop Opponent potato', 'Drop Neutral flag', 'Drop Neutral potato', 'Drop Temporary flag',
+    'Power up Juke Juice', 'Power up Rolling Bomb', 'Power up TagPro', 'Power up Top Speed', 'Grab duplicate powerup',
+    'Power down Juke Juice', 'Power down Rolling Bomb', 'Power down TagPro', 'Power down Top Speed',
+    'Return', 'Tag', 'Pop',
+    'Start preventing', 'Stop preventing', 'Start buttoning', 'Stop buttoning', 'Start blocking', 'Stop blocking',
+    'Game ends',
+]
+EVENT_CODES = {event: code for code, event in enumerate(EVENTS)}
+
+# (name, dtype) of each column of the events and splats blobs, in the order they're packed. Teams
+# are tagpro_eu.Team values (0 for no team, 1 for red, 2 for blue).
+EVENT_COLUMNS = [('tick', '<u4'), ('event', 'u1'), ('player', 'u1'), ('team', 'u1')]
+SPLAT_COLUMNS = [('tick', '<u4'), ('x', '<i2'), ('y', '<i2'), ('player', 'u1'), ('team', 'u1')]
+
+
+def pack_columns(columns: List[Tuple[str, str]], rows: List[Tuple]) -> bytes:
+    """
+    Pack rows into one array per column, laid end to end and compressed. Storing columns rather than
+    rows keeps similar values together (e.g. the increasing ticks), which compresses much better.
+    """
+    return zlib.compress(b"".join(
+        np.array([row[i] for row in rows], dtype=dtype).tobytes()
+        for i, (_, dtype) in enumerate(columns)
+    ))
+
+
+def unpack_columns(columns: List[Tuple[str, str]], blob: bytes) -> Dict[str, np.ndarray]:
+    """Unpack a blob written by pack_columns into an array for each column, by name."""
+    data = zlib.decompress(blob)
+    row_size = sum(np.dtype(dtype).itemsize for _, dtype in columns)
+    count = len(data) // row_size
+    arrays = {}
+    offset = 0
+    for name, dtype in columns:
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += count * np.dtype(dtype).itemsize
+    return arrays
+
+
+def get_flag_tiles(m: tagpro_eu.Match) -> List[Optional[List[int]]]:
+    """Return [x, y] of the red flag's tile and of the blue flag's tile (None if there isn't one), the way parse_stats_from_eu_match finds them."""
+    red_flag = None
+    blue_flag = None
+    for y, row in enumerate(m.map.tiles):
+        for x, tile in enumerate(row):
+            if tile == tagpro_eu.Tile.flag_red:
+                red_flag = [x, y]
+            if tile == tagpro_eu.Tile.flag_blue:
+                blue_flag = [x, y]
+    return [red_flag, blue_flag]
+
+
+def build_game_timeline(game: Game, m: tagpro_eu.Match) -> GameTimeline:
+    """
+    Pack a tagpro.eu match's timeline (as parse_stats_from_eu_match reads it, sorted) and splats into
+    a GameTimeline for the game.
+
+    Players are stored by name, since that's how stats are keyed. Each event's team is the team the
+    player was on at the time (the team they left, for leaving).
+    """
+    players = list(dict.fromkeys(p.name for p in m.players))
+    player_indexes = {name: i for i, name in enumerate(players)}
+    team_names = {m.team_red.name: int(tagpro_eu.Team.red), m.team_blue.name: int(tagpro_eu.Team.blue)}
+
+    current_teams: Dict[str, int] = {}
+    events = []
+    for time, event, player in sorted(m.create_timeline()):
+        for team_event in TEAM_EVENTS:
+            if event.startswith(team_event + " "):
+                team = team_names[event[len(team_event) + 1:]]
+                event = team_event
+                break
+        else:
+            team = current_teams.get(player.name, int(tagpro_eu.Team.none))
+        current_teams[player.name] = int(tagpro_eu.Team.none) if event == 'Leave team' else team
+        events.append((int(time), EVENT_CODES[event], player_indexes[player.name], team))
+
+    splats = [
+        (int(s.time), s.x, s.y, player_indexes[s.player.name], int(s.team.team))
+        for s in m.splats
+    ]
+
+    return GameTimeline(
+        game=game,
+        tagpro_eu=int(m.match_id),
+        red_team_name=m.team_red.name,
+        blue_team_name=m.team_blue.name,
+        red_score=m.team_red.score,
+        blue_score=m.team_blue.score,
+        map_width=m.map.width,
+        map_height=m.map.height,
+        flag_tiles=get_flag_tiles(m),
+        players=players,
+        events=pack_columns(EVENT_COLUMNS, events),
+        splats=pack_columns(SPLAT_COLUMNS, splats),
+    )
+
+
+def store_game_timelines(timelines: Iterable[GameTimeline]) -> None:
+    """Store timelines with a single upsert, replacing any stored for the same tagpro.eu matches."""
+    upsert(GameTimeline, timelines, ['tagpro_eu'], update_fields=[
+        'game', 'red_team_name', 'blue_team_name', 'red_score', 'blue_score',
+        'map_width', 'map_height', 'flag_tiles', 'players', 'events', 'splats'
+    ])
+
+
+class TimelinePlayer:
+    """
+    A player in a stored timeline. Like tagpro_eu.Player, players don't order, so sorting a stored
+    timeline leaves events in the same tick in the order they were stored.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __lt__(self, other):
+        return False
+
+    def __repr__(self):
+        return f"TimelinePlayer(name={self.name!r})"
+
+
+class TimelineTeam(NamedTuple):
+    name: str
+    score: int
+    team: tagpro_eu.Team
+
+
+class TimelineMap:
+    """The map of a stored timeline, which only knows its size and where the flags are."""
+
+    def __init__(self, width: int, height: int, flag_tiles: List[Optional[List[int]]]):
+        self.width = width
+        self.height = height
+        self.flag_tiles = flag_tiles
+
+    @property
+    def tiles(self) -> List[List[tagpro_eu.Tile]]:
+        """The map's tile grid, with every tile but the flags empty."""
+        tiles = [[tagpro_eu.Tile.empty] * self.width for _ in range(self.height)]
+        for flag_tile, tile in zip(self.flag_tiles, (tagpro_eu.Tile.flag_red, tagpro_eu.Tile.flag_blue)):
+            if flag_tile is not None:
+                x, y = flag_tile
+                tiles[y][x] = tile
+        return tiles
+
+
+class TimelineMatch:
+    """
+    A tagpro.eu match rebuilt from its GameTimeline, with the parts of tagpro_eu.Match that
+    parse_stats_from_eu_match reads: players, teams, the map's flags, splats and create_timeline().
+    The raw columns are available as events and splat_columns for code that can work on arrays.
+    """
+
+    def __init__(self, timeline: GameTimeline):
+        self.match_id = str(timeline.tagpro_eu)
+        self.players = [TimelinePlayer(name) for name in timeline.players]
+        self.team_red = TimelineTeam(timeline.red_team_name, timeline.red_score, tagpro_eu.Team.red)
+        self.team_blue = TimelineTeam(timeline.blue_team_name, timeline.blue_score, tagpro_eu.Team.blue)
+        self.map = TimelineMap(timeline.map_width, timeline.map_height, timeline.flag_tiles)
+        self.events = unpack_columns(EVENT_COLUMNS, timeline.events)
+        self.splat_columns = unpack_columns(SPLAT_COLUMNS, timeline.splats)
+        self._splats = None
+
+    def team(self, team: int) -> Optional[TimelineTeam]:
+        if team == tagpro_eu.Team.red:
+            return self.team_red
+        elif team == tagpro_eu.Team.blue:
+            return self.team_blue
+        return None
+
+    def create_timeline(self, sort: bool = False) -> List[Tuple[int, str, TimelinePlayer]]:
+        """Return the (tick, event, player) timeline, already in order."""
+        timeline = []
+        for tick, code, player, team in zip(*(column.tolist() for column in self.events.values())):
+            event = EVENTS[code]
+            if event in TEAM_EVENTS:
+                event = f"{event} {self.team(team).name}"
+            timeline.append((tick, event, self.players[player]))
+        return timeline
+
+    @property
+    def splats(self) -> List[Splat]:
+        if self._splats is None:
+            self._splats = [
+                Splat(tick, x, y, self.players[player], self.team(team))
+                for tick, x, y, player, team in zip(*(column.tolist() for column in self.splat_columns.values()))
+            ]
+        return self._splats
+
+    def __repr__(self):
+        return f"TimelineMatch(match_id={self.match_id!r})"
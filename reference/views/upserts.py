@@ -0,0 +1,45 @@
+from django.db import models
+from typing import Iterable, List, Optional, Type
+
+
+def upsert(
+        model: Type[models.Model],
+        objs: Iterable[models.Model],
+        unique_fields: List[str],
+        update_fields: Optional[List[str]] = None
+    ) -> List[models.Model]:
+    """
+    Insert objs with a single INSERT ... ON CONFLICT (unique_fields) statement and return them, each
+    with the primary key of its row, whether that row was just inserted or already existed.
+
+    unique_fields must match a unique constraint on the model (e.g. ['season', 'player'] for
+    PlayerSeason). Existing rows have update_fields overwritten with the new values; by default
+    only the unique fields are "updated", i.e., existing rows are left as they are but still
+    returned, which makes retrying an import idempotent instead of raising an IntegrityError.
+    Note that in-memory fields of objects that matched an existing row are not refreshed.
+    """
+    objs = list(objs)
+    if not objs:
+        return objs
+
+    model.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields or unique_fields
+    )
+
+    # Databases that can't return rows from the upsert (or Django before 5.0) leave pk unset, so
+    # look those up by their natural key
+    missing = [o for o in objs if o.pk is None]
+    if missing:
+        attnames = [model._meta.get_field(f).attname for f in unique_fields]
+        pks = {
+            tuple(row[:-1]): row[-1]
+            for row in model.objects.filter(
+                **{f"{attnames[0]}__in": {getattr(o, attnames[0]) for o in missing}}
+            ).values_list(*attnames, 'pk')
+        }
+        for o in missing:
+            o.pk = pks[tuple(getattr(o, a) for a in attnames)]
+    return objs
@@ -67,6 +67,27 @@ DATABASES = {
     }
 }
 
+# The cache is shared between processes (uwsgi workers and management commands like imports), so that
+# cached pages are invalidated everywhere as soon as data changes. It's a table in the database by
+# default (created by migrate); set DJANGO_CACHE_BACKEND to use Redis or Memcached instead. The file-based
+# cache can be used too, but it lists its whole directory on every set, which gets slow with many pages.
+CACHE_BACKEND = os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache')
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.environ.get(
+            'DJANGO_CACHE_LOCATION',
+            str(BASE_DIR / 'cache') if CACHE_BACKEND.endswith("FileBasedCache") else 'django_cache'
+        ),
+    }
+}
+if CACHE_BACKEND.endswith(("DatabaseCache", "FileBasedCache", "LocMemCache")):
+    # Whole pages are cached per season, week, view, sort and page, so the default limit of 300 entries
+    # would cull most of them before they're hit again. Memcached and Redis clients reject the option.
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.environ.get('DJANGO_CACHE_MAX_ENTRIES', 50000)),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators